@@ -0,0 +1,4 @@
+"""Micro-benchmarks for the BLE Battery Management System integration.
+
+Run a benchmark from the repository root, e.g. `python -m benchmarks.bench_crc`.
+"""
@@ -0,0 +1,151 @@
+"""Benchmark the compiled derivation plan against per-call rule construction.
+
+The reference rebuilds the rule dictionary with its closures and sets for every
+sample, as _add_missing_values() did before the plan was compiled per BMS class.
+"""
+
+from collections.abc import Callable
+from functools import partial
+from statistics import fmean
+from timeit import repeat
+from typing import Any, Final
+
+from custom_components.bms_ble.plugins import dummy_bms, jikong_bms, ogt_bms, seplos_bms
+from custom_components.bms_ble.plugins.basebms import BaseBMS, BMSsample, BMSvalue
+
+ROUNDS: Final[int] = 20000
+REPEAT: Final[int] = 5  # use best of repeated runs to reduce noise
+SAMPLE: Final[BMSsample] = {
+    "cell_voltages": [3.301 + idx / 1000 for idx in range(16)],
+    "current": -12.5,
+    "battery_level": 73,
+    "design_capacity": 280,
+    "cycle_charge": 204.4,
+    "temp_values": [21.5, 22.0, 23.25, 22.75],
+}
+PLUGINS: Final[list[type[BaseBMS]]] = [
+    dummy_bms.BMS,
+    jikong_bms.BMS,
+    ogt_bms.BMS,
+    seplos_bms.BMS,
+]
+
+
+def ref_add_missing_values(data: BMSsample, values: frozenset[BMSvalue]) -> None:
+    """Calculate missing values with rules built on each call (reference)."""
+    if not values or not data:
+        return
+
+    def can_calc(value: BMSvalue, using: frozenset[BMSvalue]) -> bool:
+        return (value in values) and (value not in data) and using.issubset(data)
+
+    cell_voltages: Final[list[float]] = data.get("cell_voltages", [])
+    battery_level: Final[int | float] = data.get("battery_level", 0)
+    current: Final[float] = data.get("current", 0)
+
+    calculations: dict[BMSvalue, tuple[set[BMSvalue], Callable[[], Any]]] = {
+        "voltage": ({"cell_voltages"}, lambda: round(sum(cell_voltages), 3)),
+        "delta_voltage": (
+            {"cell_voltages"},
+            lambda: (
+                round(max(cell_voltages) - min(cell_voltages), 3)
+                if len(cell_voltages)
+                else None
+            ),
+        ),
+        "cycle_charge": (
+            {"design_capacity", "battery_level"},
+            lambda: (data.get("design_capacity", 0) * battery_level) / 100,
+        ),
+        "battery_level": (
+            {"design_capacity", "cycle_charge"},
+            lambda: round(
+                data.get("cycle_charge", 0) * data.get("design_capacity", 0) / 100, 1
+            ),
+        ),
+        "cycle_capacity": (
+            {"voltage", "cycle_charge"},
+            lambda: round(data.get("voltage", 0) * data.get("cycle_charge", 0), 3),
+        ),
+        "power": (
+            {"voltage", "current"},
+            lambda: round(data.get("voltage", 0) * current, 3),
+        ),
+        "battery_charging": ({"current"}, lambda: current > 0),
+        "runtime": (
+            {"current", "cycle_charge"},
+            lambda: (
+                int(data.get("cycle_charge", 0) / abs(current) * 3600)
+                if current < 0
+                else None
+            ),
+        ),
+        "temperature": (
+            {"temp_values"},
+            lambda: (
+                round(fmean(data.get("temp_values", [])), 3)
+                if data.get("temp_values")
+                else None
+            ),
+        ),
+    }
+
+    for attr, (required, calc_func) in calculations.items():
+        if can_calc(attr, frozenset(required)) and (value := calc_func()) is not None:
+            data[attr] = value
+
+    data["problem"] = any(
+        [
+            data.get("problem", False),
+            data.get("problem_code", False),
+            data.get("voltage") is not None and data.get("voltage", 0) <= 0,
+            any(v <= 0 or v > 5.906 for v in cell_voltages),
+            data.get("delta_voltage", 0) > 5.906,
+            data.get("cycle_charge") is not None
+            and data.get("cycle_charge", 0.0) <= 0.0,
+            battery_level > 100,
+        ]
+    )
+
+
+def update(
+    calc: Callable[[BMSsample, frozenset[BMSvalue]], None], plugin: type[BaseBMS]
+) -> BMSsample:
+    """Return a calculated sample the way the update path of the plugin does."""
+    data: BMSsample = SAMPLE.copy()
+    calc(data, plugin._calc_values())
+    return data
+
+
+def main() -> None:
+    """Print time per sample for both implementations and the speedup."""
+    print(
+        f"{'plugin':<10}{'values':>7}{'per call [us]':>15}{'plan [us]':>11}{'speedup':>9}"
+    )
+    for plugin in PLUGINS:
+        calc: Callable[[BMSsample, frozenset[BMSvalue]], None] = (
+            plugin._add_missing_values
+        )
+        assert update(ref_add_missing_values, plugin) == update(calc, plugin), (
+            f"{plugin.__module__} result mismatch"
+        )
+        t_ref: float = min(
+            repeat(
+                partial(update, ref_add_missing_values, plugin),
+                number=ROUNDS,
+                repeat=REPEAT,
+            )
+        )
+        t_new: float = min(
+            repeat(partial(update, calc, plugin), number=ROUNDS, repeat=REPEAT)
+        )
+        print(
+            f"{plugin.__module__.rsplit('.', 1)[-1]:<10}"
+            f"{len(plugin._calc_values()):>7}"
+            f"{t_ref / ROUNDS * 1e6:>15.2f}{t_new / ROUNDS * 1e6:>11.2f}"
+            f"{t_ref / t_new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the table-driven CRC functions against the former bitwise implementation."""
+
+from collections.abc import Callable
+from functools import partial
+import random
+from timeit import timeit
+from typing import Final
+
+from custom_components.bms_ble.plugins.basebms import crc8, crc_modbus, crc_xmodem
+
+FRAME_SIZES: Final[list[int]] = [8, 20, 64, 128, 300, 512]  # [bytes]
+ROUNDS: Final[int] = 2000
+
+
+def bitwise_crc_modbus(data: bytearray) -> int:
+    """Calculate CRC-16-CCITT MODBUS (bitwise reference)."""
+    crc: int = 0xFFFF
+    for i in data:
+        crc ^= i & 0xFF
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc % 2 else (crc >> 1)
+    return crc & 0xFFFF
+
+
+def bitwise_crc_xmodem(data: bytearray) -> int:
+    """Calculate CRC-16-CCITT XMODEM (bitwise reference)."""
+    crc: int = 0x0000
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x1021 if (crc & 0x8000) else (crc << 1)
+    return crc & 0xFFFF
+
+
+def bitwise_crc8(data: bytearray) -> int:
+    """Calculate CRC-8/MAXIM-DOW (bitwise reference)."""
+    crc: int = 0x00
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x8C if crc & 0x1 else crc >> 1
+    return crc & 0xFF
+
+
+CANDIDATES: Final[list[tuple[str, Callable[[bytearray], int], Callable]]] = [
+    ("crc_modbus", bitwise_crc_modbus, crc_modbus),
+    ("crc_xmodem", bitwise_crc_xmodem, crc_xmodem),
+    ("crc8", bitwise_crc8, crc8),
+]
+
+
+def main() -> None:
+    """Print time per frame for both implementations and the resulting speedup."""
+    rnd: Final[random.Random] = random.Random(0)
+    print(
+        f"{'function':<12}{'size':>6}{'bitwise [us]':>15}{'table [us]':>13}{'speedup':>9}"
+    )
+    for name, ref_fn, fn in CANDIDATES:
+        for size in FRAME_SIZES:
+            frame = bytearray(rnd.randbytes(size))
+            assert ref_fn(frame) == fn(frame), f"{name} result mismatch"
+            t_ref: float = timeit(partial(ref_fn, frame), number=ROUNDS) / ROUNDS
+            t_new: float = timeit(partial(fn, frame), number=ROUNDS) / ROUNDS
+            print(
+                f"{name:<12}{size:>6}{t_ref * 1e6:>15.2f}{t_new * 1e6:>13.2f}"
+                f"{t_ref / t_new:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
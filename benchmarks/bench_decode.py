@@ -0,0 +1,75 @@
+"""Benchmark the compiled frame decoder against the former per-field int.from_bytes loop."""
+
+from functools import partial
+import importlib
+import pkgutil
+import random
+from timeit import repeat
+from typing import Final
+
+from custom_components.bms_ble import plugins
+from custom_components.bms_ble.plugins.basebms import BMSdecoder, BMSsample
+
+ROUNDS: Final[int] = 10000
+REPEAT: Final[int] = 5  # use best of repeated runs to reduce noise
+
+
+def loop_decode(
+    decoder: BMSdecoder, frames: dict[int, bytearray], offset: int = 0
+) -> BMSsample:
+    """Decode frames field by field from byte slices (reference)."""
+    result: BMSsample = {}
+    for dp in decoder:
+        result[dp.key] = dp.fct(
+            int.from_bytes(
+                frames[dp.idx][dp.pos + offset : dp.pos + offset + dp.size],
+                byteorder=decoder.byteorder,
+                signed=dp.signed,
+            )
+        )
+    return result
+
+
+def decoders() -> list[tuple[str, BMSdecoder]]:
+    """Return all frame decoders defined by the BMS plugins."""
+    result: list[tuple[str, BMSdecoder]] = []
+    for module in pkgutil.iter_modules(plugins.__path__):
+        if not module.name.endswith("_bms"):
+            continue
+        bms_cls = importlib.import_module(f"{plugins.__name__}.{module.name}").BMS
+        result.extend(
+            (f"{module.name}.{name}", attr)
+            for name, attr in vars(bms_cls).items()
+            if isinstance(attr, BMSdecoder)
+        )
+    return sorted(result)
+
+
+def main() -> None:
+    """Print time per decoded frame set for both implementations and the speedup."""
+    rnd: Final[random.Random] = random.Random(0)
+    print(
+        f"{'decoder':<32}{'fields':>7}{'loop [us]':>12}{'struct [us]':>13}{'speedup':>9}"
+    )
+    for name, decoder in decoders():
+        frames: dict[int, bytearray] = {
+            dp.idx: bytearray(rnd.randbytes(max(f.pos + f.size for f in decoder)))
+            for dp in decoder
+        }
+        assert loop_decode(decoder, frames) == decoder.decode(frames), (
+            f"{name} result mismatch"
+        )
+        t_ref: float = min(
+            repeat(partial(loop_decode, decoder, frames), number=ROUNDS, repeat=REPEAT)
+        )
+        t_new: float = min(
+            repeat(partial(decoder.decode, frames), number=ROUNDS, repeat=REPEAT)
+        )
+        print(
+            f"{name:<32}{len(decoder):>7}{t_ref / ROUNDS * 1e6:>12.2f}"
+            f"{t_new / ROUNDS * 1e6:>13.2f}{t_ref / t_new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
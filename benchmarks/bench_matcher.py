@@ -0,0 +1,118 @@
+"""Benchmark BMS type detection of advertisements with the matcher index.
+
+The advertisements emulate a crowded place (marina, RV park): few BMS among many
+other Bluetooth devices. The reference checks all BMS types in order and builds
+their matchers on each call, as the config flow did before the matcher index.
+"""
+
+from collections.abc import Callable
+from functools import partial
+import importlib
+import random
+from timeit import repeat
+from types import ModuleType
+from typing import Final
+
+from home_assistant_bluetooth import BluetoothServiceInfoBleak
+
+from custom_components.bms_ble.const import BMS_TYPES
+from custom_components.bms_ble.plugins.basebms import BMSmatcher
+from homeassistant.components.bluetooth.match import ble_device_matches
+from homeassistant.loader import BluetoothMatcherOptional
+from tests.advertisement_data import ADVERTISEMENTS
+from tests.bluetooth import generate_advertisement_data, generate_ble_device
+
+DEVICES: Final[list[int]] = [10, 100, 500]
+REPEAT: Final[int] = 5  # use best of repeated runs to reduce noise
+PLUGINS: Final[dict[str, ModuleType]] = {
+    bms_type: importlib.import_module(f"custom_components.bms_ble.plugins.{bms_type}")
+    for bms_type in BMS_TYPES
+}
+
+
+def service_infos(count: int, seed: int = 0) -> list[BluetoothServiceInfoBleak]:
+    """Return advertisements of count devices, one in ten is a BMS."""
+    rnd: Final[random.Random] = random.Random(seed)
+    result: list[BluetoothServiceInfoBleak] = []
+    for idx in range(count):
+        adv = (
+            rnd.choice(ADVERTISEMENTS)[0]
+            if idx % 10 == 0
+            else generate_advertisement_data(
+                local_name=f"Device-{rnd.randrange(1 << 16):04X}",
+                manufacturer_data={rnd.choice((0x004C, 0x0006, 0x0075)): b"\x01"},
+                service_uuids=[
+                    f"0000{rnd.randrange(1 << 16):04x}-0000-1000-8000-00805f9b34fb"
+                ],
+            )
+        )
+        result.append(
+            BluetoothServiceInfoBleak.from_scan(
+                device=generate_ble_device(
+                    address=f"cc:cc:cc:cc:{idx >> 8:02x}:{idx & 0xFF:02x}",
+                    name="MockBLEDevice",
+                ),
+                advertisement_data=adv,
+                source="bench_matcher",
+                monotonic_time=0.0,
+                connectable=True,
+            )
+        )
+    return result
+
+
+def ref_supported(service_info: BluetoothServiceInfoBleak) -> str | None:
+    """Return BMS type of the advertisement checking all types (reference)."""
+    for bms_type, plugin in PLUGINS.items():
+        for matcher_dict in plugin.BMS.matcher_dict_list():
+            if ble_device_matches(
+                BluetoothMatcherOptional(**matcher_dict), service_info
+            ):
+                return bms_type
+    return None
+
+
+def supported(
+    matcher: BMSmatcher, service_info: BluetoothServiceInfoBleak
+) -> str | None:
+    """Return BMS type of the advertisement checking the indexed candidates."""
+    for bms_type in matcher.candidates(service_info):
+        if PLUGINS[bms_type].BMS.supported(service_info):
+            return bms_type
+    return None
+
+
+def scan(
+    detect: Callable[[BluetoothServiceInfoBleak], str | None],
+    infos: list[BluetoothServiceInfoBleak],
+) -> list[str | None]:
+    """Return the detected BMS types of all advertisements."""
+    return [detect(info) for info in infos]
+
+
+def main() -> None:
+    """Print time per scan of all devices for both implementations and the speedup."""
+    matcher: Final[BMSmatcher] = BMSmatcher(
+        (bms_type, plugin.BMS.matcher_dict_list())
+        for bms_type, plugin in PLUGINS.items()
+    )
+    print(f"{'devices':>8}{'all types [ms]':>16}{'index [ms]':>12}{'speedup':>9}")
+    for count in DEVICES:
+        infos: list[BluetoothServiceInfoBleak] = service_infos(count)
+        detect: Callable[[BluetoothServiceInfoBleak], str | None] = partial(
+            supported, matcher
+        )
+        assert scan(ref_supported, infos) == scan(detect, infos), "result mismatch"
+        t_ref: float = min(
+            repeat(partial(scan, ref_supported, infos), number=1, repeat=REPEAT)
+        )
+        t_new: float = min(
+            repeat(partial(scan, detect, infos), number=1, repeat=REPEAT)
+        )
+        print(
+            f"{count:>8}{t_ref * 1e3:>16.2f}{t_new * 1e3:>12.2f}{t_ref / t_new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
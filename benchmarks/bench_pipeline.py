@@ -0,0 +1,93 @@
+"""Benchmark pipelined requests against one request per round trip on a simulated link.
+
+The link delays each direction by half the round trip time, the BMS answers its
+requests in order and needs a fixed time to process each one.
+"""
+
+import asyncio
+from collections.abc import Buffer
+from time import perf_counter
+from typing import Final
+from uuid import UUID
+
+from bleak.backends.characteristic import BleakGATTCharacteristic
+
+from custom_components.bms_ble.plugins import basebms
+from tests.conftest import MockBleakClient, MockBMS
+
+RTT: Final[float] = 0.03  # BLE round trip time (connection interval) [s]
+PROC_TIME: Final[float] = 0.005  # BMS processing time per request [s]
+REQUESTS: Final[list[int]] = [3, 7, 16, 32]  # 32: Seplos V3 with 16 packs
+REPEAT: Final[int] = 3  # use best of repeated runs to reduce noise
+
+
+class LatencyBleakClient(MockBleakClient):
+    """Emulate a BMS that answers requests in order over a link with latency."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize the time the BMS is busy until."""
+        super().__init__(*args, **kwargs)
+        self._busy: float = 0
+
+    async def write_gatt_char(
+        self,
+        char_specifier: BleakGATTCharacteristic | int | str | UUID,
+        data: Buffer,
+        response: bool | None = None,
+    ) -> None:
+        """Schedule the reply to the request."""
+        loop: Final[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        self._busy = max(loop.time() + RTT / 2, self._busy) + PROC_TIME
+        assert self._notify_callback is not None
+        loop.call_at(
+            self._busy + RTT / 2, self._notify_callback, "rx_char", bytearray(data)
+        )
+
+
+class LatencyBMS(MockBMS):
+    """Mock BMS matching replies by their first byte."""
+
+    def _notification_handler(
+        self, _sender: BleakGATTCharacteristic, data: bytearray
+    ) -> None:
+        self._set_reply(data[0], bytes(data))
+
+
+async def sequential(bms: basebms.BaseBMS, requests: dict[int, bytes]) -> None:
+    """Send one request per round trip (reference)."""
+    for key, request in requests.items():
+        bms._replies = {key: asyncio.get_running_loop().create_future()}
+        await bms._await_reply(request)
+
+
+async def pipelined(bms: basebms.BaseBMS, requests: dict[int, bytes]) -> None:
+    """Send requests with the default window of requests awaiting their reply."""
+    await bms._await_replies(requests)
+
+
+async def measure() -> None:
+    """Print time per update for both implementations and the speedup."""
+    basebms.BleakClient = LatencyBleakClient  # type: ignore[misc]
+    bms: Final[LatencyBMS] = LatencyBMS()
+    await bms._connect()
+    print(f"{'requests':>9}{'sequential [ms]':>17}{'pipelined [ms]':>16}{'speedup':>9}")
+    for count in REQUESTS:
+        requests: dict[int, bytes] = {idx: bytes([idx]) for idx in range(count)}
+        times: dict[str, float] = {}
+        for impl in (sequential, pipelined):
+            runs: list[float] = []
+            for _ in range(REPEAT):
+                start: float = perf_counter()
+                await impl(bms, requests)
+                runs.append(perf_counter() - start)
+            times[impl.__name__] = min(runs)
+        print(
+            f"{count:>9}{times['sequential'] * 1e3:>17.1f}"
+            f"{times['pipelined'] * 1e3:>16.1f}"
+            f"{times['sequential'] / times['pipelined']:>8.1f}x"
+        )
+    await bms.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(measure())
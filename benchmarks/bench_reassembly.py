@@ -0,0 +1,193 @@
+"""Benchmark frame reassembly with BMSbuffer against per-fragment bytearray handling.
+
+The fragment streams are recorded from the mock BLE clients of the plugin tests.
+"""
+
+import asyncio
+from collections.abc import Callable
+from functools import partial
+from timeit import repeat
+from typing import Final, NamedTuple
+
+from custom_components.bms_ble.plugins import (
+    cbtpwr_vb_bms,
+    jbd_bms,
+    jikong_bms,
+    seplos_bms,
+    tdt_bms,
+)
+from custom_components.bms_ble.plugins.basebms import BMSbuffer
+from tests.bluetooth import generate_ble_device
+from tests.conftest import MockBleakClient
+from tests.test_cbtpwr_vb_bms import MockCBTpwrVBBleakClient
+from tests.test_ej_bms import MockEJBleakClient
+from tests.test_jbd_bms import MockJBDBleakClient
+from tests.test_jikong_bms import _PROTO_DEFS, MockJikongBleakClient
+from tests.test_seplos_bms import MockSeplosBleakClient
+from tests.test_tdt_bms import MockTDTBleakClient
+
+ROUNDS: Final[int] = 10000
+REPEAT: Final[int] = 5  # use best of repeated runs to reduce noise
+_AT_MSG: Final[bytes] = b"AT\r\n"  # BLE module message, filtered by the plugins
+
+
+class Replay(NamedTuple):
+    """Recording setup and frame boundary detection of a BMS protocol."""
+
+    client: type[MockBleakClient]
+    char: int | str  # characteristic the requests are written to
+    requests: list[bytes]
+    buffer: Callable[[], BMSbuffer]  # reassembly buffer setup of the plugin
+    start: Callable[[bytes], bool]  # fragment starts a new frame (reference)
+    size: Callable[[bytearray], int]  # length of a completed frame, else 0 (reference)
+
+
+class _JikongReplay(MockJikongBleakClient):
+    _FRAME = _PROTO_DEFS["JK02_32S"]
+
+
+REPLAYS: Final[dict[str, Replay]] = {
+    "cbtpwr_vb": Replay(
+        MockCBTpwrVBBleakClient,
+        "ffe9",
+        [cbtpwr_vb_bms.BMS._cmd(0x42), cbtpwr_vb_bms.BMS._cmd(0x81, 1, b"\x01\x00")],
+        partial(BMSbuffer, 0x1000, head=b"~", tail=0x0D, slots=1),
+        lambda frag: len(frag) > 13 and frag.startswith(b"~"),
+        lambda frame: len(frame) if frame.endswith(b"\r") else 0,
+    ),
+    "ej": Replay(
+        MockEJBleakClient,
+        "6e400002-b5a3-f393-e0a9-e50e24dcca9e",
+        [b":000250000E03~", b":001031000E05~"],
+        partial(BMSbuffer, 0x200, head=b":", tail=0x7E, slots=1),
+        lambda frag: frag.startswith(b":"),
+        lambda frame: len(frame) if frame.endswith(b"~") else 0,
+    ),
+    "jbd": Replay(
+        MockJBDBleakClient,
+        "ff02",
+        [jbd_bms.BMS._cmd(b"\x03"), jbd_bms.BMS._cmd(b"\x04")],
+        partial(BMSbuffer, 7 + 0xFF, head=b"\xdd", len_pos=3, len_add=7),
+        lambda frag: frag.startswith(b"\xdd"),
+        lambda frame: (
+            size if len(frame) >= 7 and len(frame) >= (size := 7 + frame[3]) else 0
+        ),
+    ),
+    "jikong": Replay(
+        _JikongReplay,
+        3,
+        [jikong_bms.BMS._cmd(b"\x96")],
+        partial(BMSbuffer, 300, head=jikong_bms.BMS.HEAD_RSP),
+        lambda frag: frag.startswith(jikong_bms.BMS.HEAD_RSP),
+        lambda frame: 300 if len(frame) >= 300 else 0,
+    ),
+    "seplos": Replay(
+        MockSeplosBleakClient,
+        "fff2",
+        [seplos_bms.BMS._cmd(0x0, *block) for block in seplos_bms.BMS.QUERY.values()],
+        partial(BMSbuffer, 3 + 0xFF + 2, len_pos=2, len_add=5, slots=4),
+        lambda frag: len(frag) > 5 and frag[1] in (0x01, 0x04) and frag[2] >= 5,
+        lambda frame: (
+            size if len(frame) >= 3 and len(frame) >= (size := frame[2] + 5) else 0
+        ),
+    ),
+    "tdt": Replay(
+        MockTDTBleakClient,
+        "fff2",
+        [tdt_bms.BMS._cmd(cmd) for cmd in tdt_bms.BMS._CMDS],
+        partial(
+            BMSbuffer, 0x200, head=b"\x7e", len_pos=6, len_size=2, len_add=11, slots=3
+        ),
+        lambda frag: len(frag) > 10 and frag[0] == 0x7E,
+        lambda frame: (
+            size
+            if len(frame) >= 10
+            and len(frame) >= (size := 11 + int.from_bytes(frame[6:8]))
+            else 0
+        ),
+    ),
+}
+
+
+async def record(replay: Replay) -> list[bytes]:
+    """Return the notification fragments the mock client sends for the requests."""
+    fragments: list[bytes] = []
+    client: Final[MockBleakClient] = replay.client(
+        generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEDevice"), None
+    )
+    client._connected = True
+    client._notify_callback = lambda _sender, data: fragments.append(
+        bytes(data).removeprefix(_AT_MSG)
+    )
+    for request in replay.requests:
+        await client.write_gatt_char(replay.char, request)
+    return [fragment for fragment in fragments if fragment]
+
+
+def ref_reassemble(
+    replay: Replay, fragments: list[bytes], sink: Callable[[bytearray], None]
+) -> None:
+    """Reassemble frames in a bytearray that is replaced for each frame (reference)."""
+    data: bytearray = bytearray()
+    for fragment in fragments:
+        if replay.start(fragment):
+            data = bytearray()
+        data += fragment
+        if size := replay.size(data):
+            del data[size:]
+            sink(data)
+            data = bytearray()
+
+
+def buf_reassemble(
+    buf: BMSbuffer, fragments: list[bytes], sink: Callable[[memoryview], None]
+) -> None:
+    """Reassemble frames in the preallocated buffer slots."""
+    for fragment in fragments:
+        if (frame := buf.feed(fragment)) is not None:
+            sink(frame)
+            buf.keep()
+
+
+def store(frames: list[bytes], frame: bytearray | memoryview) -> None:
+    """Store a copy of the frame, as buffer slots are reused."""
+    frames.append(bytes(frame))
+
+
+def main() -> None:
+    """Print time per fragment stream for both implementations and the speedup."""
+    print(
+        f"{'plugin':<12}{'frags':>6}{'frames':>7}{'bytearray [us]':>16}"
+        f"{'buffer [us]':>13}{'speedup':>9}"
+    )
+    for name, replay in REPLAYS.items():
+        fragments: list[bytes] = asyncio.run(record(replay))
+        buf: BMSbuffer = replay.buffer()
+        ref_frames: list[bytes] = []
+        buf_frames: list[bytes] = []
+        ref_reassemble(replay, fragments, partial(store, ref_frames))
+        buf_reassemble(buf, fragments, partial(store, buf_frames))
+        assert ref_frames and ref_frames == buf_frames, f"{name} result mismatch"
+        t_ref: float = min(
+            repeat(
+                partial(ref_reassemble, replay, fragments, lambda _frame: None),
+                number=ROUNDS,
+                repeat=REPEAT,
+            )
+        )
+        t_new: float = min(
+            repeat(
+                partial(buf_reassemble, buf, fragments, lambda _frame: None),
+                number=ROUNDS,
+                repeat=REPEAT,
+            )
+        )
+        print(
+            f"{name:<12}{len(fragments):>6}{len(ref_frames):>7}"
+            f"{t_ref / ROUNDS * 1e6:>16.2f}{t_new / ROUNDS * 1e6:>13.2f}"
+            f"{t_ref / t_new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
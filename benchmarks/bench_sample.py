@@ -0,0 +1,79 @@
+"""Benchmark memory and change detection of compact samples against sample dicts.
+
+Change detection compares the new sample with the last one, which is the costly
+case if nothing changed (coordinator with always_update=False).
+"""
+
+from functools import partial
+import random
+from timeit import repeat
+import tracemalloc
+from typing import Any, Final
+
+from custom_components.bms_ble.plugins.basebms import BMScompact, BMSsample
+
+CELL_COUNTS: Final[list[int]] = [16, 64, 256, 1024]
+ROUNDS: Final[int] = 2000
+REPEAT: Final[int] = 5  # use best of repeated runs to reduce noise
+
+
+def sample(cells: int, seed: int = 0) -> BMSsample:
+    """Return a sample of a battery bank with packs of 16 cells."""
+    rnd: Final[random.Random] = random.Random(seed)
+    packs: Final[int] = max(cells // 16, 1)
+    return {
+        "voltage": 53.2,
+        "current": -12.5,
+        "power": -665.0,
+        "battery_level": 73,
+        "cycle_charge": 204.4,
+        "cycles": 12,
+        "delta_voltage": 0.015,
+        "problem": False,
+        "cell_voltages": [round(rnd.uniform(3.2, 3.4), 3) for _ in range(cells)],
+        "temp_values": [round(rnd.uniform(15, 30), 1) for _ in range(cells // 4)],
+        "pack_voltages": [53.2] * packs,
+        "pack_currents": [-12.5 / packs] * packs,
+        "pack_battery_levels": [73.0] * packs,
+        "pack_cycles": [12] * packs,
+    }
+
+
+def size(create: partial[Any]) -> int:
+    """Return the memory [bytes] allocated by the created object."""
+    tracemalloc.start()
+    obj = create()
+    used: Final[int] = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return used
+
+
+def main() -> None:
+    """Print memory and comparison time per sample for both representations."""
+    print(
+        f"{'cells':>6}{'dict [kB]':>11}{'compact [kB]':>14}"
+        f"{'dict eq [us]':>14}{'compact eq [us]':>17}{'speedup':>9}"
+    )
+    for cells in CELL_COUNTS:
+        ref: BMSsample = sample(cells)
+        last: BMSsample = sample(cells)
+        new: BMScompact = BMScompact(ref)
+        new_last: BMScompact = BMScompact(last)
+        assert new == ref and (ref == last) == (new == new_last), "result mismatch"
+        t_ref: float = min(
+            repeat(partial(ref.__eq__, last), number=ROUNDS, repeat=REPEAT)
+        )
+        t_new: float = min(
+            repeat(partial(new.__eq__, new_last), number=ROUNDS, repeat=REPEAT)
+        )
+        print(
+            f"{cells:>6}{size(partial(sample, cells)) / 1024:>11.1f}"
+            f"{size(partial(BMScompact, ref)) / 1024:>14.1f}"
+            f"{t_ref / ROUNDS * 1e6:>14.2f}{t_new / ROUNDS * 1e6:>17.2f}"
+            f"{t_ref / t_new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark startup of config entries with one against per-entity entity adding.
+
+The entries use the dummy BMS, Bluetooth is replaced by mocks. The reference
+adds the entities of the sensor and binary sensor platforms one by one, like the
+setup did before the entities were added in one call per platform. The first
+updates are not staggered across the update interval, which would dominate.
+"""
+
+import asyncio
+from collections.abc import Callable, Iterable
+from time import perf_counter
+from typing import Any, Final
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.bms_ble import binary_sensor, scheduler, sensor
+from custom_components.bms_ble.const import DOMAIN
+from custom_components.bms_ble.plugins import basebms
+from homeassistant import loader
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+from tests.bluetooth import generate_ble_device
+from tests.conftest import MockBleakClient
+
+ENTRIES: Final[list[int]] = [1, 10, 50]
+
+
+def per_entity(setup: Callable[..., Any]) -> Callable[..., Any]:
+    """Return platform setup that adds the entities one by one (reference)."""
+
+    async def _setup(
+        hass: HomeAssistant,
+        entry: MockConfigEntry,
+        async_add_entities: Callable[[Iterable[Entity]], None],
+    ) -> None:
+        def _add(entities: Iterable[Entity]) -> None:
+            for entity in entities:
+                async_add_entities([entity])
+
+        await setup(hass, entry, _add)
+
+    return _setup
+
+
+async def startup(count: int) -> float:
+    """Return the time [s] to set up count BMS config entries."""
+    async with async_test_home_assistant() as hass:
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)  # enable custom integrations
+        hass.config.components.add("bluetooth")  # replaced by mocks
+        entries: Final[list[MockConfigEntry]] = [
+            MockConfigEntry(
+                domain=DOMAIN,
+                version=1,
+                minor_version=0,
+                unique_id=f"cc:cc:cc:cc:{idx >> 8:02x}:{idx & 0xFF:02x}",
+                data={"type": "custom_components.bms_ble.plugins.dummy_bms"},
+                title=f"dummy_bms_{idx}",
+            )
+            for idx in range(count)
+        ]
+        for entry in entries:
+            entry.add_to_hass(hass)
+
+        start: Final[float] = perf_counter()
+        await asyncio.gather(
+            *(hass.config_entries.async_setup(entry.entry_id) for entry in entries)
+        )
+        await hass.async_block_till_done()
+        elapsed: Final[float] = perf_counter() - start
+
+        assert all(entry.runtime_data.last_update_success for entry in entries)
+        await hass.async_stop(force=True)
+    return elapsed
+
+
+async def measure() -> None:
+    """Print startup time for both implementations and the speedup."""
+    print(f"{'entries':>8}{'per entity [ms]':>17}{'batched [ms]':>14}{'speedup':>9}")
+    for count in ENTRIES:
+        with (
+            patch.object(
+                sensor, "async_setup_entry", per_entity(sensor.async_setup_entry)
+            ),
+            patch.object(
+                binary_sensor,
+                "async_setup_entry",
+                per_entity(binary_sensor.async_setup_entry),
+            ),
+        ):
+            t_ref: float = await startup(count)
+        t_new: float = await startup(count)
+        print(
+            f"{count:>8}{t_ref * 1e3:>17.1f}{t_new * 1e3:>14.1f}{t_ref / t_new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    with (
+        patch.object(basebms, "BleakClient", MockBleakClient),
+        patch.object(scheduler, "UPDATE_INTERVAL", 0),
+        patch(
+            "custom_components.bms_ble.async_ble_device_from_address",
+            lambda _hass, address, _connectable: generate_ble_device(
+                address, "dummy_bms"
+            ),
+        ),
+        patch(
+            "custom_components.bms_ble.coordinator.async_last_service_info",
+            lambda *_args, **_kwargs: None,
+        ),
+    ):
+        asyncio.run(measure())
@@ -0,0 +1,119 @@
+"""Benchmark entity state writes per hour of a 16 cell battery.
+
+The samples emulate a battery under varying load: cell voltages move by 1 mV,
+temperature and state of charge change slowly. Every value change of a sample
+used to write the state of all entities of the device. With per-value change
+detection only entities rendering a changed value write their state, deadbands
+further suppress writes of changes below the threshold of the sensor.
+"""
+
+import random
+from typing import Final
+
+from custom_components.bms_ble.binary_sensor import BINARY_SENSOR_TYPES
+from custom_components.bms_ble.const import ATTR_LQ, ATTR_RSSI, UPDATE_INTERVAL
+from custom_components.bms_ble.plugins.basebms import BaseBMS, BMSsample, changed_keys
+from custom_components.bms_ble.sensor import SENSOR_TYPES, BmsEntityDescription
+
+CELLS: Final[int] = 16
+UPDATES: Final[int] = 3600 // UPDATE_INTERVAL  # polls per hour
+CALC_VALUES: Final[frozenset] = frozenset(
+    {"voltage", "delta_voltage", "power", "battery_charging", "runtime"}
+)
+
+
+def samples(seed: int = 0) -> list[BMSsample]:
+    """Return the samples of one hour of polling."""
+    rnd: Final[random.Random] = random.Random(seed)
+    cells: list[float] = [3.3] * CELLS
+    temp: float = 21.0
+    level: int = 80
+    result: list[BMSsample] = []
+    for idx in range(UPDATES):
+        cells = [
+            round(cell + rnd.choice((-0.001, 0, 0.001)), 3)
+            if rnd.random() < 0.2
+            else cell
+            for cell in cells
+        ]
+        if idx % 10 == 9:  # temperature drifts slowly
+            temp = round(temp + rnd.choice((-0.1, 0.1)), 1)
+        if idx % 15 == 14:  # state of charge changes every few minutes
+            level -= 1
+        sample: BMSsample = {
+            "cell_voltages": cells,
+            "current": round(-rnd.uniform(4.5, 5.5), 1),
+            "temperature": temp,
+            "temp_values": [temp],
+            "battery_level": level,
+            "cycle_charge": level,
+            "cycles": 12,
+            "problem_code": 0,
+        }
+        BaseBMS._add_missing_values(sample, CALC_VALUES)
+        result.append(sample)
+    return result
+
+
+def suppress(
+    descr: BmsEntityDescription,
+    reported: tuple[float | None, int],
+    value: float | None,
+    now: int,
+) -> bool:
+    """Return true if the deadband suppresses the write (see BMSSensor)."""
+    last, t_reported = reported
+    return (
+        bool(descr.deadband or descr.deadband_pct)
+        and now - t_reported < descr.max_report_interval
+        and last is not None
+        and value is not None
+        and abs(value - last)
+        < max(descr.deadband, abs(last) * descr.deadband_pct / 100)
+    )
+
+
+def main() -> None:
+    """Print state writes per hour for device, per-value and deadband filtering."""
+    entities: Final[list[tuple[frozenset[str], BmsEntityDescription | None]]] = [
+        (
+            descr.attr_keys | {descr.key},
+            descr if isinstance(descr, BmsEntityDescription) else None,
+        )
+        for descr in (*SENSOR_TYPES, *BINARY_SENSOR_TYPES)
+        if descr.key not in (ATTR_LQ, ATTR_RSSI)  # not coordinator entities
+    ]
+    reported: Final[dict[int, tuple[float | None, int]]] = {}
+    writes_device: int = 0
+    writes_value: int = 0
+    writes_deadband: int = 0
+    last: BMSsample = {}
+    for update, sample in enumerate(samples()):
+        changed: frozenset[str] = changed_keys(last, sample)
+        last = sample
+        if not changed:
+            continue
+        writes_device += len(entities)
+        for idx, (keys, descr) in enumerate(entities):
+            if keys.isdisjoint(changed):
+                continue
+            writes_value += 1
+            if descr is not None:
+                value: float | None = descr.value_fn(sample)
+                now: int = update * UPDATE_INTERVAL
+                if suppress(descr, reported.get(idx, (None, 0)), value, now):
+                    continue
+                reported[idx] = (value, now)
+            writes_deadband += 1
+    print(
+        f"{'entities':>9}{'updates':>9}{'device writes':>15}{'value writes':>14}"
+        f"{'deadband writes':>17}"
+    )
+    print(
+        f"{len(entities):>9}{UPDATES:>9}{writes_device:>15}{writes_value:>14}"
+        f"{writes_deadband:>17}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark bulk register extraction against the former per-cell int.from_bytes loop."""
+
+from functools import partial
+import random
+from timeit import repeat
+from typing import Final
+
+from custom_components.bms_ble.plugins.basebms import scaled_values
+
+CELL_COUNTS: Final[list[int]] = [4, 16, 32, 256]  # 256: 16 Seplos packs, 16 cells each
+ROUNDS: Final[int] = 2000
+REPEAT: Final[int] = 5  # use best of repeated runs to reduce noise
+
+
+def loop_values(data: bytearray, start: int, count: int) -> list[float]:
+    """Return cell voltages register by register from byte slices (reference)."""
+    return [
+        int.from_bytes(data[start + idx * 2 : start + idx * 2 + 2], byteorder="big")
+        / 1000
+        for idx in range(count)
+    ]
+
+
+def main() -> None:
+    """Print time per frame for both implementations and the resulting speedup."""
+    rnd: Final[random.Random] = random.Random(0)
+    print(f"{'cells':>6}{'loop [us]':>12}{'bulk [us]':>12}{'speedup':>9}")
+    for cells in CELL_COUNTS:
+        frame = bytearray(rnd.randbytes(3 + 2 * cells))
+        assert loop_values(frame, 3, cells) == scaled_values(
+            frame, 3, cells, divider=1000
+        ), "result mismatch"
+        t_ref: float = min(
+            repeat(partial(loop_values, frame, 3, cells), number=ROUNDS, repeat=REPEAT)
+        )
+        t_new: float = min(
+            repeat(
+                partial(scaled_values, frame, 3, cells, divider=1000),
+                number=ROUNDS,
+                repeat=REPEAT,
+            )
+        )
+        print(
+            f"{cells:>6}{t_ref / ROUNDS * 1e6:>12.2f}{t_new / ROUNDS * 1e6:>12.2f}"
+            f"{t_ref / t_new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
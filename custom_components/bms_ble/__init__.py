@@ -1,21 +1,34 @@
 """The BLE Battery Management System integration."""
 
+from time import monotonic
 from types import ModuleType
-from typing import Final
+from typing import Final, TypeIs
 
 from bleak.backends.device import BLEDevice
 
 from homeassistant.components.bluetooth import async_ble_device_from_address
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.config_entries import (
+    SOURCE_IGNORE,
+    SOURCE_INTEGRATION_DISCOVERY,
+    ConfigEntry,
+)
+from homeassistant.const import CONF_DEVICES, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryError, ConfigEntryNotReady
-from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import (
+    config_validation as cv,
+    discovery_flow,
+    entity_registry as er,
+)
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, LOGGER
-from .coordinator import BTBmsCoordinator
+from .bank import BTBmsBank, async_get_bank, async_set_bank
+from .const import BANK_ID, DOMAIN, LOGGER
+from .coordinator import BTBmsCoordinator, bms_store
+from .plugins.basebms import BaseBMS
+from .services import async_setup_services
 
 PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
@@ -23,10 +36,30 @@ PLATFORMS: list[Platform] = [
     Platform.SWITCH,
 ]
 
+BANK_PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.SWITCH]
+
 type BTBmsConfigEntry = ConfigEntry[BTBmsCoordinator]
+type BTBmsBankConfigEntry = ConfigEntry[BTBmsBank]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, _config: ConfigType) -> bool:
+    """Set up the actions of the integration."""
+    async_setup_services(hass)
+    return True
+
 
+def _is_bank_entry(
+    entry: BTBmsConfigEntry | BTBmsBankConfigEntry,
+) -> TypeIs[BTBmsBankConfigEntry]:
+    """Return true if the config entry is the battery bank."""
+    return CONF_DEVICES in entry.data
 
-async def async_setup_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> bool:
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: BTBmsConfigEntry | BTBmsBankConfigEntry
+) -> bool:
     """Set up BT Battery Management System from a config entry."""
     LOGGER.debug("Setup of %s", repr(entry))
 
@@ -36,6 +69,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> boo
             translation_key="missing_unique_id",
         )
 
+    if _is_bank_entry(entry):
+        return await _async_setup_bank(hass, entry)
+
     # migrate old entries
     migrate_sensor_entities(hass, entry)
 
@@ -53,31 +89,93 @@ async def async_setup_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> boo
             },
         )
 
+    start: float = monotonic()
     plugin: ModuleType = await async_import_module(hass, entry.data["type"])
-    coordinator = BTBmsCoordinator(hass, ble_device, plugin.BMS(ble_device), entry)
-
-    # Query the device the first time, initialise coordinator.data
-    await coordinator.async_config_entry_first_refresh()
+    t_import: Final[float] = monotonic() - start
+    bms: Final[BaseBMS] = plugin.BMS(ble_device)
+    # close idle connections to share proxy slots, if updates are infrequent
+    bms.manage_connection()
+    coordinator = BTBmsCoordinator(hass, ble_device, bms, entry)
+    coordinator.record_startup("import", t_import)
+    # reuse write mode, response times and the sample from before restart
+    start = monotonic()
+    restored: Final[bool] = await coordinator.async_restore()
+    coordinator.record_startup("restore", monotonic() - start)
+
+    if not restored:
+        # Query the device the first time, initialise coordinator.data
+        await coordinator.async_config_entry_first_refresh()
 
     # Insert the coordinator in the global registry
     hass.data.setdefault(DOMAIN, {})
     entry.runtime_data = coordinator
 
+    start = monotonic()
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    coordinator.record_startup("entity_setup", monotonic() - start)
+
+    if restored:
+        # fast start: entities show the restored sample until the first update
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_refresh(),
+            f"{DOMAIN} first refresh {entry.unique_id}",
+        )
+    LOGGER.debug("%s: startup times %s", entry.unique_id, coordinator.startup_times)
 
+    if (bank := async_get_bank(hass)) is not None:
+        bank.attach(entry.unique_id, coordinator)
+    elif hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, BANK_ID) is None:
+        _async_offer_bank(hass)
+
+    return True
+
+
+async def _async_setup_bank(hass: HomeAssistant, entry: BTBmsBankConfigEntry) -> bool:
+    """Set up the battery bank aggregating the selected BMS."""
+    bank: Final[BTBmsBank] = BTBmsBank(hass, entry)
+    await bank.controller.async_restore()
+    entry.runtime_data = bank
+    async_set_bank(hass, bank)
+    await hass.config_entries.async_forward_entry_setups(entry, BANK_PLATFORMS)
     return True
 
 
-async def async_unload_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> bool:
+def _async_offer_bank(hass: HomeAssistant) -> None:
+    """Offer to set up a battery bank once more than one BMS is configured."""
+    if (
+        sum(
+            entry.source != SOURCE_IGNORE
+            for entry in hass.config_entries.async_entries(DOMAIN)
+        )
+        > 1
+    ):
+        discovery_flow.async_create_flow(
+            hass, DOMAIN, context={"source": SOURCE_INTEGRATION_DISCOVERY}, data={}
+        )
+
+
+async def async_unload_entry(
+    hass: HomeAssistant, entry: BTBmsConfigEntry | BTBmsBankConfigEntry
+) -> bool:
     """Unload a config entry."""
+    if _is_bank_entry(entry):
+        async_set_bank(hass, None)
+    elif (bank := async_get_bank(hass)) is not None:
+        bank.detach(str(entry.unique_id))
     unload_ok: Final[bool] = await hass.config_entries.async_unload_platforms(
-        entry, PLATFORMS
+        entry, BANK_PLATFORMS if _is_bank_entry(entry) else PLATFORMS
     )
     LOGGER.debug("Unloaded config entry: %s, ok? %s!", entry.unique_id, str(unload_ok))
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> None:
+    """Remove persisted data of a config entry."""
+    await bms_store(hass, entry.entry_id).async_remove()
+
+
 async def async_migrate_entry(
     hass: HomeAssistant, config_entry: BTBmsConfigEntry
 ) -> bool:
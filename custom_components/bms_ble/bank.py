@@ -0,0 +1,196 @@
+"""Aggregate the BMS coordinators of a battery bank."""
+
+from collections.abc import Mapping
+from datetime import datetime
+from functools import partial
+from statistics import fmean
+from typing import Any, Final
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import ATTR_BATTERY_LEVEL, CONF_DEVICES
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    ATTR_BATTERIES,
+    ATTR_CYCLE_CAP,
+    ATTR_DELTA_LEVEL,
+    ATTR_MAX_LEVEL,
+    ATTR_MIN_LEVEL,
+    ATTR_POWER,
+    BANK_ID,
+    DOMAIN,
+    LOGGER,
+)
+from .controller import BTBmsDischargeController
+from .coordinator import BTBmsCoordinator
+from .scheduler import ScheduleListeners
+
+type BankData = dict[str, int | float]
+
+_BANK: Final[str] = "bank"  # key in integration data
+_MEMBER_KEYS: Final[tuple[str, ...]] = (ATTR_BATTERY_LEVEL, ATTR_POWER, ATTR_CYCLE_CAP)
+
+
+class BTBmsBank(DataUpdateCoordinator[BankData]):
+    """Aggregate the values of the member BMS of a battery bank.
+
+    The bank does not poll. Each update of a member coordinator refreshes the kept
+    values of that member only, then the bank values are aggregated over the kept
+    values of all members and pushed to the bank entities. The discharge controller
+    of the bank is evaluated on each member update.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+        """Initialize battery bank of the devices selected in the config entry."""
+        super().__init__(
+            hass=hass,
+            logger=LOGGER,
+            name=config_entry.title,
+            always_update=False,  # only update when a bank value has changed
+            config_entry=config_entry,
+        )
+        self._addresses: Final[frozenset[str]] = frozenset(
+            config_entry.data[CONF_DEVICES]
+        )
+        self._members: Final[dict[str, BTBmsCoordinator]] = {}
+        self._unsub: Final[dict[str, tuple[CALLBACK_TYPE, ...]]] = {}
+        self._schedule: Final[ScheduleListeners] = ScheduleListeners()
+        self._values: Final[dict[str, dict[str, float]]] = {}  # address: values
+        self._controller: Final[BTBmsDischargeController] = BTBmsDischargeController(
+            hass, config_entry, self._members
+        )
+        self.data = {ATTR_BATTERIES: 0}
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, BANK_ID)},
+            entry_type=DeviceEntryType.SERVICE,
+            name=self.name,
+            model="Battery bank",
+        )
+
+    @property
+    def members(self) -> dict[str, BTBmsCoordinator]:
+        """Return the coordinators of the loaded members by device address."""
+        return self._members
+
+    @property
+    def controller(self) -> BTBmsDischargeController:
+        """Return the discharge balancing controller of the bank."""
+        return self._controller
+
+    @property
+    def next_update(self) -> datetime | None:
+        """Return the time of the next member update evaluated by the controller."""
+        return min(
+            (
+                next_update
+                for coordinator in self._members.values()
+                if (next_update := coordinator.next_update) is not None
+            ),
+            default=None,
+        )
+
+    @property
+    def schedule(self) -> ScheduleListeners:
+        """Return the listeners notified when a member update is scheduled."""
+        return self._schedule
+
+    @property
+    def levels(self) -> dict[str, float]:
+        """Return the battery level [%] of the members providing one by name."""
+        return {
+            self._members[address].name: values[ATTR_BATTERY_LEVEL]
+            for address, values in self._values.items()
+            if ATTR_BATTERY_LEVEL in values
+        }
+
+    @callback
+    def attach(self, address: str, coordinator: BTBmsCoordinator) -> None:
+        """Add the coordinator of a loaded BMS, if the device is a member."""
+        if address not in self._addresses or address in self._members:
+            return
+        LOGGER.debug("%s: adding member %s", self.name, coordinator.name)
+        self._members[address] = coordinator
+        self._unsub[address] = (
+            coordinator.async_add_listener(partial(self._async_member_update, address)),
+            coordinator.schedule.add(self._schedule.notify),
+        )
+        self._async_member_update(address)
+        self._schedule.notify()
+
+    @callback
+    def detach(self, address: str) -> None:
+        """Remove the coordinator of an unloaded BMS."""
+        if (unsub := self._unsub.pop(address, None)) is None:
+            return
+        for remove in unsub:
+            remove()
+        LOGGER.debug("%s: removing member %s", self.name, self._members[address].name)
+        del self._members[address]
+        self._values.pop(address, None)
+        self.async_set_updated_data(self._aggregate())
+        self._schedule.notify()
+
+    @callback
+    def _async_member_update(self, address: str) -> None:
+        """Keep the values of an updated member and aggregate the bank values."""
+        coordinator: Final[BTBmsCoordinator] = self._members[address]
+        if coordinator.last_update_success and coordinator.data:
+            data: Final[Mapping[str, Any]] = coordinator.data
+            self._values[address] = {
+                key: float(data[key])
+                for key in _MEMBER_KEYS
+                if data.get(key) is not None
+            }
+        else:  # stale values do not count for the bank
+            self._values.pop(address, None)
+        self.async_set_updated_data(self._aggregate())
+        self._controller.async_evaluate()
+
+    def _aggregate(self) -> BankData:
+        """Return the bank values aggregated over the kept member values."""
+        data: BankData = {ATTR_BATTERIES: len(self._values)}
+        if levels := [
+            values[ATTR_BATTERY_LEVEL]
+            for values in self._values.values()
+            if ATTR_BATTERY_LEVEL in values
+        ]:
+            data |= {
+                ATTR_BATTERY_LEVEL: round(fmean(levels), 1),
+                ATTR_MIN_LEVEL: min(levels),
+                ATTR_MAX_LEVEL: max(levels),
+                ATTR_DELTA_LEVEL: max(levels) - min(levels),
+            }
+        for key in (ATTR_POWER, ATTR_CYCLE_CAP):
+            if totals := [
+                values[key] for values in self._values.values() if key in values
+            ]:
+                data[key] = round(sum(totals), 3)
+        return data
+
+    async def async_shutdown(self) -> None:
+        """Shutdown battery bank and stop following the members."""
+        for address in list(self._unsub):
+            self.detach(address)
+        await super().async_shutdown()
+
+
+def async_get_bank(hass: HomeAssistant) -> BTBmsBank | None:
+    """Return the battery bank, if it is loaded."""
+    bank: Final[BTBmsBank | None] = hass.data.get(DOMAIN, {}).get(_BANK)
+    return bank
+
+
+def async_set_bank(hass: HomeAssistant, bank: BTBmsBank | None) -> None:
+    """Register the loaded battery bank and add the loaded member BMS to it."""
+    domain_data: Final[dict[str, BTBmsBank]] = hass.data.setdefault(DOMAIN, {})
+    if bank is None:
+        domain_data.pop(_BANK, None)
+        return
+    domain_data[_BANK] = bank
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.state is ConfigEntryState.LOADED and isinstance(
+            coordinator := entry.runtime_data, BTBmsCoordinator
+        ):
+            bank.attach(str(entry.unique_id), coordinator)
@@ -1,15 +1,16 @@
 """Support for BMS_BLE binary sensors."""
 
 from collections.abc import Callable
+from typing import Final
 
-from custom_components.bms_ble.plugins.basebms import BMSmode, BMSsample
+from custom_components.bms_ble.plugins.basebms import BMSdata, BMSmode
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
     BinarySensorEntityDescription,
 )
 from homeassistant.const import ATTR_BATTERY_CHARGING, EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -24,7 +25,8 @@ PARALLEL_UPDATES = 0
 class BmsBinaryEntityDescription(BinarySensorEntityDescription, frozen_or_thawed=True):
     """Describes BMS sensor entity."""
 
-    attr_fn: Callable[[BMSsample], dict[str, int | str]] | None = None
+    attr_fn: Callable[[BMSdata], dict[str, int | str]] | None = None
+    attr_keys: frozenset[str] = frozenset()  # BMS values used by attr_fn
 
 
 BINARY_SENSOR_TYPES: list[BmsBinaryEntityDescription] = [
@@ -37,6 +39,7 @@ BINARY_SENSOR_TYPES: list[BmsBinaryEntityDescription] = [
             if "battery_mode" in data
             else {}
         ),
+        attr_keys=frozenset({"battery_mode"}),
     ),
     # Removed ATTR_BATTERY_DISCHARGING_STATE - now handled by switch
     BmsBinaryEntityDescription(
@@ -49,6 +52,7 @@ BINARY_SENSOR_TYPES: list[BmsBinaryEntityDescription] = [
             if "problem_code" in data
             else {}
         ),
+        attr_keys=frozenset({"problem_code"}),
     ),
 ]
 
@@ -61,10 +65,10 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in Home Assistant."""
 
     bms: BTBmsCoordinator = config_entry.runtime_data
-    for descr in BINARY_SENSOR_TYPES:
-        async_add_entities(
-            [BMSBinarySensor(bms, descr, format_mac(config_entry.unique_id))]
-        )
+    mac: Final[str] = format_mac(config_entry.unique_id)
+    async_add_entities(
+        BMSBinarySensor(bms, descr, mac) for descr in BINARY_SENSOR_TYPES
+    )
 
 
 class BMSBinarySensor(CoordinatorEntity[BTBmsCoordinator], BinarySensorEntity):  # type: ignore[reportIncompatibleMethodOverride]
@@ -83,8 +87,20 @@ class BMSBinarySensor(CoordinatorEntity[BTBmsCoordinator], BinarySensorEntity):
         self._attr_device_info = bms.device_info
         self._attr_has_entity_name = True
         self.entity_description: BmsBinaryEntityDescription = descr  # type: ignore[reportIncompatibleVariableOverride]
+        self._keys: Final[frozenset[str]] = descr.attr_keys | {descr.key}
+        self._was_available: bool | None = None
         super().__init__(bms)
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if availability or the rendered values changed."""
+        if self.available == self._was_available and not self.coordinator.changed(
+            self._keys
+        ):
+            return
+        self._was_available = self.available
+        super()._handle_coordinator_update()
+
     @property
     def is_on(self) -> bool | None:  # type: ignore[reportIncompatibleVariableOverride]
         """Handle updated data from the coordinator."""
@@ -12,7 +12,14 @@ from homeassistant.components.bluetooth import (
     async_discovered_service_info,
 )
 from homeassistant.config_entries import ConfigFlowResult
-from homeassistant.const import CONF_ADDRESS, CONF_ID, CONF_MODEL, CONF_NAME
+from homeassistant.const import (
+    CONF_ADDRESS,
+    CONF_DEVICES,
+    CONF_ID,
+    CONF_MODEL,
+    CONF_NAME,
+)
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.importlib import async_import_module
 from homeassistant.helpers.selector import (
@@ -20,8 +27,27 @@ from homeassistant.helpers.selector import (
     SelectSelector,
     SelectSelectorConfig,
 )
+from homeassistant.helpers.typing import DiscoveryInfoType
+
+from .const import BANK_ID, BMS_MATCHERS, BMS_TYPES, DOMAIN, LOGGER
+from .plugins.basebms import BMSmatcher
 
-from .const import BMS_TYPES, DOMAIN, LOGGER
+_MATCHER: Final[str] = "matcher"  # key in integration data
+
+
+def _get_matcher(hass: HomeAssistant) -> BMSmatcher:
+    """Return the advertisement matcher index of all BMS types, built once.
+
+    The index is built from the static matchers, so no plugin is imported for it.
+    """
+    domain_data: Final[dict[str, Any]] = hass.data.setdefault(DOMAIN, {})
+    matcher: BMSmatcher | None = domain_data.get(_MATCHER)
+    if matcher is None:
+        matcher = domain_data[_MATCHER] = BMSmatcher(
+            (f"{__package__}.plugins.{bms_type}", BMS_MATCHERS[bms_type])
+            for bms_type in BMS_TYPES
+        )
+    return matcher
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -52,10 +78,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> str | None:
         """Check if device is supported by an available BMS class."""
-        for bms_type in BMS_TYPES:
-            bms_plugin: ModuleType = await async_import_module(
-                self.hass, f"custom_components.bms_ble.plugins.{bms_type}"
-            )
+        matcher: Final[BMSmatcher] = _get_matcher(self.hass)
+        for bms_type in matcher.candidates(discovery_info):
+            bms_plugin: ModuleType = await async_import_module(self.hass, bms_type)
             try:
                 if bms_plugin.BMS.supported(discovery_info):
                     LOGGER.debug(
@@ -114,6 +139,50 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders=self.context.get("title_placeholders"),
         )
 
+    async def async_step_integration_discovery(
+        self, _discovery_info: DiscoveryInfoType
+    ) -> ConfigFlowResult:
+        """Handle a flow offering a battery bank for the configured BMS."""
+        await self.async_set_unique_id(BANK_ID)
+        self._abort_if_unique_id_configured()
+        self.context["title_placeholders"] = {
+            CONF_NAME: "Battery bank",
+            CONF_ID: BANK_ID,
+            CONF_MODEL: "BANK",
+        }
+        return await self.async_step_bank()
+
+    async def async_step_bank(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Select the BMS aggregated by the battery bank."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title="Battery bank",
+                data={CONF_DEVICES: list(user_input[CONF_DEVICES])},
+            )
+
+        devices: Final[list[SelectOptionDict]] = [
+            SelectOptionDict(value=entry.unique_id, label=entry.title)
+            for entry in self._async_current_entries(include_ignore=False)
+            if entry.unique_id is not None and CONF_DEVICES not in entry.data
+        ]
+        if len(devices) < 2:
+            return self.async_abort(reason="no_bank_devices")
+
+        return self.async_show_form(
+            step_id="bank",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_DEVICES, default=[dev["value"] for dev in devices]
+                    ): SelectSelector(
+                        SelectSelectorConfig(options=devices, multiple=True)
+                    )
+                }
+            ),
+        )
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -10,6 +10,8 @@ from homeassistant.const import (  # noqa: F401  # pylint: disable=unused-import
     ATTR_VOLTAGE,
 )
 
+from .plugins.basebms import AdvertisementPattern
+
 BMS_TYPES: Final[list[str]] = [
     "abc_bms",
     "cbtpwr_bms",
@@ -30,20 +32,382 @@ BMS_TYPES: Final[list[str]] = [
     "dpwrcore_bms",  # only name filter
     "felicity_bms",
 ]  # available BMS types
+BMS_MATCHERS: Final[dict[str, list[AdvertisementPattern]]] = {
+    "abc_bms": [
+        {
+            "local_name": "ABC-*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SOK-*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+    ],
+    "cbtpwr_bms": [
+        {"service_uuid": "0000ffe5-0000-1000-8000-00805f9b34fb", "connectable": True},
+        {
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 0,
+            "connectable": True,
+        },
+        {
+            "service_uuid": "000003c1-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 21330,
+            "connectable": True,
+        },
+    ],
+    "cbtpwr_vb_bms": [
+        {
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 16963,
+            "connectable": True,
+        },
+    ],
+    "daly_bms": [
+        {
+            "local_name": "DL-*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {"manufacturer_id": 258, "connectable": True},
+        {"manufacturer_id": 260, "connectable": True},
+        {"manufacturer_id": 770, "connectable": True},
+        {"manufacturer_id": 771, "connectable": True},
+    ],
+    "ecoworthy_bms": [
+        {"local_name": "ECO-WORTHY*", "manufacturer_id": 15996, "connectable": True},
+        {"local_name": "ECO-WORTHY*", "manufacturer_id": 47912, "connectable": True},
+        {"local_name": "ECO-WORTHY*", "manufacturer_id": 49844, "connectable": True},
+        {
+            "local_name": "DCHOUSE*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "ECO-WORTHY*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+    ],
+    "ective_bms": [
+        {
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+            "manufacturer_id": 0,
+        },
+        {
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+            "manufacturer_id": 65535,
+        },
+    ],
+    "ej_bms": [
+        {"local_name": "L-12V???AH-*", "connectable": True},
+        {"local_name": "LT-12V-*", "connectable": True},
+        {"local_name": "V-12V???Ah-*", "connectable": True},
+        {"local_name": "libatt*", "manufacturer_id": 21320, "connectable": True},
+        {"local_name": "SV12V*", "manufacturer_id": 33384, "connectable": True},
+        {"local_name": "LT-*", "manufacturer_id": 33384, "connectable": True},
+        {"local_name": "LT-*", "manufacturer_id": 22618, "connectable": True},
+    ],
+    "jbd_bms": [
+        {
+            "local_name": "JBD-*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SP0?S*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SP1?S*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SP2?S*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "AP2?S*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "GJ-*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SX1*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "DP04S*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "ECO-LFP*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "121?0*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "12200*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "12300*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "LT40AH",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "PKT*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "gokwh*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "OGR-*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "DWC*",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 123,
+            "connectable": True,
+        },
+        {
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 15984,
+            "connectable": True,
+        },
+        {
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 49572,
+            "connectable": True,
+        },
+    ],
+    "jikong_bms": [
+        {
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+            "manufacturer_id": 2917,
+        },
+    ],
+    "ogt_bms": [
+        {
+            "local_name": "SmartBat-[AB]*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+    ],
+    "redodo_bms": [
+        {
+            "local_name": "R-12*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "R-24*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "RO-12*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "RO-24*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "P-12*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "P-24*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "PQ-12*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "PQ-24*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "L-12*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+        {
+            "local_name": "L-24*",
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 22618,
+            "connectable": True,
+        },
+    ],
+    "renogy_bms": [
+        {
+            "service_uuid": "0000ffd0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 39008,
+            "connectable": True,
+        },
+    ],
+    "seplos_bms": [
+        {
+            "local_name": "SP0*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SP1*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SP4*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SP5*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "SP6*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "CSY*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+    ],
+    "seplos_v2_bms": [
+        {
+            "local_name": "BP0?",
+            "service_uuid": "0000ff00-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+    ],
+    "roypow_bms": [
+        {
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 424,
+            "connectable": True,
+        },
+        {
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 2865,
+            "connectable": True,
+        },
+        {
+            "service_uuid": "0000ffe0-0000-1000-8000-00805f9b34fb",
+            "manufacturer_id": 35579,
+            "connectable": True,
+        },
+    ],
+    "tdt_bms": [
+        {"manufacturer_id": 54976, "connectable": True},
+    ],
+    "dpwrcore_bms": [
+        {
+            "local_name": "DXB-*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+        {
+            "local_name": "TBA-*",
+            "service_uuid": "0000fff0-0000-1000-8000-00805f9b34fb",
+            "connectable": True,
+        },
+    ],
+    "felicity_bms": [
+        {"local_name": "F10*", "connectable": True},
+    ],
+}  # advertisement matchers of the BMS types, see BaseBMS.matcher_dict_list
 DOMAIN: Final[str] = "bms_ble"
 LOGGER: Final[logging.Logger] = logging.getLogger(__package__)
 UPDATE_INTERVAL: Final[int] = 30  # [s]
+PASSIVE_INTERVAL: Final[int] = 300  # [s] active updates if BMS advertises values
+BT_SLOTS: Final[int] = 3  # concurrent connections per Bluetooth source
+STORAGE_VERSION: Final[int] = 1
+STORE_DELAY: Final[int] = 600  # [s] delay to persist learned BMS parameters
+COMPACT_CELLS: Final[int] = 128  # [#] cells from which samples are kept compact
+MAX_REPORT_INTERVAL: Final[int] = 300  # [s] report values within deadband after
+HISTORY_SIZE: Final[int] = 120  # [#] samples kept for trend statistics per device
+MAX_INTEGRATION_GAP: Final[int] = 2 * PASSIVE_INTERVAL  # [s] count samples within
+BANK_ID: Final[str] = "battery_bank"  # unique ID of the battery bank config entry
+DISCHARGE_MARGIN: Final[int] = 2  # [%] turn off discharge below peak battery level
+PEAK_RESET_LEVEL: Final[int] = 98  # [%] battery level restarting peak tracking
+SERVICE_SET_DISCHARGE: Final[str] = "set_discharge"
 
 # attributes (do not change)
 ATTR_BALANCE_CUR: Final[str] = "balance_current"  # [A]
+ATTR_BATTERIES: Final[str] = "batteries"  # [#]
 ATTR_BATTERY_DISCHARGING_STATE: Final[str] = "battery_discharging_state"
 ATTR_CELL_VOLTAGES: Final[str] = "cell_voltages"  # [V]
+ATTR_CHRG_ENERGY: Final[str] = "charge_energy"  # [Wh]
+ATTR_CHRG_THROUGHPUT: Final[str] = "charge_throughput"  # [Ah]
 ATTR_CURRENT: Final[str] = "current"  # [A]
 ATTR_CYCLE_CAP: Final[str] = "cycle_capacity"  # [Wh]
 ATTR_CYCLE_CHRG: Final[str] = "cycle_charge"  # [Ah]
 ATTR_CYCLES: Final[str] = "cycles"  # [#]
+ATTR_DELTA_LEVEL: Final[str] = "delta_battery_level"  # [%]
 ATTR_DELTA_VOLTAGE: Final[str] = "delta_voltage"  # [V]
+ATTR_DISCHRG_ENERGY: Final[str] = "discharge_energy"  # [Wh]
+ATTR_DISCHRG_THROUGHPUT: Final[str] = "discharge_throughput"  # [Ah]
 ATTR_LQ: Final[str] = "link_quality"  # [%]
+ATTR_MAX_LEVEL: Final[str] = "max_battery_level"  # [%]
+ATTR_MIN_LEVEL: Final[str] = "min_battery_level"  # [%]
+ATTR_NEXT_CYCLE: Final[str] = "next_cycle"  # [timestamp]
+ATTR_NEXT_UPDATE: Final[str] = "next_update"  # [timestamp]
 ATTR_POWER: Final[str] = "power"  # [W]
 ATTR_PROBLEM: Final[str] = "problem"  # [bool]
 ATTR_PROBLEM_CODE: Final[str] = "problem_code"  # [int]
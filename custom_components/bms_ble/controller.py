@@ -0,0 +1,235 @@
+"""Balance the discharge of the batteries of a battery bank."""
+
+import asyncio
+from collections.abc import Mapping
+from time import monotonic
+from typing import Any, Final
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_BATTERY_LEVEL
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    ATTR_BATTERY_DISCHARGING_STATE,
+    DISCHARGE_MARGIN,
+    LOGGER,
+    PEAK_RESET_LEVEL,
+    STORE_DELAY,
+    UPDATE_INTERVAL,
+)
+from .coordinator import BTBmsCoordinator, bms_store
+from .services import async_switch_discharge
+
+
+class DischargePolicy:
+    """Decide which batteries of a bank discharge to keep their levels together.
+
+    The peak battery level of each battery is tracked and restarts from the current
+    levels while any battery is full. A discharging battery that dropped by the margin
+    below its peak is turned off, lowest level first, as long as another battery keeps
+    discharging. Batteries at the highest level of the bank are turned on.
+    """
+
+    def __init__(self, margin: float = DISCHARGE_MARGIN) -> None:
+        """Initialize policy turning off batteries margin [%] below their peak."""
+        self._margin: Final[float] = margin
+        self._peaks: Final[dict[str, float]] = {}  # address: peak level [%]
+        self._previous: Final[dict[str, float]] = {}  # address: previous level [%]
+
+    @property
+    def peaks(self) -> dict[str, float]:
+        """Return the tracked peak battery level [%] by device address."""
+        return self._peaks
+
+    @property
+    def previous(self) -> dict[str, float]:
+        """Return the previous battery level [%] by device address."""
+        return self._previous
+
+    def restore(self, data: Mapping[str, Any]) -> None:
+        """Continue tracking from persisted peak and previous levels."""
+        for key, levels in (("peaks", self._peaks), ("previous", self._previous)):
+            levels.update(
+                (address, float(level))
+                for address, level in data.get(key, {}).items()
+                if isinstance(level, int | float)
+            )
+
+    def update(self, levels: Mapping[str, float]) -> bool:
+        """Track the peaks of the current battery levels, return true on change."""
+        highest: Final[float] = max(levels.values(), default=0.0)
+        full: Final[bool] = highest >= PEAK_RESET_LEVEL
+        changed: bool = False
+        for address, level in levels.items():
+            # new batteries start from the highest level, i.e. discharge the fullest
+            peak: float = (
+                level if full else max(level, self._peaks.get(address, highest))
+            )
+            if self._peaks.get(address) != peak:
+                self._peaks[address] = peak
+                changed = True
+            if self._previous.get(address) != level:
+                LOGGER.debug(
+                    "%s: level %s -> %.1f%%, peak %.1f%%",
+                    address,
+                    self._previous.get(address),
+                    level,
+                    peak,
+                )
+                self._previous[address] = level
+                changed = True
+        return changed
+
+    def plan(
+        self, levels: Mapping[str, float], states: Mapping[str, bool]
+    ) -> dict[str, bool]:
+        """Return the discharge states to switch to by device address.
+
+        Batteries to turn on come first, so at least one battery keeps discharging
+        while the commands are executed in order.
+        """
+        if not levels:
+            return {}
+        highest: Final[float] = max(levels.values())
+        actions: Final[dict[str, bool]] = {
+            address: True
+            for address, level in levels.items()
+            if level >= highest and not states[address]
+        }
+        discharging: int = sum(states.values()) + len(actions)
+        for address in sorted(levels, key=levels.__getitem__):
+            if (
+                discharging > 1
+                and states[address]
+                and levels[address] <= self._peaks[address] - self._margin
+            ):
+                actions[address] = False
+                discharging -= 1
+        return actions
+
+
+class BTBmsDischargeController:
+    """Switch the discharge of the bank members on their updates.
+
+    The controller evaluates the policy whenever a member reports new values and
+    executes the resulting commands in the background. Batteries are turned on before
+    others are turned off, each group concurrently. A command not confirmed by the
+    member is repeated after the update interval at the earliest.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        members: Mapping[str, BTBmsCoordinator],
+    ) -> None:
+        """Initialize controller for the members of a battery bank."""
+        self._hass: Final[HomeAssistant] = hass
+        self._entry: Final[ConfigEntry] = config_entry
+        self._members: Final[Mapping[str, BTBmsCoordinator]] = members
+        self._policy: Final[DischargePolicy] = DischargePolicy()
+        self._store: Final[Store[dict[str, Any]]] = bms_store(
+            hass, config_entry.entry_id
+        )
+        self._lock: Final[asyncio.Lock] = asyncio.Lock()
+        self._commanded: Final[dict[str, tuple[bool, float]]] = {}  # state, time
+        self._enabled: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        """Return true if the controller switches the members."""
+        return self._enabled
+
+    @property
+    def policy(self) -> DischargePolicy:
+        """Return the policy with the tracked battery levels."""
+        return self._policy
+
+    async def async_restore(self) -> None:
+        """Restore the enabled state and the tracked battery levels."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self._enabled = bool(data.get("enabled"))
+        self._policy.restore(data)
+
+    def _stored_data(self) -> dict[str, Any]:
+        """Return the enabled state and the tracked battery levels to persist."""
+        return {
+            "enabled": self._enabled,
+            "peaks": dict(self._policy.peaks),
+            "previous": dict(self._policy.previous),
+        }
+
+    async def async_set_enabled(self, enabled: bool) -> None:
+        """Enable or disable switching the members."""
+        self._enabled = enabled
+        self._commanded.clear()
+        await self._store.async_save(self._stored_data())
+        if enabled:
+            self.async_evaluate()
+
+    def _controllable(self) -> tuple[dict[str, float], dict[str, bool]]:
+        """Return level and discharge state of the members that can be switched."""
+        levels: Final[dict[str, float]] = {}
+        states: Final[dict[str, bool]] = {}
+        for address, coordinator in self._members.items():
+            data: Mapping[str, Any] = coordinator.data or {}
+            if (
+                coordinator.last_update_success
+                and coordinator.discharge_control
+                and (level := data.get(ATTR_BATTERY_LEVEL)) is not None
+                and isinstance(state := data.get(ATTR_BATTERY_DISCHARGING_STATE), bool)
+            ):
+                levels[address] = float(level)
+                states[address] = state
+        return levels, states
+
+    @callback
+    def async_evaluate(self) -> None:
+        """Evaluate the policy for the current member values and run its commands."""
+        levels, states = self._controllable()
+        if self._policy.update(levels):
+            self._store.async_delay_save(self._stored_data, STORE_DELAY)
+        if not self._enabled or self._lock.locked() or len(levels) < 2:
+            return
+        now: Final[float] = monotonic()
+        if actions := {
+            address: enable
+            for address, enable in self._policy.plan(levels, states).items()
+            if (last := self._commanded.get(address)) is None
+            or last[0] != enable
+            or now - last[1] > UPDATE_INTERVAL
+        }:
+            self._entry.async_create_background_task(
+                self._hass,
+                self._async_execute(actions),
+                f"{self._entry.title} discharge balancing",
+            )
+
+    async def _async_execute(self, actions: dict[str, bool]) -> None:
+        """Switch the discharge of the members, turn on before turning off."""
+        async with self._lock:
+            for enable in (True, False):
+                commands: dict[str, tuple[BTBmsCoordinator, bool]] = {
+                    address: (coordinator, enable)
+                    for address, state in actions.items()
+                    if state is enable
+                    and (coordinator := self._members.get(address)) is not None
+                }
+                for address, (coordinator, _) in commands.items():
+                    LOGGER.info(
+                        "%s: turning discharge %s (level %.1f%%, peak %.1f%%)",
+                        coordinator.name,
+                        "on" if enable else "off",
+                        self._policy.previous[address],
+                        self._policy.peaks[address],
+                    )
+                    self._commanded[address] = (enable, monotonic())
+                for address, result in (await async_switch_discharge(commands)).items():
+                    if not result.success:
+                        LOGGER.warning(
+                            "%s: failed to turn discharge %s",
+                            commands[address][0].name,
+                            "on" if enable else "off",
+                        )
@@ -1,26 +1,58 @@
 """Home Assistant coordinator for BLE Battery Management System integration."""
 
 from collections import deque
-from datetime import timedelta
+from collections.abc import Iterable
+from datetime import datetime, timedelta
 from time import monotonic
-from typing import Final
+from typing import Any, Final
 
 from bleak.backends.device import BLEDevice
 from bleak.exc import BleakError
 from habluetooth import BluetoothServiceInfoBleak
 
-from homeassistant.components.bluetooth import async_last_service_info
+from homeassistant.components.bluetooth import (
+    BluetoothCallbackMatcher,
+    BluetoothChange,
+    BluetoothScanningMode,
+    async_last_service_info,
+    async_register_callback,
+)
 from homeassistant.components.bluetooth.const import DOMAIN as BLUETOOTH_DOMAIN
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH, DeviceInfo
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, LOGGER, UPDATE_INTERVAL
-from .plugins.basebms import BaseBMS, BMSsample
+from .const import (
+    COMPACT_CELLS,
+    DOMAIN,
+    LOGGER,
+    PASSIVE_INTERVAL,
+    STORAGE_VERSION,
+    STORE_DELAY,
+    UPDATE_INTERVAL,
+)
+from .energy import EnergyCounter
+from .history import SampleHistory
+from .plugins.basebms import (
+    BaseBMS,
+    BMScompact,
+    BMSdata,
+    BMSmode,
+    BMSsample,
+    changed_keys,
+)
+from .scheduler import BTSlotScheduler, ScheduleListeners, async_get_scheduler
 
 
-class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
+def bms_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the storage of learned BMS parameters for a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+
+class BTBmsCoordinator(DataUpdateCoordinator[BMSdata]):
     """Update coordinator for a battery management system."""
 
     def __init__(
@@ -32,18 +64,37 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
     ) -> None:
         """Initialize BMS data coordinator."""
         assert ble_device.name is not None
+        # BMS values from advertisements, active updates only for details
+        passive: Final[bool] = bms_device.decodes_advertisement()
         super().__init__(
             hass=hass,
             logger=LOGGER,
             name=ble_device.name,
-            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            update_interval=timedelta(
+                seconds=PASSIVE_INTERVAL if passive else UPDATE_INTERVAL
+            ),
             always_update=False,  # only update when sensor value has changed
             config_entry=config_entry,
         )
         self._device: Final[BaseBMS] = bms_device
         self._link_q = deque([False], maxlen=100)  # track BMS update issues
         self._mac: Final[str] = ble_device.address
+        self._scheduler: Final[BTSlotScheduler] = async_get_scheduler(hass)
         self._stale: bool = False  # indicates no BMS response for significant time
+        self._unsub_adv: CALLBACK_TYPE | None = None
+        self._store: Final[Store[dict[str, Any]]] = bms_store(
+            hass, config_entry.entry_id
+        )
+        self._t_store: float = float("-inf")  # time of last store request
+        self._last: BMSdata = {}  # data of the last listener update
+        self._changed: frozenset[str] = frozenset()  # keys changed by last update
+        self._suppressed: int = 0  # state writes suppressed by entity deadbands
+        self._startup: dict[str, float] = {}  # duration of startup steps [s]
+        self._history: Final[SampleHistory] = SampleHistory()
+        self._energy: Final[EnergyCounter] = EnergyCounter()
+        self._counted: frozenset[str] = frozenset()  # totals changed since update
+        self._next_update: datetime | None = None  # time of the scheduled update
+        self._schedule: Final[ScheduleListeners] = ScheduleListeners()
 
         LOGGER.debug(
             "Initializing coordinator for %s (%s) as %s",
@@ -57,6 +108,17 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
         ):
             LOGGER.debug("%s: advertisement: %s", self.name, service_info.as_dict())
 
+        if passive:
+            self._unsub_adv = async_register_callback(
+                hass,
+                self._async_advertisement,
+                BluetoothCallbackMatcher(address=self._mac, connectable=False),
+                BluetoothScanningMode.PASSIVE,
+            )
+
+        if bms_device.streams():  # push values of unsolicited frames
+            bms_device.stream(self._async_stream)
+
         # retrieve device information
         device_info: Final[dict[str, str]] = self._device.device_info()
         self.device_info = DeviceInfo(
@@ -81,6 +143,18 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
         )
         return service_info.rssi if service_info else None
 
+    @property
+    def queue_time(self) -> float:
+        """Return the time [s] the last update waited for a Bluetooth connection slot."""
+        return self._scheduler.wait_time(self._mac)
+
+    def _source(self) -> str:
+        """Return the Bluetooth source (adapter/proxy) that last received the BMS."""
+        service_info: BluetoothServiceInfoBleak | None = async_last_service_info(
+            self.hass, address=self._mac, connectable=True
+        )
+        return service_info.source if service_info else ""
+
     def _rssi_msg(self) -> str:
         """Return check RSSI message if below -75dBm."""
         return (
@@ -89,6 +163,129 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
             else ""
         )
 
+    async def async_restore(self) -> bool:
+        """Restore learned parameters of the BMS connection and the last sample.
+
+        Return true if a BMS sample was restored to data.
+        """
+        if (data := await self._store.async_load()) is None:
+            return False
+        LOGGER.debug("%s: restoring link profile %s", self.name, data.get("link"))
+        self._device.restore_link_profile(data.get("link", {}))
+        self._energy.restore(data.get("energy", {}))
+        if not (sample := data.get("sample")):
+            return False
+        if "battery_mode" in sample:
+            sample["battery_mode"] = BMSmode(sample["battery_mode"])
+        LOGGER.debug("%s: restoring BMS data sample %s", self.name, sample)
+        self.data = self._last = BTBmsCoordinator._compact(sample)
+        return True
+
+    def _stored_data(self) -> dict[str, Any]:
+        """Return learned parameters, the last sample and energy totals to persist."""
+        return {
+            "link": self._device.link_profile,
+            "sample": dict(self.data or {}),
+            "energy": dict(self._energy.totals),
+        }
+
+    @property
+    def startup_times(self) -> dict[str, float]:
+        """Return the duration [s] of the startup steps of the config entry."""
+        return self._startup
+
+    def record_startup(self, step: str, duration: float) -> None:
+        """Record the duration [s] of a startup step."""
+        self._startup[step] = round(duration, 3)
+
+    @property
+    def suppressed_writes(self) -> int:
+        """Return the number of state writes suppressed by entity deadbands."""
+        return self._suppressed
+
+    def count_suppressed(self) -> None:
+        """Count a state write that an entity suppressed."""
+        self._suppressed += 1
+
+    @property
+    def history(self) -> SampleHistory:
+        """Return the recent samples of the BMS for trend statistics."""
+        return self._history
+
+    @property
+    def energy(self) -> dict[str, float]:
+        """Return the counted charge and discharge energy [Wh] and charge [Ah]."""
+        return self._energy.totals
+
+    @property
+    def next_update(self) -> datetime | None:
+        """Return the time of the next scheduled BMS update."""
+        return self._next_update
+
+    @property
+    def schedule(self) -> ScheduleListeners:
+        """Return the listeners notified when the next update is scheduled."""
+        return self._schedule
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next update and notify the schedule listeners of its time."""
+        super()._schedule_refresh()
+        next_update: Final[datetime | None] = (
+            dt_util.utcnow().replace(microsecond=0) + self.update_interval
+            if self._unsub_refresh is not None and self.update_interval is not None
+            else None
+        )
+        if next_update != self._next_update:
+            self._next_update = next_update
+            self._schedule.notify()
+
+    @property
+    def discharge_control(self) -> bool:
+        """Return true if the BMS can switch its discharge."""
+        return hasattr(self._device, "enable_discharge") and hasattr(
+            self._device, "disable_discharge"
+        )
+
+    async def async_set_discharge(self, enable: bool) -> bool:
+        """Switch the discharge of the BMS, return true if the state is confirmed.
+
+        The discharge state is confirmed by a minimal status read of the BMS and
+        only that value is updated. If it cannot be read, the command is unconfirmed
+        and a full update is requested to read the state.
+        """
+        if not self.discharge_control:
+            return False
+        state: bool | None = None
+        async with (
+            self._scheduler.slot(
+                self._source(), self._mac, stagger=False, close=self._device.disconnect
+            ),
+            self._device.hold_link(),
+        ):
+            if not await getattr(
+                self._device, "enable_discharge" if enable else "disable_discharge"
+            )():
+                return False
+            if hasattr(self._device, "discharge_state"):
+                try:
+                    state = await self._device.discharge_state()
+                except (TimeoutError, BleakError, EOFError) as err:
+                    LOGGER.debug(
+                        "%s: failed to confirm discharge state: %s (%s)",
+                        self.name,
+                        err,
+                        type(err).__name__,
+                    )
+        if state is None:
+            await self.async_request_refresh()
+            return False
+        LOGGER.debug("%s: discharge state confirmed %s", self.name, state)
+        if (data := self.data or {}).get("battery_discharging_state") != state:
+            self.data = data | BMSsample(battery_discharging_state=state)
+            self.async_update_listeners()
+        return state is enable
+
     @property
     def link_quality(self) -> int:
         """Gives the precentage of successful BMS reads out of the last 100 attempts."""
@@ -98,8 +295,50 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
     async def async_shutdown(self) -> None:
         """Shutdown coordinator and any connection."""
         LOGGER.debug("Shutting down BMS (%s)", self.name)
+        if self._unsub_adv is not None:
+            self._unsub_adv()
+            self._unsub_adv = None
+        self._device.stream(None)
         await super().async_shutdown()
         await self._device.disconnect()
+        self._scheduler.remove(self._mac)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Determine the changed BMS values, then update all listeners."""
+        data: Final[BMSdata] = self.data or {}
+        self._changed = changed_keys(self._last, data) | self._counted
+        self._counted = frozenset()
+        self._last = data
+        super().async_update_listeners()
+
+    def changed(self, keys: Iterable[str]) -> bool:
+        """Return true if any of the BMS values changed with the last update."""
+        return not self._changed.isdisjoint(keys)
+
+    @callback
+    def _async_advertisement(
+        self, service_info: BluetoothServiceInfoBleak, _change: BluetoothChange
+    ) -> None:
+        """Update BMS values from an advertisement (passive mode)."""
+        if adv_data := self._device.advertisement_update(service_info):
+            LOGGER.debug("%s: BMS advertisement sample %s", self.name, adv_data)
+            self._async_merge(adv_data)
+
+    @callback
+    def _async_stream(self, stream_data: BMSsample) -> None:
+        """Update BMS values from unsolicited frames (streaming mode)."""
+        self._async_merge(stream_data)
+
+    @callback
+    def _async_merge(self, sample: BMSsample) -> None:
+        """Merge BMS values into the data of the last update, skip unchanged ones."""
+        # keep details of the last update and do not reschedule the next one
+        if (bms_data := (self.data or {}) | sample) != self.data:
+            self._history.append(now := monotonic(), bms_data)
+            self._counted |= self._energy.add(now, bms_data)
+            self.data = bms_data
+            self.async_update_listeners()
 
     def _device_stale(self) -> bool:
         if self._link_q[-1]:
@@ -118,7 +357,7 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
 
         return self._stale
 
-    async def _async_update_data(self) -> BMSsample:
+    async def _async_update_data(self) -> BMSdata:
         """Return the latest data from the device."""
 
         LOGGER.debug("%s: BMS data update", self.name)
@@ -126,6 +365,14 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
         if self._device_stale():
             await self._device.disconnect(reset=True)
 
+        async with self._scheduler.slot(
+            self._source(), self._mac, close=self._device.disconnect
+        ):
+            return await self._async_update_bms()
+
+    async def _async_update_bms(self) -> BMSdata:
+        """Return the latest data from the device holding a connection slot."""
+
         start: Final[float] = monotonic()
         try:
             if not (bms_data := await self._device.async_update()):
@@ -153,6 +400,21 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
             )
 
         self._link_q[-1] = True  # set success
+        if "first_sample" not in self._startup:
+            self.record_startup("first_sample", monotonic() - start)
+            self.record_startup("connect", self._device.connect_time)
+        if (now := monotonic()) - self._t_store > STORE_DELAY:
+            self._t_store = now
+            self._store.async_delay_save(self._stored_data, STORE_DELAY)
         LOGGER.debug("%s: BMS data sample %s", self.name, bms_data)
+        self._history.append(now, bms_data)
+        self._counted |= self._energy.add(now, bms_data)
+
+        return BTBmsCoordinator._compact(bms_data)
 
+    @staticmethod
+    def _compact(bms_data: BMSsample) -> BMSdata:
+        """Return the sample, compact for large battery banks to reduce memory."""
+        if len(bms_data.get("cell_voltages", [])) >= COMPACT_CELLS:
+            return BMScompact(bms_data)
         return bms_data
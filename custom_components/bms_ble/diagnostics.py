@@ -9,7 +9,8 @@ from homeassistant.const import ATTR_AREA_ID, ATTR_ID
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 
-from . import BTBmsConfigEntry
+from . import BTBmsBankConfigEntry, BTBmsConfigEntry
+from .bank import BTBmsBank
 from .const import ATTR_LQ, ATTR_RSSI
 from .coordinator import BTBmsCoordinator
 
@@ -17,11 +18,26 @@ TO_REDACT: frozenset[str] = frozenset({ATTR_ID, ATTR_AREA_ID})
 
 
 async def async_get_device_diagnostics(
-    hass: HomeAssistant, entry: BTBmsConfigEntry, device: dr.DeviceEntry
+    hass: HomeAssistant,
+    entry: BTBmsConfigEntry | BTBmsBankConfigEntry,
+    device: dr.DeviceEntry,
 ) -> dict[str, Any]:
     """Return diagnostics for a BMS device."""
+    runtime_data: Final[BTBmsCoordinator | BTBmsBank] = entry.runtime_data
+    if isinstance(runtime_data, BTBmsBank):
+        return {
+            "entry_data": async_redact_data(entry.data, TO_REDACT),
+            "device_data": async_redact_data(device.dict_repr, TO_REDACT),
+            "bank_data": runtime_data.data,
+            "members": runtime_data.levels,
+            "controller_data": {
+                "enabled": runtime_data.controller.enabled,
+                "peaks": runtime_data.controller.policy.peaks,
+            },
+        }
+
     adapter_info: str = "unavailable"
-    coord: Final[BTBmsCoordinator] = entry.runtime_data
+    coord: Final[BTBmsCoordinator] = runtime_data
     mac: str = next(
         (id_value for domain, id_value in device.identifiers if domain == "bms_ble"), ""
     )
@@ -46,5 +62,9 @@ async def async_get_device_diagnostics(
             "last_update_success": coord.last_update_success,
             "last_exception": coord.last_exception,
             "interval": coord.update_interval,
+            "queue_time": coord.queue_time,
+            "suppressed_writes": coord.suppressed_writes,
         },
+        "startup_data": coord.startup_times,
+        "history_data": coord.history.summary(),
     }
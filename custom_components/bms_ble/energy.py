@@ -0,0 +1,97 @@
+"""Count charge and discharge of a BMS by integrating its samples over time."""
+
+from collections.abc import Mapping
+from typing import Any, Final
+
+from .const import (
+    ATTR_CHRG_ENERGY,
+    ATTR_CHRG_THROUGHPUT,
+    ATTR_DISCHRG_ENERGY,
+    ATTR_DISCHRG_THROUGHPUT,
+    MAX_INTEGRATION_GAP,
+)
+
+
+def _split_area(start: float, end: float, duration: float) -> tuple[float, float]:
+    """Return positive and negative area of the trapezoid between start and end.
+
+    A trapezoid crossing zero is split at the crossing into two triangles.
+    """
+    if start >= 0 and end >= 0:
+        return (start + end) / 2 * duration, 0.0
+    if start <= 0 and end <= 0:
+        return 0.0, -(start + end) / 2 * duration
+    crossing: Final[float] = duration * start / (start - end)
+    first: Final[float] = start * crossing / 2
+    second: Final[float] = end * (duration - crossing) / 2
+    return max(first, second), -min(first, second)
+
+
+class EnergyCounter:
+    """Coulomb counter for the charge and discharge of a BMS.
+
+    Current and power are integrated with the trapezoidal rule between consecutive
+    samples, a sign change between samples is split at the zero crossing. Intervals
+    longer than the maximum gap, e.g. a restart or lost connection, are not counted.
+    """
+
+    KEYS: Final[tuple[str, ...]] = (
+        ATTR_CHRG_ENERGY,
+        ATTR_DISCHRG_ENERGY,
+        ATTR_CHRG_THROUGHPUT,
+        ATTR_DISCHRG_THROUGHPUT,
+    )
+
+    def __init__(self, max_gap: float = MAX_INTEGRATION_GAP) -> None:
+        """Initialize counters, samples further apart than max_gap [s] are skipped."""
+        self._max_gap: Final[float] = max_gap
+        self._totals: Final[dict[str, float]] = dict.fromkeys(EnergyCounter.KEYS, 0.0)
+        self._last: tuple[float, float, float | None] | None = None  # time, I, P
+
+    @property
+    def totals(self) -> dict[str, float]:
+        """Return the counted energy [Wh] and charge [Ah] for both directions."""
+        return self._totals
+
+    def restore(self, totals: Mapping[str, Any]) -> None:
+        """Continue counting from persisted totals."""
+        for key in EnergyCounter.KEYS:
+            if isinstance(value := totals.get(key), int | float):
+                self._totals[key] = float(value)
+
+    def add(self, time: float, sample: Mapping[str, Any]) -> frozenset[str]:
+        """Count the interval since the last sample taken at time [s].
+
+        Return the keys of the totals that changed.
+        """
+        if (current := sample.get("current")) is None:
+            self._last = None
+            return frozenset()
+        power: float | None = sample.get("power")
+        if power is None and (voltage := sample.get("voltage")) is not None:
+            power = voltage * current
+        last: Final[tuple[float, float, float | None] | None] = self._last
+        self._last = (time, current, power)
+        if last is None or not 0 < (duration := time - last[0]) <= self._max_gap:
+            return frozenset()
+
+        changed: set[str] = set()
+        areas: list[tuple[tuple[str, str], tuple[float, float]]] = [
+            (
+                (ATTR_CHRG_THROUGHPUT, ATTR_DISCHRG_THROUGHPUT),
+                _split_area(last[1], current, duration / 3600),
+            )
+        ]
+        if last[2] is not None and power is not None:
+            areas.append(
+                (
+                    (ATTR_CHRG_ENERGY, ATTR_DISCHRG_ENERGY),
+                    _split_area(last[2], power, duration / 3600),
+                )
+            )
+        for keys, values in areas:
+            for key, value in zip(keys, values, strict=True):
+                if value:
+                    self._totals[key] += value
+                    changed.add(key)
+        return frozenset(changed)
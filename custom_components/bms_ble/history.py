@@ -0,0 +1,129 @@
+"""Keep recent samples of a BMS for trend statistics."""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+import contextlib
+from itertools import compress
+from math import isnan, nan
+from statistics import StatisticsError, fmean, linear_regression
+from typing import Any, Final, NamedTuple
+
+from .const import HISTORY_SIZE
+
+
+class SampleStats(NamedTuple):
+    """Statistics of a BMS value over a time window."""
+
+    samples: int  # [#] samples providing the value
+    mean: float
+    min: float
+    max: float
+    slope: float | None  # change per second, None if it cannot be determined
+
+
+class SampleHistory:
+    """Ring buffer of the numeric values of the last samples of a BMS.
+
+    Values are kept column-wise in arrays of fixed size, so appending a sample does
+    not allocate memory and overwrites the oldest one. Missing values are kept as NaN
+    and skipped by the statistics. Cell voltages are kept row-wise in one array, their
+    history restarts if the number of cells changes.
+    """
+
+    FIELDS: Final[tuple[str, ...]] = (
+        "voltage",
+        "current",
+        "power",
+        "battery_level",
+        "cycle_charge",
+        "temperature",
+        "delta_voltage",
+    )
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """Initialize history of the last size samples."""
+        self._size: Final[int] = size
+        self._times: Final[array[float]] = array("d", [nan]) * size
+        self._values: Final[dict[str, array[float]]] = {
+            key: array("d", [nan]) * size for key in SampleHistory.FIELDS
+        }
+        self._cells: array[float] = array("f")  # cell voltages of all samples
+        self._cell_count: int = 0
+        self._pos: int = 0  # slot of the next sample
+        self._count: int = 0  # number of kept samples
+
+    def __len__(self) -> int:
+        """Return the number of kept samples."""
+        return self._count
+
+    def append(self, time: float, sample: Mapping[str, Any]) -> None:
+        """Add a sample taken at time [s], replacing the oldest one if full."""
+        pos: Final[int] = self._pos
+        self._times[pos] = time
+        for key, column in self._values.items():
+            value: Any = sample.get(key)
+            column[pos] = nan if value is None else float(value)
+
+        cells: Final[list[float]] = sample.get("cell_voltages", [])
+        if len(cells) != self._cell_count:
+            self._cell_count = len(cells)
+            self._cells = array("f", [nan]) * (self._cell_count * self._size)
+        self._cells[pos * self._cell_count : (pos + 1) * self._cell_count] = array(
+            "f", cells
+        )
+
+        self._pos = (pos + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    def _ordered(self, column: array[float]) -> array[float]:
+        """Return the kept values of a column from the oldest to the latest sample."""
+        if self._count < self._size:
+            return column[: self._count]
+        return column[self._pos :] + column[: self._pos]
+
+    def _stats(self, column: array[float], window: float | None) -> SampleStats | None:
+        """Return statistics of a column over the last window [s]."""
+        times: array[float] = self._ordered(self._times)
+        values: array[float] = self._ordered(column)
+        if window is not None and times:
+            start: Final[int] = bisect_left(times, times[-1] - window)
+            times, values = times[start:], values[start:]
+        if not all(valid := [not isnan(value) for value in values]):
+            times = array("d", compress(times, valid))
+            values = array("d", compress(values, valid))
+        if not values:
+            return None
+        slope: float | None = None
+        if len(values) > 1:
+            with contextlib.suppress(StatisticsError):  # samples of the same time
+                slope = linear_regression(times, values).slope
+        return SampleStats(len(values), fmean(values), min(values), max(values), slope)
+
+    def stats(self, key: str, window: float | None = None) -> SampleStats | None:
+        """Return statistics of a value over the last window [s], default all samples.
+
+        Return None if no kept sample provides the value.
+        """
+        if (column := self._values.get(key)) is None:
+            return None
+        return self._stats(column, window)
+
+    def cell_stats(self, cell: int, window: float | None = None) -> SampleStats | None:
+        """Return statistics of a cell voltage over the last window [s]."""
+        if not 0 <= cell < self._cell_count:
+            return None
+        return self._stats(self._cells[cell :: self._cell_count], window)
+
+    def summary(self) -> dict[str, Any]:
+        """Return the statistics of all values over the kept samples."""
+        times: Final[array[float]] = self._ordered(self._times)
+        return {
+            "samples": self._count,
+            "span": times[-1] - times[0] if times else 0.0,
+            "stats": {
+                key: stats._asdict()
+                for key in SampleHistory.FIELDS
+                if (stats := self.stats(key)) is not None
+            },
+        }
@@ -1,14 +1,23 @@
 """Module to support ABC BMS."""
 
-from collections.abc import Callable
 import contextlib
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue, crc8
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    crc8,
+    int_array,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -24,26 +33,27 @@ class BMS(BaseBMS):
         0xC3: [0xF5, 0xF6, 0xF7, 0xF8, 0xFA],
         0xC4: [0xF9] * 2,  # 4 cells per message
     }
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, int, bool, Callable[[int], Any]]]] = [
-        ("temp_sensors", 0xF2, 4, 1, False, lambda x: x),
-        ("voltage", 0xF0, 2, 3, False, lambda x: float(x / 1000)),
-        ("current", 0xF0, 5, 3, True, lambda x: float(x / 1000)),
-        # ("design_capacity", 0xF0, 8, 3, False, lambda x: float(x / 1000)),
-        ("battery_level", 0xF0, 16, 1, False, lambda x: x),
-        ("cycle_charge", 0xF0, 11, 3, False, lambda x: float(x / 1000)),
-        ("cycles", 0xF0, 14, 2, False, lambda x: x),
-        (  # only first bit per byte is used
-            "problem_code",
-            0xF9,
-            2,
-            16,
-            False,
-            lambda x: sum(((x >> (i * 8)) & 1) << i for i in range(16)),
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
+        (
+            BMSdp("temp_sensors", 4, 1, False, idx=0xF2),
+            BMSdp("voltage", 2, 3, False, lambda x: float(x / 1000), 0xF0),
+            BMSdp("current", 5, 3, True, lambda x: float(x / 1000), 0xF0),
+            # BMSdp("design_capacity", 8, 3, False, lambda x: float(x / 1000), 0xF0),
+            BMSdp("battery_level", 16, 1, False, idx=0xF0),
+            BMSdp("cycle_charge", 11, 3, False, lambda x: float(x / 1000), 0xF0),
+            BMSdp("cycles", 14, 2, False, idx=0xF0),
+            BMSdp(  # only first bit per byte is used
+                "problem_code",
+                2,
+                16,
+                False,
+                lambda x: sum(((x >> (i * 8)) & 1) << i for i in range(16)),
+                0xF9,
+            ),
         ),
-    ]
-    _RESPS: Final[set[int]] = {field[1] for field in _FIELDS} | {
-        field[1] for field in _FIELDS
-    }
+        byteorder="little",
+    )
+    _RESPS: Final[set[int]] = {field.idx for field in _FIELDS}
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Initialize BMS."""
@@ -137,30 +147,13 @@ class BMS(BaseBMS):
     def _cell_voltages(data: bytearray) -> list[float]:
         """Return cell voltages from status message."""
         return [
-            int.from_bytes(
-                data[3 + idx * 4 : 6 + idx * 4], byteorder="little", signed=False
-            )
-            / 1000
-            for idx in range(4 * (len(data) - 4) // 16)
+            (value & 0xFFFFFF) / 1000  # 3 byte values with 4 byte stride
+            for value in int_array(data, 3, 4 * (len(data) - 4) // 16, 4, "little")
         ]
 
     @staticmethod
     def _temp_sensors(data: bytearray, sensors: int) -> list[int | float]:
-        return [
-            int.from_bytes(data[5 + idx : 6 + idx], byteorder="little", signed=True)
-            for idx in range(sensors)
-        ]
-
-    @staticmethod
-    def _decode_data(data: dict[int, bytearray]) -> BMSsample:
-        result: BMSsample = {}
-        for key, cmd, idx, size, sign, func in BMS._FIELDS:
-            result[key] = func(
-                int.from_bytes(
-                    data[cmd][idx : idx + size], byteorder="little", signed=sign
-                )
-            )
-        return result
+        return scaled_values(data, 5, sensors, size=1, signed=True)
 
     async def _async_update(self) -> BMSsample:
         """Update battery status information."""
@@ -175,7 +168,7 @@ class BMS(BaseBMS):
             self._log.debug("Incomplete data set %s", self._data_final.keys())
             raise TimeoutError("BMS data incomplete.")
 
-        result: BMSsample = BMS._decode_data(self._data_final)
+        result: BMSsample = BMS._FIELDS.decode(self._data_final)
         return result | {
             "cell_voltages": BMS._cell_voltages(self._data_final[0xF4]),
             "temp_values": BMS._temp_sensors(
@@ -1,12 +1,29 @@
 """Base class defintion for battery management systems (BMS)."""
 
 from abc import ABC, abstractmethod
+from array import array
 import asyncio
-from collections.abc import Callable
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Container,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+import contextlib
 from enum import IntEnum
+from functools import cache
+from itertools import cycle
 import logging
+from operator import attrgetter
+import re
 from statistics import fmean
-from typing import Any, Final, Literal, TypedDict
+from struct import Struct
+import sys
+from time import monotonic
+from typing import Any, Final, Literal, NamedTuple, TypedDict, TypeVar, cast
 
 from bleak import BleakClient
 from bleak.backends.characteristic import BleakGATTCharacteristic
@@ -59,6 +76,7 @@ class BMSmode(IntEnum):
     ABSORPTION = 0x01
     FLOAT = 0x02
 
+
 class BMSsample(TypedDict, total=False):
     """Dictionary representing a sample of battery management system (BMS) data."""
 
@@ -92,6 +110,138 @@ class BMSsample(TypedDict, total=False):
     pack_cycles: list[int]  # [#]
 
 
+class BMScompact(Mapping[str, Any]):
+    """Compact, read-only BMS sample with dict-style access.
+
+    Values are kept in slots instead of a dictionary, vectors (cell voltages,
+    temperatures, pack values) as arrays of single precision or integer values.
+    Equality and hash use the raw array storage, which makes change detection of
+    large banks cheap.
+    """
+
+    _KEYS: Final[tuple[str, ...]] = tuple(BMSsample.__annotations__)
+    _VALUES: Final[Callable[[object], tuple[Any, ...]]] = attrgetter(*_KEYS)
+    _VECTORS: Final[dict[str, str]] = {  # key: array type code
+        "cell_voltages": "f",
+        "temp_values": "f",
+        "pack_voltages": "f",
+        "pack_currents": "f",
+        "pack_battery_levels": "f",
+        "pack_cycles": "l",
+    }
+    _VECTOR_IDX: Final[tuple[int, ...]] = tuple(map(_KEYS.index, _VECTORS))
+    _DIGITS: Final[int] = 7  # significant digits of single precision values
+
+    __slots__ = (*BMSsample.__annotations__, "_hash")
+    _hash: int  # cached hash of the values
+
+    def __init__(self, sample: Mapping[str, Any]) -> None:
+        """Initialize compact sample from BMS values, missing values are None."""
+        for key in BMScompact._KEYS:
+            object.__setattr__(self, key, None)
+        for key, value in sample.items():
+            if key not in BMScompact._KEYS:
+                raise KeyError(key)
+            object.__setattr__(
+                self,
+                key,
+                (
+                    array(BMScompact._VECTORS[key], value)
+                    if key in BMScompact._VECTORS
+                    else value
+                ),
+            )
+
+    def __getitem__(self, key: str) -> Any:
+        """Return value of key, vectors as lists."""
+        if key not in BMScompact._KEYS or (value := getattr(self, key)) is None:
+            raise KeyError(key)
+        if isinstance(value, array):
+            if value.typecode != "f":
+                return value.tolist()
+            # shortest representation of the single precision values
+            return [float(f"{val:.{BMScompact._DIGITS}g}") for val in value]
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        """Return true if the sample has a value for key (no vector conversion)."""
+        return key in BMScompact._KEYS and getattr(self, str(key)) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate keys with a value."""
+        return (key for key in BMScompact._KEYS if getattr(self, key) is not None)
+
+    def __len__(self) -> int:
+        """Return number of values."""
+        return sum(val is not None for val in BMScompact._VALUES(self))
+
+    def raw(self) -> list[Any]:
+        """Return stored values of all keys, vectors as their binary storage."""
+        values: Final[list[Any]] = list(BMScompact._VALUES(self))
+        for idx in BMScompact._VECTOR_IDX:
+            if values[idx] is not None:
+                values[idx] = values[idx].tobytes()
+        return values
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with another sample."""
+        if isinstance(other, BMScompact):
+            return self.raw() == other.raw()
+        if isinstance(other, Mapping):
+            return dict(self) == dict(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Return hash of the stored values (cached, samples are read-only)."""
+        if not hasattr(self, "_hash"):
+            object.__setattr__(self, "_hash", hash(tuple(self.raw())))
+        return self._hash
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Prevent modification, the hash is cached."""
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __or__(self, other: Mapping[str, Any]) -> "BMScompact":
+        """Return a compact sample with the values updated by other."""
+        return BMScompact({**self, **other})
+
+    def __ror__(self, other: Mapping[str, Any]) -> "BMScompact":
+        """Return a compact sample of other updated by the values."""
+        return BMScompact({**other, **self})
+
+    def __repr__(self) -> str:
+        """Return representation of the values."""
+        return f"{type(self).__name__}({dict(self)})"
+
+    def as_dict(self) -> BMSsample:
+        """Return the values as BMS sample dictionary."""
+        return cast("BMSsample", dict(self))
+
+    def diff(self, other: "BMScompact") -> frozenset[str]:
+        """Return keys of values that differ from other, compared in raw storage."""
+        return frozenset(
+            key
+            for key, old, new in zip(
+                BMScompact._KEYS, other.raw(), self.raw(), strict=True
+            )
+            if old != new
+        )
+
+
+type BMSdata = BMSsample | BMScompact  # sample representations held by coordinators
+
+
+def changed_keys(last: Mapping[str, Any], sample: Mapping[str, Any]) -> frozenset[str]:
+    """Return keys of values that were added, removed or changed by the sample."""
+    if isinstance(last, BMScompact) and isinstance(sample, BMScompact):
+        return sample.diff(last)
+    return frozenset(
+        key
+        for key in last.keys() | sample.keys()
+        if key not in last or key not in sample or last[key] != sample[key]
+    )
+
+
 class AdvertisementPattern(TypedDict, total=False):
     """Optional patterns that can match Bleak advertisement data."""
 
@@ -103,6 +253,324 @@ class AdvertisementPattern(TypedDict, total=False):
     connectable: bool  # True if active connections to the device are required
 
 
+type _Frame = bytes | bytearray | memoryview
+_Key = TypeVar("_Key", bound=Hashable)  # reply key of pipelined requests
+
+
+class BMSdp(NamedTuple):
+    """Data point of a BMS frame: position, size, sign, and conversion of a value."""
+
+    key: BMSvalue | BMSpackvalue  # key of the value in the BMS sample
+    pos: int  # position of the value in the frame [bytes]
+    size: int  # size of the value [bytes]
+    signed: bool  # True if value is a signed integer
+    fct: Callable[[int], Any] = lambda x: x  # conversion, e.g. scaling
+    idx: int = -1  # frame identifier (e.g. command) for multi frame protocols
+
+
+class BMScalc(NamedTuple):
+    """Derivation rule of a BMS value: required values and calculation."""
+
+    requires: frozenset[BMSvalue]  # values the calculation uses
+    calc: Callable[[BMSsample], Any]  # calculation, None if value is not available
+
+
+_HRS_TO_SECS: Final[int] = 60 * 60  # seconds in an hour
+
+
+def _runtime(data: BMSsample) -> int | None:
+    """Return the remaining discharge time [s], None if not discharging."""
+    if (current := data.get("current", 0)) >= 0:
+        return None
+    return int(data.get("cycle_charge", 0) / abs(current) * _HRS_TO_SECS)
+
+
+# default rules to calculate values the BMS does not provide
+_CALC_RULES: Final[dict[BMSvalue, BMScalc]] = {
+    "voltage": BMScalc(
+        frozenset({"cell_voltages"}),
+        lambda data: round(sum(data.get("cell_voltages", [])), 3),
+    ),
+    "delta_voltage": BMScalc(
+        frozenset({"cell_voltages"}),
+        lambda data: (
+            round(max(cells) - min(cells), 3)
+            if (cells := data.get("cell_voltages"))
+            else None
+        ),
+    ),
+    "cycle_charge": BMScalc(
+        frozenset({"design_capacity", "battery_level"}),
+        lambda data: data.get("design_capacity", 0)
+        * data.get("battery_level", 0)
+        / 100,
+    ),
+    "battery_level": BMScalc(
+        frozenset({"design_capacity", "cycle_charge"}),
+        lambda data: round(
+            data.get("cycle_charge", 0) * data.get("design_capacity", 0) / 100, 1
+        ),
+    ),
+    "cycle_capacity": BMScalc(
+        frozenset({"voltage", "cycle_charge"}),
+        lambda data: round(data.get("voltage", 0) * data.get("cycle_charge", 0), 3),
+    ),
+    "power": BMScalc(
+        frozenset({"voltage", "current"}),
+        lambda data: round(data.get("voltage", 0) * data.get("current", 0), 3),
+    ),
+    "battery_charging": BMScalc(
+        frozenset({"current"}), lambda data: data.get("current", 0) > 0
+    ),
+    "runtime": BMScalc(frozenset({"current", "cycle_charge"}), _runtime),
+    "temperature": BMScalc(
+        frozenset({"temp_values"}),
+        lambda data: (
+            round(fmean(temps), 3) if (temps := data.get("temp_values")) else None
+        ),
+    ),
+}
+
+
+class BMSdecoder:
+    """Decoder for binary BMS frames that is compiled from a table of data points.
+
+    All non-overlapping data points with a size of 1, 2, 4, or 8 bytes of a frame are
+    combined into a single precompiled struct.Struct, so a frame is decoded with one
+    unpack_from() call without copying slices. Remaining data points, e.g. 3 byte
+    values, are decoded individually.
+    """
+
+    _FMT: Final[dict[int, str]] = {1: "b", 2: "h", 4: "i", 8: "q"}
+
+    class _Plan(NamedTuple):
+        idx: int  # frame identifier
+        start: int  # position of the first data point in the struct
+        end: int  # position after the last data point in the struct
+        unpack: Callable[[_Frame, int], tuple[int, ...]]  # combined struct
+        conv: tuple[  # key and conversion (None for identity) of the struct values
+            tuple[BMSvalue | BMSpackvalue, Callable[[int], Any] | None], ...
+        ]
+        extra: tuple[BMSdp, ...]  # data points not part of the struct
+        fields: tuple[BMSdp, ...]  # all data points of the frame
+
+    def __init__(
+        self, fields: Iterable[BMSdp], byteorder: Literal["big", "little"] = "big"
+    ) -> None:
+        """Compile the decoding plan for each frame of the data point table.
+
+        Args:
+            fields: data points to decode
+            byteorder: byte order of all data points in the frame(s)
+
+        """
+        self._fields: Final[tuple[BMSdp, ...]] = tuple(fields)
+        self.byteorder: Final[Literal["big", "little"]] = byteorder
+        self._plans: Final[tuple[BMSdecoder._Plan, ...]] = tuple(
+            self._compile(idx, tuple(dp for dp in self._fields if dp.idx == idx))
+            for idx in dict.fromkeys(dp.idx for dp in self._fields)
+        )
+
+    def __iter__(self) -> Iterator[BMSdp]:
+        """Iterate over the data points of the decoder."""
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        """Return the number of data points of the decoder."""
+        return len(self._fields)
+
+    def _compile(self, idx: int, fields: tuple[BMSdp, ...]) -> _Plan:
+        fmt: str = ">" if self.byteorder == "big" else "<"
+        conv: list[tuple[BMSvalue | BMSpackvalue, Callable[[int], Any] | None]] = []
+        extra: list[BMSdp] = []
+        start: Final[int] = min(
+            (dp.pos for dp in fields if dp.size in BMSdecoder._FMT), default=0
+        )
+        end: int = start
+        for dp in sorted(fields, key=lambda dp: dp.pos):
+            if dp.size not in BMSdecoder._FMT or dp.pos < end:
+                extra.append(dp)
+                continue
+            fmt += f"{dp.pos - end}x" if dp.pos > end else ""
+            code: str = BMSdecoder._FMT[dp.size]
+            fmt += code if dp.signed else code.upper()
+            conv.append(
+                (dp.key, None if dp.fct is BMSdp._field_defaults["fct"] else dp.fct)
+            )
+            end = dp.pos + dp.size
+        return BMSdecoder._Plan(
+            idx,
+            start,
+            end,
+            Struct(fmt).unpack_from,
+            tuple(conv),
+            tuple(extra),
+            fields,
+        )
+
+    def decode(self, data: _Frame | Mapping[int, _Frame], offset: int = 0) -> BMSsample:
+        """Decode all data points from a frame.
+
+        Data points that exceed the frame or belong to a missing frame are skipped.
+
+        Args:
+            data: single frame, or frames keyed by the data point index
+            offset: shift of all data point positions [bytes]
+
+        Returns:
+            BMSsample: dictionary with the converted values
+
+        """
+        frames: Final[Mapping[int, _Frame]] = (
+            {-1: data} if isinstance(data, bytes | bytearray | memoryview) else data
+        )
+        result: BMSsample = {}
+        for idx, start, end, unpack, conv, extra, fields in self._plans:
+            if (frame := frames.get(idx)) is None:
+                continue
+            if start + offset >= 0 and end + offset <= len(frame):
+                for (key, fct), value in zip(  # length matches by construction
+                    conv, unpack(frame, start + offset), strict=False
+                ):
+                    result[key] = value if fct is None else fct(value)
+                if extra:
+                    self._decode_fields(extra, frame, offset, result)
+            else:
+                self._decode_fields(fields, frame, offset, result)
+        return result
+
+    def _decode_fields(
+        self,
+        fields: tuple[BMSdp, ...],
+        frame: _Frame,
+        offset: int,
+        result: BMSsample,
+    ) -> None:
+        """Decode data points individually, skip the ones exceeding the frame."""
+        for dp in fields:
+            if dp.pos + offset >= 0 and dp.pos + offset + dp.size <= len(frame):
+                result[dp.key] = dp.fct(
+                    int.from_bytes(
+                        frame[dp.pos + offset : dp.pos + offset + dp.size],
+                        self.byteorder,
+                        signed=dp.signed,
+                    )
+                )
+
+
+class BMSbuffer:
+    """Preallocated buffer to reassemble BMS frames from notification fragments.
+
+    Fragments are copied into a ring of fixed size slots, so receiving a frame does not
+    allocate memory. A completed frame is handed out as memoryview of the slot it was
+    assembled in. The slot is reused for the next frame, unless the frame is kept, which
+    keeps it valid until `slots - 1` further frames are kept.
+
+    The end of a frame is detected from its length field if defined, else from the
+    tail byte, else frames have a fixed length of max_len bytes.
+    """
+
+    def __init__(
+        self,
+        max_len: int,
+        *,
+        head: bytes = b"",
+        len_pos: int | None = None,
+        len_size: int = 1,
+        len_add: int = 0,
+        tail: int | None = None,
+        byteorder: Literal["big", "little"] = "big",
+        slots: int = 2,
+    ) -> None:
+        """Allocate the buffer slots.
+
+        Args:
+            max_len: maximum frame length, surplus bytes are dropped [bytes]
+            head: header of a frame, other fragments cannot start a frame
+            len_pos: position of the length field
+            len_size: size of the length field [bytes]
+            len_add: frame length not covered by the length field value [bytes]
+            tail: last byte of a frame without length field
+            byteorder: byte order of the length field
+            slots: number of frames kept valid, including the one in assembly
+
+        """
+        assert max_len > 0 and slots > 0
+        self.max_len: Final[int] = max_len
+        self._head: Final[bytes] = head
+        self._len_start: Final[int] = len_pos or 0
+        self._len_stop: Final[int] = 0 if len_pos is None else len_pos + len_size
+        self._len_add: Final[int] = len_add
+        self._tail: Final[int | None] = tail
+        self._byteorder: Final[Literal["big", "little"]] = byteorder
+        # a header restarts the frame, as long as its length is unknown
+        self._restart: Final[int] = (
+            (self._len_stop or max_len) if head else 1  # empty header: pos 0 only
+        )
+        self._slots: Final[Iterator[memoryview]] = cycle(
+            tuple(memoryview(bytearray(max_len)) for _ in range(slots))
+        )
+        self._buf: memoryview = next(self._slots)
+        self._len: int = 0
+        self.surplus: int = 0  # bytes dropped after the last completed frame
+
+    def __len__(self) -> int:
+        """Return the number of bytes received for the current frame."""
+        return self._len
+
+    def clear(self) -> None:
+        """Discard the current frame."""
+        self._len = 0
+
+    def keep(self) -> None:
+        """Keep the last completed frame valid and assemble the next one in a new slot."""
+        self._buf = next(self._slots)
+
+    def feed(self, data: bytes | bytearray) -> memoryview | None:
+        """Add a notification fragment and return the frame once it is complete.
+
+        A fragment starting with the header begins a new frame, unless the length field
+        of the current frame announces further bytes. Bytes exceeding the frame length
+        are dropped and counted in `surplus`.
+        """
+        pos: int = self._len
+        if pos < self._restart and data.startswith(self._head):
+            pos = 0
+        elif not pos:
+            return None  # frames need to start with the header
+        if not data:
+            return None
+
+        buf: Final[memoryview] = self._buf
+        end: Final[int] = pos + len(data)
+        if end > self.max_len:
+            buf[pos:] = memoryview(data)[: self.max_len - pos]
+            pos = self.max_len
+        else:
+            buf[pos:end] = data
+            pos = end
+        self._len = pos
+
+        length: int = pos
+        if self._len_stop:
+            if pos < self._len_stop:
+                return None
+            length = (
+                int.from_bytes(buf[self._len_start : self._len_stop], self._byteorder)
+                + self._len_add
+            )
+            if pos < length:
+                if pos < self.max_len:
+                    return None
+                length = pos
+        elif pos < self.max_len and buf[pos - 1] != self._tail:
+            return None
+
+        self._len = 0
+        self.surplus = end - length
+        return buf[:length]
+
+
 class BaseBMS(ABC):
     """Abstract base class for battery management system."""
 
@@ -110,7 +578,15 @@ class BaseBMS(ABC):
     _MAX_TIMEOUT_FACTOR: Final[int] = 8  # limit timout increase to 8x
     TIMEOUT: Final[float] = BLEAK_TRANSIENT_BACKOFF_TIME * _MAX_TIMEOUT_FACTOR
     _MAX_CELL_VOLT: Final[float] = 5.906  # max cell potential
-    _HRS_TO_SECS: Final[int] = 60 * 60  # seconds in an hour
+    _IDLE_FACTOR: Final[int] = 10  # default idle timeout relative to connect time
+    _AVG_WEIGHT: Final[float] = 0.25  # weight of new samples in connection statistics
+    _STREAM_PERIOD: Final[float] = 1.0  # minimum time between streamed samples [s]
+    _REPLY_WINDOW: Final[int] = 4  # max. pipelined requests awaiting their reply
+    # reply timeout from response time statistics (RFC 6298)
+    _RTT_ALPHA: Final[float] = 0.125  # weight of new samples in the average
+    _RTT_BETA: Final[float] = 0.25  # weight of new samples in the deviation
+    _RTT_K: Final[int] = 4  # timeout as average plus multiple of the deviation
+    _MIN_TIMEOUT: Final[float] = 0.05  # lower limit of learned timeouts [s]
 
     def __init__(
         self,
@@ -130,17 +606,19 @@ class BaseBMS(ABC):
             reconnect (bool): if true, the connection will be closed after each update
 
         """
-        assert (
-            getattr(self, "_notification_handler", None) is not None
-        ), "BMS class must define _notification_handler method"
+        assert getattr(self, "_notification_handler", None) is not None, (
+            "BMS class must define _notification_handler method"
+        )
         self._ble_device: Final[BLEDevice] = ble_device
         self._reconnect: Final[bool] = reconnect
         self.name: Final[str] = self._ble_device.name or "undefined"
         self._log: Final[logging.Logger] = logging.getLogger(
             f"{logger_name.replace('.plugins', '')}::{self.name}:"
-            f"{self._ble_device.address[-5:].replace(':','')})"
+            f"{self._ble_device.address[-5:].replace(':', '')})"
         )
         self._inv_wr_mode: bool | None = None  # invert write mode (WNR <-> W)
+        # request: average response time, mean deviation [s]
+        self._rtt: dict[bytes, tuple[float, float]] = {}
 
         self._log.debug(
             "initializing %s, BT address: %s", self.device_id(), ble_device.address
@@ -152,6 +630,20 @@ class BaseBMS(ABC):
         )
         self._data: bytearray = bytearray()
         self._data_event: Final[asyncio.Event] = asyncio.Event()
+        self._replies: dict[Hashable, asyncio.Future[Any]] = {}  # pipelined requests
+        self._tx_lock: Final[asyncio.Lock] = asyncio.Lock()
+        # managed connection mode
+        self._managed: bool = False
+        self._idle_timeout: float | None = None  # None: derive from connect time
+        self._link_task: asyncio.Task[None] | None = None
+        self._link_busy: bool = False  # link task is (dis)connecting
+        self._t_connect: float = 0  # average connect time [s]
+        self._t_poll: float = 0  # average time between updates [s]
+        self._t_last: float = 0  # start of last update (monotonic) [s]
+        # streaming mode
+        self._stream_cb: Callable[[BMSsample], None] | None = None
+        self._stream_period: float = BaseBMS._STREAM_PERIOD
+        self._t_stream: float = 0  # time of last streamed sample (monotonic) [s]
 
     @staticmethod
     @abstractmethod
@@ -171,15 +663,42 @@ class BaseBMS(ABC):
         """Return device information as string."""
         return " ".join(cls.device_info().values())
 
+    @classmethod
+    @cache
+    def _matchers(cls) -> tuple[BluetoothMatcherOptional, ...]:
+        """Return the Bluetooth matchers of the BMS type, built once per class."""
+        return tuple(
+            BluetoothMatcherOptional(**matcher_dict)
+            for matcher_dict in cls.matcher_dict_list()
+        )
+
     @classmethod
     def supported(cls, discovery_info: BluetoothServiceInfoBleak) -> bool:
         """Return true if service_info matches BMS type."""
-        for matcher_dict in cls.matcher_dict_list():
-            if ble_device_matches(
-                BluetoothMatcherOptional(**matcher_dict), discovery_info
-            ):
-                return True
-        return False
+        return any(
+            ble_device_matches(matcher, discovery_info) for matcher in cls._matchers()
+        )
+
+    @staticmethod
+    def decode_advertisement(service_info: BluetoothServiceInfoBleak) -> BMSsample:
+        """Return BMS values broadcast in the advertisement, empty if there are none.
+
+        BMS types that broadcast their state override this to allow passive updates.
+        """
+        return {}
+
+    @classmethod
+    def decodes_advertisement(cls) -> bool:
+        """Return true if the BMS type provides values in its advertisements."""
+        return cls.decode_advertisement is not BaseBMS.decode_advertisement
+
+    def advertisement_update(
+        self, service_info: BluetoothServiceInfoBleak
+    ) -> BMSsample:
+        """Return BMS values from an advertisement including calculated values."""
+        if data := self.decode_advertisement(service_info):
+            self._add_missing_values(data, self._calc_values())
+        return data
 
     @staticmethod
     @abstractmethod
@@ -205,7 +724,33 @@ class BaseBMS(ABC):
         return frozenset()
 
     @staticmethod
-    def _add_missing_values(data: BMSsample, values: frozenset[BMSvalue]) -> None:
+    @cache
+    def _calc_plan(values: frozenset[BMSvalue]) -> tuple[tuple[BMSvalue, BMScalc], ...]:
+        """Return the derivation rules of the values in dependency order.
+
+        Values are placed after the requested values they are derived from. Mutually
+        dependent rules (e.g. cycle charge and battery level) keep the first visited
+        order, as only one of them can be missing.
+        """
+        plan: dict[BMSvalue, BMScalc] = {}
+        visiting: set[BMSvalue] = set()
+
+        def visit(value: BMSvalue) -> None:
+            if value in plan or value in visiting or value not in values:
+                return
+            if (rule := _CALC_RULES.get(value)) is None:
+                return
+            visiting.add(value)
+            for required in sorted(rule.requires):
+                visit(required)
+            plan[value] = rule
+
+        for value in _CALC_RULES:
+            visit(value)
+        return tuple(plan.items())
+
+    @classmethod
+    def _add_missing_values(cls, data: BMSsample, values: frozenset[BMSvalue]) -> None:
         """Calculate missing BMS values from existing ones.
 
         Args:
@@ -219,70 +764,13 @@ class BaseBMS(ABC):
         if not values or not data:
             return
 
-        def can_calc(value: BMSvalue, using: frozenset[BMSvalue]) -> bool:
-            """Check value to add does not exist, is requested, and needed data is available."""
-            return (value in values) and (value not in data) and using.issubset(data)
-
-        cell_voltages: Final[list[float]] = data.get("cell_voltages", [])
         battery_level: Final[int | float] = data.get("battery_level", 0)
-        current: Final[float] = data.get("current", 0)
-
-        calculations: dict[BMSvalue, tuple[set[BMSvalue], Callable[[], Any]]] = {
-            "voltage": ({"cell_voltages"}, lambda: round(sum(cell_voltages), 3)),
-            "delta_voltage": (
-                {"cell_voltages"},
-                lambda: (
-                    round(max(cell_voltages) - min(cell_voltages), 3)
-                    if len(cell_voltages)
-                    else None
-                ),
-            ),
-            "cycle_charge": (
-                {"design_capacity", "battery_level"},
-                lambda: (data.get("design_capacity", 0) * battery_level) / 100,
-            ),
-            "battery_level": (
-                {"design_capacity", "cycle_charge"},
-                lambda: round(
-                    data.get("cycle_charge", 0) * data.get("design_capacity", 0) / 100,
-                    1,
-                ),
-            ),
-            "cycle_capacity": (
-                {"voltage", "cycle_charge"},
-                lambda: round(data.get("voltage", 0) * data.get("cycle_charge", 0), 3),
-            ),
-            "power": (
-                {"voltage", "current"},
-                lambda: round(data.get("voltage", 0) * current, 3),
-            ),
-            "battery_charging": ({"current"}, lambda: current > 0),
-            "runtime": (
-                {"current", "cycle_charge"},
-                lambda: (
-                    int(
-                        data.get("cycle_charge", 0)
-                        / abs(current)
-                        * BaseBMS._HRS_TO_SECS
-                    )
-                    if current < 0
-                    else None
-                ),
-            ),
-            "temperature": (
-                {"temp_values"},
-                lambda: (
-                    round(fmean(data.get("temp_values", [])), 3)
-                    if data.get("temp_values")
-                    else None
-                ),
-            ),
-        }
 
-        for attr, (required, calc_func) in calculations.items():
+        for attr, (required, calc_func) in cls._calc_plan(values):
             if (
-                can_calc(attr, frozenset(required))
-                and (value := calc_func()) is not None
+                attr not in data
+                and required.issubset(data)
+                and (value := calc_func(data)) is not None
             ):
                 data[attr] = value
 
@@ -292,7 +780,10 @@ class BaseBMS(ABC):
                 data.get("problem", False),
                 data.get("problem_code", False),
                 data.get("voltage") is not None and data.get("voltage", 0) <= 0,
-                any(v <= 0 or v > BaseBMS._MAX_CELL_VOLT for v in cell_voltages),
+                any(
+                    v <= 0 or v > BaseBMS._MAX_CELL_VOLT
+                    for v in data.get("cell_voltages", [])
+                ),
                 data.get("delta_voltage", 0) > BaseBMS._MAX_CELL_VOLT,
                 data.get("cycle_charge") is not None
                 and data.get("cycle_charge", 0.0) <= 0.0,
@@ -322,6 +813,7 @@ class BaseBMS(ABC):
             return
 
         self._log.debug("connecting BMS")
+        start: Final[float] = monotonic()
         self._client = await establish_connection(
             client_class=BleakClient,
             device=self._ble_device,
@@ -339,6 +831,8 @@ class BaseBMS(ABC):
             await self.disconnect()
             raise
 
+        self._t_connect = BaseBMS._avg(self._t_connect, monotonic() - start)
+
     def _wr_response(self, char: int | str) -> bool:
         char_tx: Final[BleakGATTCharacteristic | None] = (
             self._client.services.get_characteristic(char)
@@ -387,16 +881,17 @@ class BaseBMS(ABC):
             try:
                 for attempt in range(BaseBMS.MAX_RETRY):
                     self._data_event.clear()  # clear event before requesting new data
+                    start: float = monotonic()
                     await self._send_msg(
                         data, max_size, char or self.uuid_tx(), attempt, inv_wr_mode
                     )
                     try:
                         if wait_for_notify:
                             await asyncio.wait_for(
-                                self._wait_event(),
-                                BLEAK_TRANSIENT_BACKOFF_TIME
-                                * min(2**attempt, BaseBMS._MAX_TIMEOUT_FACTOR),
+                                self._wait_event(), self._reply_timeout(data, attempt)
                             )
+                            if not attempt:  # replies to retries are ambiguous
+                                self._rtt_sample(data, monotonic() - start)
                     except TimeoutError:
                         self._log.debug("TX BLE request timed out.")
                         continue  # retry sending data
@@ -412,15 +907,163 @@ class BaseBMS(ABC):
                 await self._connect()
         raise TimeoutError
 
+    def _reply_timeout(self, request: bytes, attempt: int) -> float:
+        """Return the reply timeout of a request attempt [s].
+
+        Without response times of the request, the timeout doubles from the transient
+        backoff time for each attempt. Otherwise it doubles from the average response
+        time plus a multiple of its deviation. Both are limited to the maximum timeout.
+        """
+        if (rtt := self._rtt.get(request)) is None:
+            return BLEAK_TRANSIENT_BACKOFF_TIME * min(
+                1 << attempt, BaseBMS._MAX_TIMEOUT_FACTOR
+            )
+        return min(
+            max(rtt[0] + BaseBMS._RTT_K * rtt[1], BaseBMS._MIN_TIMEOUT)
+            * (1 << attempt),
+            BLEAK_TRANSIENT_BACKOFF_TIME * BaseBMS._MAX_TIMEOUT_FACTOR,
+        )
+
+    def _rtt_sample(self, request: bytes, rtt: float) -> None:
+        """Update the response time statistics of a request."""
+        if (est := self._rtt.get(request)) is None:
+            self._rtt[request] = (rtt, rtt / 2)
+            return
+        self._rtt[request] = (
+            est[0] + BaseBMS._RTT_ALPHA * (rtt - est[0]),
+            est[1] + BaseBMS._RTT_BETA * (abs(rtt - est[0]) - est[1]),
+        )
+
+    @property
+    def connect_time(self) -> float:
+        """Return the average time [s] to connect and initialize the BMS."""
+        return self._t_connect
+
+    @property
+    def link_profile(self) -> dict[str, Any]:
+        """Return the learned write mode, response times and protocol parameters.
+
+        The profile is JSON serializable.
+        """
+        return {
+            "inv_wr_mode": self._inv_wr_mode,
+            "rtt": {request.hex(): list(rtt) for request, rtt in self._rtt.items()},
+            "protocol": self._protocol_state(),
+        }
+
+    def restore_link_profile(self, profile: Mapping[str, Any]) -> None:
+        """Restore the write mode, response times and protocol parameters."""
+        self._inv_wr_mode = profile.get("inv_wr_mode")
+        self._rtt = {
+            bytes.fromhex(request): (float(rtt[0]), float(rtt[1]))
+            for request, rtt in profile.get("rtt", {}).items()
+        }
+        self._restore_protocol_state(profile.get("protocol", {}))
+
+    def _protocol_state(self) -> dict[str, Any]:
+        """Return protocol parameters learned from the BMS (JSON serializable).
+
+        BMS types that negotiate parameters on connect override this and
+        `_restore_protocol_state` to skip the negotiation once the parameters are known.
+        """
+        return {}
+
+    def _restore_protocol_state(self, state: Mapping[str, Any]) -> None:
+        """Restore protocol parameters learned from the BMS before."""
+
+    def _set_reply(self, key: Hashable, value: Any) -> bool:
+        """Deliver the reply to a pipelined request, return false if not expected."""
+        if (reply := self._replies.get(key)) is None or reply.done():
+            return False
+        reply.set_result(value)
+        self._data_event.set()  # also completes _await_reply()
+        return True
+
+    async def _await_replies(
+        self,
+        requests: Mapping[_Key, bytes],
+        char: int | str | None = None,
+        window: int = _REPLY_WINDOW,
+        max_size: int = 0,
+    ) -> dict[_Key, Any]:
+        """Send requests to the BMS and wait for all replies.
+
+        Requests are written in order while at most window of them await their reply.
+        The notification handler matches replies to requests by calling _set_reply()
+        with the key of the request.
+
+        Args:
+            requests (Mapping): key of the expected reply and request to send
+            char (int | str | None): characteristic to write to, default uuid_tx()
+            window (int): maximum number of requests awaiting their reply
+            max_size (int): maximum size of a write, 0 for no limit
+
+        Returns:
+            dict: key and value of the replies in order of the requests
+
+        """
+        loop: Final[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        slots: Final[asyncio.Semaphore] = asyncio.Semaphore(window)
+
+        async def _request(key: _Key) -> None:
+            async with slots:
+                await self._request_reply(key, requests[key], char, max_size)
+
+        self._replies = {key: loop.create_future() for key in requests}
+        try:
+            if self._inv_wr_mode is None and requests:  # detect write mode first
+                await self._await_reply(
+                    next(iter(requests.values())), char, max_size=max_size
+                )
+            results: Final[list[BaseException | None]] = await asyncio.gather(
+                *(_request(key) for key in requests if not self._replies[key].done()),
+                return_exceptions=True,
+            )
+            if errors := [err for err in results if err is not None]:
+                raise errors[0]
+            return {key: self._replies[key].result() for key in requests}
+        finally:
+            self._replies = {}
+
+    async def _request_reply(
+        self, key: Hashable, data: bytes, char: int | str | None, max_size: int
+    ) -> None:
+        """Send a pipelined request and wait for its reply, retry on timeout."""
+        reply: Final[asyncio.Future[Any]] = self._replies[key]
+        for attempt in range(BaseBMS.MAX_RETRY):
+            start: float = monotonic()
+            async with self._tx_lock:
+                await self._send_msg(
+                    data,
+                    max_size,
+                    char or self.uuid_tx(),
+                    attempt,
+                    bool(self._inv_wr_mode),
+                )
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    asyncio.shield(reply), self._reply_timeout(data, attempt)
+                )
+                if not attempt:  # replies to retries are ambiguous
+                    self._rtt_sample(data, monotonic() - start)
+                return
+            self._log.debug("TX BLE request timed out.")
+        raise TimeoutError
+
     async def disconnect(self, reset: bool = False) -> None:
         """Disconnect the BMS, includes stoping notifications."""
 
+        if self._link_task and self._link_task is not asyncio.current_task():
+            self._link_task.cancel()  # do not reopen the link
+            self._link_task = None
+
         if self._client.is_connected:
             self._log.debug("disconnecting BMS")
             try:
                 self._data_event.clear()
                 if reset:
                     self._inv_wr_mode = None  # reset write mode
+                    self._rtt.clear()
                 await self._client.disconnect()
             except BleakError:
                 self._log.warning("disconnect failed!")
@@ -445,56 +1088,333 @@ class BaseBMS(ABC):
             BMSsample: dictionary with BMS values
 
         """
+        await self._stop_link_task()
+        start: Final[float] = monotonic()
+        if self._t_last:
+            self._t_poll = BaseBMS._avg(self._t_poll, start - self._t_last)
+        self._t_last = start
+
         await self._connect()
 
         data: BMSsample = await self._async_update()
         self._add_missing_values(data, self._calc_values())
 
+        await self._release_link()
+        return data
+
+    @contextlib.asynccontextmanager
+    async def hold_link(self) -> AsyncIterator[None]:
+        """Hold the link for commands between updates.
+
+        The link management is stopped while the commands run and restarted after,
+        so an idle link is not closed in between.
+        """
+        await self._stop_link_task()
+        try:
+            yield
+        finally:
+            await self._release_link()
+
+    async def _release_link(self) -> None:
+        """Disconnect or hand the link to the link management after its use."""
         if self._reconnect:
             # disconnect after data update to force reconnect next time (slow!)
             await self.disconnect()
+        elif self._managed and self._stream_cb is None:
+            self._link_task = asyncio.create_task(self._manage_link())
 
-        return data
+    def manage_connection(self, idle_timeout: float | None = None) -> None:
+        """Keep the connection open between updates only while they are frequent.
+
+        After an update the link stays open if the next update is expected within the
+        idle timeout, otherwise it is closed and reopened ahead of the next update.
+        Links that stay unused for the idle timeout are closed.
+
+        Args:
+            idle_timeout (float | None): maximum idle time of an open link [s],
+                None: derive from the measured connect time
+
+        """
+        self._managed = True
+        self._idle_timeout = idle_timeout
+
+    @classmethod
+    def streams(cls) -> bool:
+        """Return true if the BMS type publishes its values unsolicited."""
+        return cls._latest_sample is not BaseBMS._latest_sample
+
+    def stream(
+        self,
+        callback: Callable[[BMSsample], None] | None,
+        period: float = _STREAM_PERIOD,
+    ) -> None:
+        """Push samples of unsolicited frames to a callback while connected.
+
+        Samples are limited to one per period, further frames are dropped. In managed
+        connection mode the link is kept open while streaming.
+
+        Args:
+            callback (Callable | None): receives the samples, None: stop streaming
+            period (float): minimum time between samples [s]
+
+        """
+        self._stream_cb = callback
+        self._stream_period = period
+
+    def _latest_sample(self) -> BMSsample:
+        """Return BMS values from the latest received frames, empty if unavailable.
+
+        BMS types that publish frames unsolicited override this to allow streaming.
+        """
+        return {}
+
+    def _push_sample(self) -> None:
+        """Push the latest sample to the stream callback, if the period has passed."""
+        if self._stream_cb is None or (
+            (now := monotonic()) - self._t_stream < self._stream_period
+        ):
+            return
+        if not (data := self._latest_sample()):
+            return
+        self._t_stream = now
+        self._add_missing_values(data, self._calc_values())
+        self._stream_cb(data)
+
+    @property
+    def idle_timeout(self) -> float:
+        """Return the maximum idle time of an open link in managed mode [s]."""
+        if self._idle_timeout is not None:
+            return self._idle_timeout
+        return BaseBMS._IDLE_FACTOR * self._t_connect
+
+    @staticmethod
+    def _avg(average: float, sample: float) -> float:
+        """Return the exponential moving average including a new sample."""
+        if not average:
+            return sample
+        return average + BaseBMS._AVG_WEIGHT * (sample - average)
+
+    async def _manage_link(self) -> None:
+        """Close the idle link and reopen it ahead of the next update.
+
+        A reopened link is closed again, if the next update does not use it within
+        the idle timeout.
+        """
+        idle: Final[float] = self._t_poll - (monotonic() - self._t_last)
+        if idle > self.idle_timeout:
+            self._log.debug("closing link, next update in %.1fs", idle)
+            self._link_busy = True
+            await self.disconnect()
+            self._link_busy = False
+            await asyncio.sleep(idle - self._t_connect)
+            self._link_busy = True
+            try:
+                await self._connect()
+            except (BleakError, EOFError, TimeoutError, ConnectionError) as err:
+                self._log.debug("reopening link failed (%s)", type(err).__name__)
+                return
+            if self._link_task is not asyncio.current_task():
+                return  # the next update waits for the reopened link
+            self._link_busy = False
+
+        await asyncio.sleep(self.idle_timeout)  # cancelled by the next update
+        self._log.debug("closing idle link")
+        self._link_busy = True
+        await self.disconnect()
+
+    async def _stop_link_task(self) -> None:
+        """Stop the link management, pending (dis)connects are completed."""
+        if (task := self._link_task) is None:
+            return
+        self._link_task = None
+        if not self._link_busy:
+            task.cancel()
+        await asyncio.wait((task,))
+        self._link_busy = False
 
 
-def crc_modbus(data: bytearray) -> int:
-    """Calculate CRC-16-CCITT MODBUS."""
-    crc: int = 0xFFFF
-    for i in data:
-        crc ^= i & 0xFF
+class BMSmatcher:
+    """Index of the advertisement matchers of BMS types.
+
+    Each matcher is filed under one key it requires: the manufacturer ID, else the
+    start of the local name up to the first wildcard, else the service (data) UUID.
+    Matchers without such a key are candidates for all advertisements. Looking up
+    the keys of an advertisement narrows the BMS types to the ones that can match,
+    the full match is left to `BaseBMS.supported`.
+    """
+
+    _NAME_LEN: Final[int] = 3  # [#] characters of the local name used as key
+
+    def __init__(
+        self, bms_types: Iterable[tuple[str, list[AdvertisementPattern]]]
+    ) -> None:
+        """Initialize index from BMS types with their matchers in priority order."""
+        self._types: Final[list[str]] = []
+        self._manufacturer_ids: Final[dict[int, set[int]]] = {}
+        self._names: Final[dict[str, set[int]]] = {}
+        self._uuids: Final[dict[str, set[int]]] = {}
+        self._any: Final[set[int]] = set()
+        for pos, (bms_type, matchers) in enumerate(bms_types):
+            self._types.append(bms_type)
+            for matcher in matchers:
+                self._add(pos, matcher)
+        self._name_lens: Final[frozenset[int]] = frozenset(map(len, self._names))
+
+    def _add(self, pos: int, matcher: AdvertisementPattern) -> None:
+        """Add matcher of the BMS type at position pos to the index."""
+        prefix: Final[str] = re.split(
+            r"[*?\[]", matcher.get("local_name", ""), maxsplit=1
+        )[0]
+        if (m_id := matcher.get("manufacturer_id")) is not None:
+            self._manufacturer_ids.setdefault(m_id, set()).add(pos)
+        elif prefix:
+            self._names.setdefault(prefix[: BMSmatcher._NAME_LEN], set()).add(pos)
+        elif uuid := matcher.get("service_uuid", matcher.get("service_data_uuid")):
+            self._uuids.setdefault(uuid, set()).add(pos)
+        else:
+            self._any.add(pos)
+
+    def candidates(self, service_info: BluetoothServiceInfoBleak) -> list[str]:
+        """Return the BMS types that can match the advertisement in priority order."""
+        found: Final[set[int]] = self._any.copy()
+        for m_id in service_info.manufacturer_data:
+            found.update(self._manufacturer_ids.get(m_id, ()))
+        for uuid in (*service_info.service_uuids, *service_info.service_data):
+            found.update(self._uuids.get(uuid, ()))
+        for length in self._name_lens:
+            found.update(self._names.get(service_info.name[:length], ()))
+        return [self._types[pos] for pos in sorted(found)]
+
+
+_ARRAY_CODES: Final[dict[int, str]] = {1: "b", 2: "h", 4: "i"}
+
+
+def int_array(
+    data: _Frame,
+    start: int,
+    count: int,
+    size: int = 2,
+    byteorder: Literal["big", "little"] = "big",
+    signed: bool = False,
+) -> array[int]:
+    """Return a contiguous run of integer registers from a frame in one pass.
+
+    Registers that exceed the frame are omitted.
+
+    Args:
+        data: frame to read from
+        start: position of the first register [bytes]
+        count: number of registers
+        size: size of a single register (1, 2, or 4) [bytes]
+        byteorder: byte order of the registers
+        signed: True if registers are signed integers
+
+    """
+    values: Final[array[int]] = array(
+        _ARRAY_CODES[size] if signed else _ARRAY_CODES[size].upper()
+    )
+    count = max(0, min(count, (len(data) - start) // size))
+    values.frombytes(data[start : start + count * size])
+    if size > 1 and byteorder != sys.byteorder:
+        values.byteswap()
+    return values
+
+
+def scaled_values(
+    data: _Frame,
+    start: int,
+    count: int,
+    *,
+    size: int = 2,
+    byteorder: Literal["big", "little"] = "big",
+    signed: bool = False,
+    offset: float = 0,
+    divider: int = 1,
+    skip: Container[int] = (),
+) -> list[float]:
+    """Return (register - offset) / divider for a contiguous run of registers.
+
+    Args:
+        data: frame to read from
+        start: position of the first register [bytes]
+        count: number of registers
+        size: size of a single register (1, 2, or 4) [bytes]
+        byteorder: byte order of the registers
+        signed: True if registers are signed integers
+        offset: offset to subtract from the raw value, e.g. 2731 for 0.1 K
+        divider: divider to scale the value, e.g. 1000 for mV
+        skip: raw values to drop, e.g. 0 for unused cells
+
+    """
+    return [
+        (value - offset) / divider
+        for value in int_array(data, start, count, size, byteorder, signed)
+        if value not in skip
+    ]
+
+
+def _crc_table(poly: int, width: int, reflected: bool) -> tuple[int, ...]:
+    """Return the 256 entry lookup table for a CRC with given polynomial and width."""
+    msb: Final[int] = 1 << (width - 1)
+    table: list[int] = []
+    for byte in range(256):
+        crc: int = byte if reflected else byte << (width - 8)
         for _ in range(8):
-            crc = (crc >> 1) ^ 0xA001 if crc % 2 else (crc >> 1)
-    return crc & 0xFFFF
+            if reflected:
+                crc = (crc >> 1) ^ poly if crc & 0x1 else crc >> 1
+            else:
+                crc = (crc << 1) ^ poly if crc & msb else crc << 1
+        table.append(crc & ((1 << width) - 1))
+    return tuple(table)
+
 
+_CRC_MODBUS_TABLE: Final[tuple[int, ...]] = _crc_table(0xA001, 16, True)
+_CRC_XMODEM_TABLE: Final[tuple[int, ...]] = _crc_table(0x1021, 16, False)
+_CRC8_TABLE: Final[tuple[int, ...]] = _crc_table(0x8C, 8, True)
 
-def lrc_modbus(data: bytearray) -> int:
+
+def crc_modbus(data: _Frame, crc: int = 0xFFFF) -> int:
+    """Calculate CRC-16-CCITT MODBUS.
+
+    crc : int, optional
+        CRC of the preceding fragment(s) to continue the calculation (default: init value).
+    """
+    crc &= 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ _CRC_MODBUS_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def lrc_modbus(data: _Frame) -> int:
     """Calculate MODBUS LRC."""
     return ((sum(data) ^ 0xFFFF) + 1) & 0xFFFF
 
 
-def crc_xmodem(data: bytearray) -> int:
-    """Calculate CRC-16-CCITT XMODEM."""
-    crc: int = 0x0000
+def crc_xmodem(data: _Frame, crc: int = 0x0000) -> int:
+    """Calculate CRC-16-CCITT XMODEM.
+
+    crc : int, optional
+        CRC of the preceding fragment(s) to continue the calculation (default: init value).
+    """
+    crc &= 0xFFFF
     for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = (crc << 1) ^ 0x1021 if (crc & 0x8000) else (crc << 1)
-    return crc & 0xFFFF
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_XMODEM_TABLE[(crc >> 8) ^ byte]
+    return crc
 
 
-def crc8(data: bytearray) -> int:
-    """Calculate CRC-8/MAXIM-DOW."""
-    crc: int = 0x00  # Initialwert für CRC
+def crc8(data: _Frame, crc: int = 0x00) -> int:
+    """Calculate CRC-8/MAXIM-DOW.
 
+    crc : int, optional
+        CRC of the preceding fragment(s) to continue the calculation (default: init value).
+    """
+    crc &= 0xFF
     for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            crc = (crc >> 1) ^ 0x8C if crc & 0x1 else crc >> 1
-
-    return crc & 0xFF
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
 
 
-def crc_sum(frame: bytearray, size: int = 1) -> int:
+def crc_sum(frame: _Frame, size: int = 1) -> int:
     """Calculate the checksum of a frame using a specified size.
 
     size : int, optional
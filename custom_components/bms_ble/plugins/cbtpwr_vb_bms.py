@@ -1,14 +1,24 @@
 """Module to support CBT Power VB series BMS."""
 
-from collections.abc import Callable
+from binascii import unhexlify
 from string import hexdigits
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue, lrc_modbus
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSbuffer,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    lrc_modbus,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -23,18 +33,23 @@ class BMS(BaseBMS):
     _MAX_LEN: Final[int] = 255
     _CELL_POS: Final[int] = 6
 
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, bool, Callable[[int], Any]]]] = [
-        ("voltage", 2, 2, False, lambda x: float(x) / 10),
-        ("current", 0, 2, True, lambda x: float(x) / 10),
-        ("battery_level", 4, 2, False, lambda x: min(x, 100)),
-        ("cycles", 7, 2, False, lambda x: x),
-        ("problem_code", 15, 6, False, lambda x: x & 0xFFF000FF000F),
-    ]
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
+        (
+            BMSdp("voltage", 2, 2, False, lambda x: float(x) / 10),
+            BMSdp("current", 0, 2, True, lambda x: float(x) / 10),
+            BMSdp("battery_level", 4, 2, False, lambda x: min(x, 100)),
+            BMSdp("cycles", 7, 2, False),
+            BMSdp("problem_code", 15, 6, False, lambda x: x & 0xFFF000FF000F),
+        )
+    )
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Initialize BMS."""
         super().__init__(__name__, ble_device, reconnect)
-        self._exp_len: int = 0
+        self._buffer: Final[BMSbuffer] = BMSbuffer(
+            BMS._MIN_LEN + 0xFFF, head=BMS._HEAD, tail=BMS._TAIL[0], slots=1
+        )
+        self._data_final: bytes = b""
 
     @staticmethod
     def matcher_dict_list() -> list[AdvertisementPattern]:
@@ -89,92 +104,51 @@ class BMS(BaseBMS):
     ) -> None:
         """Handle the RX characteristics notify event (new data arrives)."""
 
-        if len(data) > BMS._LEN_POS + 4 and data.startswith(BMS._HEAD):
-            self._data = bytearray()
-            try:
-                length: Final[int] = int(data[BMS._LEN_POS : BMS._LEN_POS + 4], 16)
-                self._exp_len = length & 0xFFF
-                if BMS.lencs(length) != length >> 12:
-                    self._exp_len = 0
-                    self._log.debug("incorrect length checksum.")
-            except ValueError:
-                self._exp_len = 0
-
-        self._data += data
-        self._log.debug(
-            "RX BLE data (%s): %s", "start" if data == self._data else "cnt.", data
-        )
-
-        if len(self._data) < self._exp_len + BMS._MIN_LEN:
+        self._log.debug("RX BLE data: %s", data)
+        if (frame := self._buffer.feed(data)) is None:
             return
 
-        if not self._data.endswith(BMS._TAIL):
+        if len(frame) < BMS._MIN_LEN or frame[-1] != BMS._TAIL[0]:
             self._log.debug("incorrect EOF: %s", data)
-            self._data.clear()
             return
 
-        if not all(chr(c) in hexdigits for c in self._data[1:-1]):
+        if not all(chr(c) in hexdigits for c in frame[1:-1]):
             self._log.debug("incorrect frame encoding.")
-            self._data.clear()
             return
 
-        if (ver := bytes.fromhex(self._data[1:3].decode())) != BMS._RSP_VER.to_bytes():
+        if (ver := unhexlify(frame[1:3])) != BMS._RSP_VER.to_bytes():
             self._log.debug("unknown response frame version: 0x%X", int.from_bytes(ver))
-            self._data.clear()
             return
 
-        if (crc := lrc_modbus(self._data[1:-5])) != int(self._data[-5:-1], 16):
+        if (crc := lrc_modbus(frame[1:-5])) != int.from_bytes(unhexlify(frame[-5:-1])):
             self._log.debug(
-                "invalid checksum 0x%X != 0x%X", crc, int(self._data[-5:-1], 16)
+                "invalid checksum 0x%X != 0x%X",
+                crc,
+                int.from_bytes(unhexlify(frame[-5:-1])),
             )
-            self._data.clear()
             return
 
-        self._data = bytearray(
-            bytes.fromhex(self._data.strip(BMS._HEAD + BMS._TAIL).decode())
-        )
+        self._data_final = unhexlify(frame[1:-1])
         self._data_event.set()
 
+    async def _init_connection(self) -> None:
+        """Initialize RX/TX characteristics and frame buffer."""
+        await super()._init_connection()
+        self._buffer.clear()
+
     @staticmethod
     def lencs(length: int) -> int:
         """Calculate the length checksum."""
         return (sum((length >> (i * 4)) & 0xF for i in range(3)) ^ 0xF) + 1 & 0xF
 
     @staticmethod
-    def _cell_voltages(data: bytearray, cells: int) -> list[float]:
+    def _cell_voltages(data: bytes, cells: int) -> list[float]:
         """Return cell voltages from status message."""
-        return [
-            int.from_bytes(
-                data[BMS._CELL_POS + 1 + idx * 2 : BMS._CELL_POS + idx * 2 + 3],
-                byteorder="big",
-                signed=False,
-            )
-            / 1000
-            for idx in range(cells)
-        ]
-
-    @staticmethod
-    def _temp_sensors(data: bytearray, sensors: int, offs: int) -> list[float]:
-        return [
-            (value) / 10
-            for idx in range(sensors)
-            if (
-                value := int.from_bytes(
-                    data[offs + idx * 2 : offs + (idx + 1) * 2],
-                    byteorder="big",
-                    signed=True,
-                )
-            )
-        ]
+        return scaled_values(data, BMS._CELL_POS + 1, cells, divider=1000)
 
     @staticmethod
-    def _decode_data(data: bytearray, offs: int) -> BMSsample:
-        result: BMSsample = {}
-        for key, idx, size, sign, func in BMS._FIELDS:
-            result[key] = func(
-                int.from_bytes(data[idx + offs : idx + offs + size], "big", signed=sign)
-            )
-        return result
+    def _temp_sensors(data: bytes, sensors: int, offs: int) -> list[float]:
+        return scaled_values(data, offs, sensors, signed=True, divider=10, skip=(0,))
 
     @staticmethod
     def _cmd(cmd: int, dev_id: int = 1, data: bytes = b"") -> bytes:
@@ -195,23 +169,23 @@ class BMS(BaseBMS):
         """Update battery status information."""
 
         await self._await_reply(BMS._cmd(0x42))
-        result: BMSsample = {"cell_count": int(self._data[BMS._CELL_POS])}
+        result: BMSsample = {"cell_count": int(self._data_final[BMS._CELL_POS])}
         temp_pos: Final[int] = BMS._CELL_POS + int(result.get("cell_count", 0)) * 2 + 1
-        result["temp_sensors"] = int(self._data[temp_pos])
+        result["temp_sensors"] = int(self._data_final[temp_pos])
         result["cell_voltages"] = BMS._cell_voltages(
-            self._data, int(result.get("cell_count", 0))
+            self._data_final, int(result.get("cell_count", 0))
         )
         result["temp_values"] = BMS._temp_sensors(
-            self._data, int(result.get("temp_sensors", 0)), temp_pos + 1
+            self._data_final, int(result.get("temp_sensors", 0)), temp_pos + 1
         )
 
-        result |= BMS._decode_data(
-            self._data, temp_pos + 2 * int(result.get("temp_sensors", 0)) + 1
+        result |= BMS._FIELDS.decode(
+            self._data_final, temp_pos + 2 * int(result.get("temp_sensors", 0)) + 1
         )
 
         await self._await_reply(BMS._cmd(0x81, 1, b"\x01\x00"), max_size=20)
         result["design_capacity"] = (
-            int.from_bytes(self._data[6:8], byteorder="big", signed=False) // 10
+            int.from_bytes(self._data_final[6:8], byteorder="big", signed=False) // 10
         )
 
         return result
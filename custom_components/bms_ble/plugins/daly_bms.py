@@ -1,13 +1,21 @@
 """Module to support Daly Smart BMS."""
 
-from collections.abc import Callable
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue, crc_modbus
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    crc_modbus,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -23,17 +31,23 @@ class BMS(BaseBMS):
     INFO_LEN: Final[int] = 84 + HEAD_LEN + CRC_LEN + MAX_CELLS + MAX_TEMP
     MOS_TEMP_POS: Final[int] = HEAD_LEN + 8
     MOS_NOT_AVAILABLE: Final[tuple[str]] = ("DL-FB4C2E0",)
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, Callable[[int], Any]]]] = [
-        ("voltage", 80 + HEAD_LEN, 2, lambda x: float(x / 10)),
-        ("current", 82 + HEAD_LEN, 2, lambda x: float((x - 30000) / 10)),
-        ("battery_level", 84 + HEAD_LEN, 2, lambda x: float(x / 10)),
-        ("cycle_charge", 96 + HEAD_LEN, 2, lambda x: float(x / 10)),
-        ("cell_count", 98 + HEAD_LEN, 2, lambda x: min(x, BMS.MAX_CELLS)),
-        ("temp_sensors", 100 + HEAD_LEN, 2, lambda x: min(x, BMS.MAX_TEMP)),
-        ("cycles", 102 + HEAD_LEN, 2, lambda x: x),
-        ("delta_voltage", 112 + HEAD_LEN, 2, lambda x: float(x / 1000)),
-        ("problem_code", 116 + HEAD_LEN, 8, lambda x: x % 2**64),
-    ]
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
+        (
+            BMSdp("voltage", 80 + HEAD_LEN, 2, True, lambda x: float(x / 10)),
+            BMSdp("current", 82 + HEAD_LEN, 2, True, lambda x: float((x - 30000) / 10)),
+            BMSdp("battery_level", 84 + HEAD_LEN, 2, True, lambda x: float(x / 10)),
+            BMSdp("cycle_charge", 96 + HEAD_LEN, 2, True, lambda x: float(x / 10)),
+            BMSdp(
+                "cell_count", 98 + HEAD_LEN, 2, True, lambda x: min(x, BMS.MAX_CELLS)
+            ),
+            BMSdp(
+                "temp_sensors", 100 + HEAD_LEN, 2, True, lambda x: min(x, BMS.MAX_TEMP)
+            ),
+            BMSdp("cycles", 102 + HEAD_LEN, 2, True),
+            BMSdp("delta_voltage", 112 + HEAD_LEN, 2, True, lambda x: float(x / 1000)),
+            BMSdp("problem_code", 116 + HEAD_LEN, 8, True, lambda x: x % 2**64),
+        )
+    )
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Intialize private BMS members."""
@@ -117,24 +131,11 @@ class BMS(BaseBMS):
 
     @staticmethod
     def _cell_voltages(data: bytearray, cells: int) -> list[float]:
-        return [
-            int.from_bytes(
-                data[BMS.HEAD_LEN + 2 * idx : BMS.HEAD_LEN + 2 * idx + 2],
-                byteorder="big",
-                signed=True,
-            )
-            / 1000
-            for idx in range(cells)
-        ]
+        return scaled_values(data, BMS.HEAD_LEN, cells, signed=True, divider=1000)
 
     @staticmethod
     def _temp_sensors(data: bytearray, sensors: int, offs: int) -> list[float]:
-        return [
-            float(
-                int.from_bytes(data[idx : idx + 2], byteorder="big", signed=True) - 40
-            )
-            for idx in range(offs, offs + sensors * 2, 2)
-        ]
+        return scaled_values(data, offs, sensors, signed=True, offset=40)
 
     async def _async_update(self) -> BMSsample:
         """Update battery status information."""
@@ -167,12 +168,7 @@ class BMS(BaseBMS):
             self._log.debug("incorrect frame length: %i", len(self._data))
             return {}
 
-        for key, idx, size, func in BMS._FIELDS:
-            data[key] = func(
-                int.from_bytes(
-                    self._data[idx : idx + size], byteorder="big", signed=True
-                )
-            )
+        data |= BMS._FIELDS.decode(self._data)
 
         # get temperatures
         data.setdefault("temp_values", []).extend(
@@ -1,15 +1,22 @@
 """Module to support D-powercore Smart BMS."""
 
-from collections.abc import Callable
 from enum import IntEnum
 from string import hexdigits
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    scaled_values,
+)
 
 
 class Cmd(IntEnum):
@@ -30,22 +37,27 @@ class BMS(BaseBMS):
 
     _PAGE_LEN: Final[int] = 20
     _MAX_CELLS: Final[int] = 32
-    _FIELDS: Final[list[tuple[BMSvalue, Cmd, int, int, Callable[[int], Any]]]] = [
-        ("voltage", Cmd.LEGINFO1, 6, 2, lambda x: float(x) / 10),
-        ("current", Cmd.LEGINFO1, 8, 2, lambda x: x),
-        ("battery_level", Cmd.LEGINFO1, 14, 1, lambda x: x),
-        ("cycle_charge", Cmd.LEGINFO1, 12, 2, lambda x: float(x) / 1000),
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
         (
-            "temperature",
-            Cmd.LEGINFO2,
-            12,
-            2,
-            lambda x: round(float(x) * 0.1 - 273.15, 1),
-        ),
-        ("cell_count", Cmd.CELLVOLT, 6, 1, lambda x: min(x, BMS._MAX_CELLS)),
-        ("cycles", Cmd.LEGINFO2, 8, 2, lambda x: x),
-        ("problem_code", Cmd.LEGINFO1, 15, 1, lambda x: x & 0xFF),
-    ]
+            BMSdp("voltage", 6, 2, True, lambda x: float(x) / 10, Cmd.LEGINFO1),
+            BMSdp("current", 8, 2, True, idx=Cmd.LEGINFO1),
+            BMSdp("battery_level", 14, 1, True, idx=Cmd.LEGINFO1),
+            BMSdp("cycle_charge", 12, 2, True, lambda x: float(x) / 1000, Cmd.LEGINFO1),
+            BMSdp(
+                "temperature",
+                12,
+                2,
+                True,
+                lambda x: round(float(x) * 0.1 - 273.15, 1),
+                Cmd.LEGINFO2,
+            ),
+            BMSdp(
+                "cell_count", 6, 1, True, lambda x: min(x, BMS._MAX_CELLS), Cmd.CELLVOLT
+            ),
+            BMSdp("cycles", 8, 2, True, idx=Cmd.LEGINFO2),
+            BMSdp("problem_code", 15, 1, True, lambda x: x & 0xFF, Cmd.LEGINFO1),
+        )
+    )
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Intialize private BMS members."""
@@ -185,10 +197,7 @@ class BMS(BaseBMS):
     @staticmethod
     def _cell_voltages(data: bytearray, cells: int) -> list[float]:
         """Return cell voltages from status message."""
-        return [
-            int.from_bytes(data[7 + 2 * idx : 7 + 2 * idx + 2], byteorder="big") / 1000
-            for idx in range(cells)
-        ]
+        return scaled_values(data, 7, cells, divider=1000)
 
     async def _async_update(self) -> BMSsample:
         """Update battery status information."""
@@ -196,13 +205,7 @@ class BMS(BaseBMS):
         for request in (Cmd.LEGINFO1, Cmd.LEGINFO2, Cmd.CELLVOLT):
             await self._await_reply(self._cmd_frame(request, b""))
 
-            for key, cmd, idx, size, func in BMS._FIELDS:
-                if cmd == request:
-                    data[key] = func(
-                        int.from_bytes(
-                            self._data[idx : idx + size], byteorder="big", signed=True
-                        )
-                    )
+            data |= BMS._FIELDS.decode({request: self._data})
 
             if request == Cmd.CELLVOLT and data.get("cell_count"):
                 data["cell_voltages"] = BMS._cell_voltages(
@@ -1,14 +1,22 @@
 """Module to support ECO-WORTHY BMS."""
 
 import asyncio
-from collections.abc import Callable
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue, crc_modbus
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    crc_modbus,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -17,26 +25,24 @@ class BMS(BaseBMS):
     _HEAD: Final[tuple] = (b"\xa1", b"\xa2")
     _CELL_POS: Final[int] = 14
     _TEMP_POS: Final[int] = 80
-    _FIELDS_V1: Final[
-        list[tuple[BMSvalue, int, int, int, bool, Callable[[int], Any]]]
-    ] = [
-        ("battery_level", 0xA1, 16, 2, False, lambda x: x),
-        ("voltage", 0xA1, 20, 2, False, lambda x: x / 100),
-        ("current", 0xA1, 22, 2, True, lambda x: x / 100),
-        ("problem_code", 0xA1, 51, 2, False, lambda x: x),
-        ("design_capacity", 0xA1, 26, 2, False, lambda x: x // 100),
-        ("cell_count", 0xA2, _CELL_POS, 2, False, lambda x: x),
-        ("temp_sensors", 0xA2, _TEMP_POS, 2, False, lambda x: x),
-        # ("cycles", 0xA1, 8, 2, False, lambda x: x),
-    ]
-    _FIELDS_V2: Final[
-        list[tuple[BMSvalue, int, int, int, bool, Callable[[int], Any]]]
-    ] = [
-        (*field[:-1], (lambda x: x / 10) if field[0] == "current" else field[-1])
+    _FIELDS_V1: Final[BMSdecoder] = BMSdecoder(
+        (
+            BMSdp("battery_level", 16, 2, False, idx=0xA1),
+            BMSdp("voltage", 20, 2, False, lambda x: x / 100, 0xA1),
+            BMSdp("current", 22, 2, True, lambda x: x / 100, 0xA1),
+            BMSdp("problem_code", 51, 2, False, idx=0xA1),
+            BMSdp("design_capacity", 26, 2, False, lambda x: x // 100, 0xA1),
+            BMSdp("cell_count", _CELL_POS, 2, False, idx=0xA2),
+            BMSdp("temp_sensors", _TEMP_POS, 2, False, idx=0xA2),
+            # BMSdp("cycles", 8, 2, False, idx=0xA1),
+        )
+    )
+    _FIELDS_V2: Final[BMSdecoder] = BMSdecoder(
+        field._replace(fct=lambda x: x / 10) if field.key == "current" else field
         for field in _FIELDS_V1
-    ]
+    )
 
-    _CMDS: Final[set[int]] = set({field[1] for field in _FIELDS_V1})
+    _CMDS: Final[set[int]] = {field.idx for field in _FIELDS_V1}
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Initialize BMS."""
@@ -122,52 +128,23 @@ class BMS(BaseBMS):
         )
         if BMS._CMDS.issubset(self._data_final.keys()):
             self._data_event.set()
-
-    @staticmethod
-    def _decode_data(data: dict[int, bytearray]) -> BMSsample:
-        result: BMSsample = {}
-        for key, cmd, idx, size, sign, func in (
-            BMS._FIELDS_V1 if data[0xA1].startswith(BMS._HEAD) else BMS._FIELDS_V2
-        ):
-            result[key] = func(
-                int.from_bytes(
-                    data[cmd][idx : idx + size], byteorder="big", signed=sign
-                )
-            )
-        return result
+            self._push_sample()
 
     @staticmethod
     def _cell_voltages(data: bytearray, cells: int, offs: int) -> list[float]:
-        return [
-            int.from_bytes(
-                data[offs + idx * 2 : offs + idx * 2 + 2],
-                byteorder="big",
-                signed=False,
-            )
-            / 1000
-            for idx in range(cells)
-        ]
+        return scaled_values(data, offs, cells, divider=1000)
 
     @staticmethod
     def _temp_sensors(data: bytearray, sensors: int, offs: int) -> list[float]:
-        return [
-            int.from_bytes(
-                data[offs + idx * 2 : offs + (idx + 1) * 2],
-                byteorder="big",
-                signed=True,
-            )
-            / 10
-            for idx in range(sensors)
-        ]
+        return scaled_values(data, offs, sensors, signed=True, divider=10)
 
-    async def _async_update(self) -> BMSsample:
-        """Update battery status information."""
-
-        self._data_final.clear()
-        self._data_event.clear()  # clear event to ensure new data is acquired
-        await asyncio.wait_for(self._wait_event(), timeout=BMS.TIMEOUT)
-
-        result: BMSsample = BMS._decode_data(self._data_final)
+    def _latest_sample(self) -> BMSsample:
+        """Return BMS values from the latest complete set of frames."""
+        result: BMSsample = (
+            BMS._FIELDS_V1
+            if self._data_final[0xA1].startswith(BMS._HEAD)
+            else BMS._FIELDS_V2
+        ).decode(self._data_final)
 
         result["cell_voltages"] = BMS._cell_voltages(
             self._data_final[0xA2],
@@ -181,3 +158,11 @@ class BMS(BaseBMS):
         )
 
         return result
+
+    async def _async_update(self) -> BMSsample:
+        """Update battery status information."""
+
+        self._data_final.clear()
+        self._data_event.clear()  # clear event to ensure new data is acquired
+        await asyncio.wait_for(self._wait_event(), timeout=BMS.TIMEOUT)
+        return self._latest_sample()
@@ -119,6 +119,7 @@ class BMS(BaseBMS):
 
         self._data_final = self._data.copy()
         self._data_event.set()
+        self._push_sample()
 
     @staticmethod
     def _crc(data: bytearray) -> int:
@@ -148,10 +149,14 @@ class BMS(BaseBMS):
             result[key] = func(BMS._conv_int(data[idx : idx + size], sign))
         return result
 
+    def _latest_sample(self) -> BMSsample:
+        """Return BMS values from the latest status message."""
+        return self._decode_data(self._data_final) | {
+            "cell_voltages": BMS._cell_voltages(self._data_final)
+        }
+
     async def _async_update(self) -> BMSsample:
         """Update battery status information."""
 
         await asyncio.wait_for(self._wait_event(), timeout=BMS.TIMEOUT)
-        return self._decode_data(self._data_final) | {
-            "cell_voltages": BMS._cell_voltages(self._data_final)
-        }
+        return self._latest_sample()
@@ -8,7 +8,7 @@ from typing import Any, Final
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue
+from .basebms import AdvertisementPattern, BaseBMS, BMSbuffer, BMSsample, BMSvalue
 
 
 class Cmd(IntEnum):
@@ -25,6 +25,7 @@ class BMS(BaseBMS):
     _HEAD: Final[bytes] = b"\x3a"
     _TAIL: Final[bytes] = b"\x7e"
     _MAX_CELLS: Final[int] = 16
+    _MAX_LEN: Final[int] = 0x200  # maximum accepted frame length
     _FIELDS: Final[list[tuple[BMSvalue, Cmd, int, int, Callable[[int], Any]]]] = [
         ("current", Cmd.RT, 89, 8, lambda x: float((x >> 16) - (x & 0xFFFF)) / 100),
         ("battery_level", Cmd.RT, 123, 2, lambda x: x),
@@ -37,6 +38,9 @@ class BMS(BaseBMS):
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Initialize BMS."""
         super().__init__(__name__, ble_device, reconnect)
+        self._buffer: Final[BMSbuffer] = BMSbuffer(
+            BMS._MAX_LEN, head=BMS._HEAD, tail=BMS._TAIL[0], slots=1
+        )
         self._data_final: bytearray = bytearray()
 
     @staticmethod
@@ -106,65 +110,51 @@ class BMS(BaseBMS):
             if not (data := data.removeprefix(BMS._BT_MODULE_MSG)):
                 return
 
-        if data.startswith(BMS._HEAD):  # check for beginning of frame
-            self._data.clear()
-
-        self._data += data
-
-        self._log.debug(
-            "RX BLE data (%s): %s", "start" if data == self._data else "cnt.", data
-        )
-
-        exp_frame_len: Final[int] = (
-            int(self._data[7:11], 16)
-            if len(self._data) > 10
-            and all(chr(c) in hexdigits for c in self._data[7:11])
-            else 0xFFFF
-        )
-
-        if not self._data.startswith(BMS._HEAD) or (
-            not self._data.endswith(BMS._TAIL) and len(self._data) < exp_frame_len
-        ):
+        self._log.debug("RX BLE data: %s", data)
+        if (frame := self._buffer.feed(data)) is None:
             return
 
-        if not self._data.endswith(BMS._TAIL):
+        if frame[-1] != BMS._TAIL[0]:
             self._log.debug("incorrect EOF: %s", data)
-            self._data.clear()
             return
 
-        if not all(chr(c) in hexdigits for c in self._data[1:-1]):
+        if not all(chr(c) in hexdigits for c in frame[1:-1]):
             self._log.debug("incorrect frame encoding.")
-            self._data.clear()
             return
 
-        if len(self._data) != exp_frame_len:
+        exp_frame_len: Final[int] = (
+            int(bytes(frame[7:11]), 16) if len(frame) > 10 else 0
+        )
+        if len(frame) != exp_frame_len:
             self._log.debug(
-                "incorrect frame length %i != %i",
-                len(self._data),
-                exp_frame_len,
+                "incorrect frame length %i != %i", len(frame), exp_frame_len
             )
-            self._data.clear()
             return
 
-        if (crc := BMS._crc(self._data[1:-3])) != int(self._data[-3:-1], 16):
+        if (crc := BMS._crc(frame[1:-3])) != int(bytes(frame[-3:-1]), 16):
             self._log.debug(
-                "invalid checksum 0x%X != 0x%X", int(self._data[-3:-1], 16), crc
+                "invalid checksum 0x%X != 0x%X", int(bytes(frame[-3:-1]), 16), crc
             )
-            self._data.clear()
             return
 
+        # hex encoded frame is parsed as text, so a copy is handed to the decoder
+        self._data_final = bytearray(frame)
         self._log.debug(
             "address: 0x%X, command 0x%X, version: 0x%X, length: 0x%X",
-            int(self._data[1:3], 16),
-            int(self._data[3:5], 16) & 0x7F,
-            int(self._data[5:7], 16),
-            len(self._data),
+            int(self._data_final[1:3], 16),
+            int(self._data_final[3:5], 16) & 0x7F,
+            int(self._data_final[5:7], 16),
+            len(self._data_final),
         )
-        self._data_final = self._data.copy()
         self._data_event.set()
 
+    async def _init_connection(self) -> None:
+        """Initialize RX/TX characteristics and frame buffer."""
+        await super()._init_connection()
+        self._buffer.clear()
+
     @staticmethod
-    def _crc(data: bytearray) -> int:
+    def _crc(data: memoryview) -> int:
         return (sum(data) ^ 0xFF) & 0xFF
 
     @staticmethod
@@ -1,13 +1,21 @@
 """Module to support JBD Smart BMS."""
 
-from collections.abc import Callable
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSbuffer,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -18,15 +26,17 @@ class BMS(BaseBMS):
     TAIL: Final[int] = 0x77  # tail for command
     INFO_LEN: Final[int] = 7  # minimum frame size
     BASIC_INFO: Final[int] = 23  # basic info data length
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, bool, Callable[[int], Any]]]] = [
-        ("temp_sensors", 26, 1, False, lambda x: x),  # count is not limited
-        ("voltage", 4, 2, False, lambda x: float(x / 100)),
-        ("current", 6, 2, True, lambda x: float(x / 100)),
-        ("battery_level", 23, 1, False, lambda x: x),
-        ("cycle_charge", 8, 2, False, lambda x: float(x / 100)),
-        ("cycles", 12, 2, False, lambda x: x),
-        ("problem_code", 20, 2, False, lambda x: x),
-    ]  # general protocol v4
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
+        (
+            BMSdp("temp_sensors", 26, 1, False),  # count is not limited
+            BMSdp("voltage", 4, 2, False, lambda x: float(x / 100)),
+            BMSdp("current", 6, 2, True, lambda x: float(x / 100)),
+            BMSdp("battery_level", 23, 1, False),
+            BMSdp("cycle_charge", 8, 2, False, lambda x: float(x / 100)),
+            BMSdp("cycles", 12, 2, False),
+            BMSdp("problem_code", 20, 2, False),
+        )
+    )  # general protocol v4
 
     # Add discharge control commands
     _CMD_ENABLE_DISCHARGE: Final[bytes] = bytes(
@@ -39,7 +49,14 @@ class BMS(BaseBMS):
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Intialize private BMS members."""
         super().__init__(__name__, ble_device, reconnect)
-        self._data_final: bytearray = bytearray()
+        self._buffer: Final[BMSbuffer] = BMSbuffer(
+            BMS.INFO_LEN + 0xFF,
+            head=BMS.HEAD_RSP,
+            len_pos=3,
+            len_add=BMS.INFO_LEN,
+            tail=BMS.TAIL,
+        )
+        self._data_final: memoryview = memoryview(b"")
         self._last_discharge_state: bool = False
 
     @staticmethod
@@ -119,59 +136,41 @@ class BMS(BaseBMS):
         self, _sender: BleakGATTCharacteristic, data: bytearray
     ) -> None:
         # check if answer is a heading of basic info (0x3) or cell block info (0x4)
-        if data.hex(" ") == "dd e1 00 00 00 00 77":
-            self._data = bytearray()
-            self._data += data
-            self._data_final = self._data
+        if data == b"\xdd\xe1\x00\x00\x00\x00\x77":
+            self._buffer.clear()
+            self._data_final = memoryview(data)
             self._log.debug("Received discharging on/off notification")
             self._data_event.set()
             return
 
-        if (
-            data.startswith(self.HEAD_RSP)
-            and len(self._data) > self.INFO_LEN
-            and data[1] in (0x03, 0x04)
-            and data[2] == 0x00
-            and len(self._data) >= self.INFO_LEN + self._data[3]
-        ):
-            self._data = bytearray()
-
-        self._data += data
-        self._log.debug(
-            "RX BLE data (%s): %s", "start" if data == self._data else "cnt.", data
-        )
-
-        # verify that data is long enough
-        if (
-            len(self._data) < BMS.INFO_LEN
-            or len(self._data) < BMS.INFO_LEN + self._data[3]
-        ):
+        self._log.debug("RX BLE data: %s", data)
+        if (frame := self._buffer.feed(data)) is None:
             return
 
         # check correct frame ending
-        frame_end: Final[int] = BMS.INFO_LEN + self._data[3] - 1
-        if self._data[frame_end] != BMS.TAIL:
-            self._log.debug("incorrect frame end (length: %i).", len(self._data))
+        if frame[-1] != BMS.TAIL:
+            self._log.debug("incorrect frame end (length: %i).", len(frame))
             return
 
-        if (crc := BMS._crc(self._data[2 : frame_end - 2])) != int.from_bytes(
-            self._data[frame_end - 2 : frame_end], "big"
-        ):
+        if (crc := BMS._crc(frame[2:-3])) != int.from_bytes(frame[-3:-1], "big"):
             self._log.debug(
                 "invalid checksum 0x%X != 0x%X",
-                int.from_bytes(self._data[frame_end - 2 : frame_end], "big"),
+                int.from_bytes(frame[-3:-1], "big"),
                 crc,
             )
             return
 
-        if len(self._data) != BMS.INFO_LEN + self._data[3]:
-            self._log.debug("wrong data length (%i): %s", len(self._data), self._data)
-
-        self._data_final = self._data
+        self._data_final = frame
+        self._buffer.keep()
         self._data_event.set()
 
+    async def _init_connection(self) -> None:
+        """Initialize RX/TX characteristics and frame buffer."""
+        await super()._init_connection()
+        self._buffer.clear()
+
     @staticmethod
-    def _crc(frame: bytearray) -> int:
+    def _crc(frame: bytearray | memoryview) -> int:
         """Calculate JBD frame CRC."""
         return 0x10000 - sum(frame)
 
@@ -183,30 +182,12 @@ class BMS(BaseBMS):
         return bytes(frame)
 
     @staticmethod
-    def _decode_data(data: bytearray) -> BMSsample:
-        result: BMSsample = {}
-        for key, idx, size, sign, func in BMS._FIELDS:
-            result[key] = func(
-                int.from_bytes(data[idx : idx + size], byteorder="big", signed=sign)
-            )
-        return result
-
-    @staticmethod
-    def _cell_voltages(data: bytearray) -> list[float]:
-        return [
-            int.from_bytes(
-                data[4 + idx * 2 : 4 + idx * 2 + 2], byteorder="big", signed=False
-            )
-            / 1000
-            for idx in range(int(data[3] / 2))
-        ]
+    def _cell_voltages(data: memoryview) -> list[float]:
+        return scaled_values(data, 4, data[3] // 2, divider=1000)
 
     @staticmethod
-    def _temp_sensors(data: bytearray, sensors: int) -> list[float]:
-        return [
-            (int.from_bytes(data[idx : idx + 2], byteorder="big") - 2731) / 10
-            for idx in range(27, 27 + sensors * 2, 2)
-        ]
+    def _temp_sensors(data: memoryview, sensors: int) -> list[float]:
+        return scaled_values(data, 27, sensors, offset=2731, divider=10)
 
     def _battery_discharging_state(self) -> bool:
         """Return interpreted battery discharging state for JBD BMS."""
@@ -233,7 +214,7 @@ class BMS(BaseBMS):
         """Update battery status information."""
         data: BMSsample = {}
         await self._await_reply(BMS._cmd(b"\x03"))
-        data = BMS._decode_data(self._data_final)
+        data = BMS._FIELDS.decode(self._data_final)
         data["temp_values"] = BMS._temp_sensors(
             self._data_final, int(data.get("temp_sensors", 0))
         )
@@ -244,6 +225,18 @@ class BMS(BaseBMS):
 
         return data
 
+    async def discharge_state(self) -> bool | None:
+        """Return the discharge state read from the basic info frame only.
+
+        Returns None if the reply does not contain the state, e.g. a late
+        acknowledge of the discharge command.
+        """
+        await self._connect()
+        await self._await_reply(BMS._cmd(b"\x03"))
+        if len(self._data_final) <= 21 + 4:
+            return None
+        return self._battery_discharging_state()
+
     async def enable_discharge(self) -> bool:
         """Enable battery discharge."""
         try:
@@ -1,7 +1,7 @@
 """Module to support Jikong Smart BMS."""
 
 import asyncio
-from collections.abc import Callable
+from collections.abc import Mapping
 from typing import Any, Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
@@ -11,10 +11,14 @@ from bleak.uuids import normalize_uuid_str
 from .basebms import (
     AdvertisementPattern,
     BaseBMS,
+    BMSbuffer,
+    BMSdecoder,
+    BMSdp,
     BMSmode,
     BMSsample,
     BMSvalue,
     crc_sum,
+    scaled_values,
 )
 
 
@@ -26,23 +30,25 @@ class BMS(BaseBMS):
     _BT_MODULE_MSG: Final = bytes([0x41, 0x54, 0x0D, 0x0A])  # AT\r\n from BLE module
     TYPE_POS: Final[int] = 4  # frame type is right after the header
     INFO_LEN: Final[int] = 300
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, bool, Callable[[int], Any]]]] = (
-        [  # Protocol: JK02_32S; JK02_24S has offset -32
-            ("voltage", 150, 4, False, lambda x: float(x / 1000)),
-            ("current", 158, 4, True, lambda x: float(x / 1000)),
-            ("battery_level", 173, 1, False, lambda x: x),
-            ("cycle_charge", 174, 4, False, lambda x: float(x / 1000)),
-            ("cycles", 182, 4, False, lambda x: x),
-            ("balance_current", 170, 2, True, lambda x: float(x / 1000)),
-            ("temp_sensors", 214, 2, True, lambda x: x),
-            ("problem_code", 166, 4, False, lambda x: x),
-        ]
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
+        (  # Protocol: JK02_32S; JK02_24S has offset -32
+            BMSdp("voltage", 150, 4, False, lambda x: float(x / 1000)),
+            BMSdp("current", 158, 4, True, lambda x: float(x / 1000)),
+            BMSdp("battery_level", 173, 1, False),
+            BMSdp("cycle_charge", 174, 4, False, lambda x: float(x / 1000)),
+            BMSdp("cycles", 182, 4, False),
+            BMSdp("balance_current", 170, 2, True, lambda x: float(x / 1000)),
+            BMSdp("temp_sensors", 214, 2, True),
+            BMSdp("problem_code", 166, 4, False),
+        ),
+        byteorder="little",
     )
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Intialize private BMS members."""
         super().__init__(__name__, ble_device, reconnect)
-        self._data_final: bytearray = bytearray()
+        self._buffer: Final[BMSbuffer] = BMSbuffer(BMS.INFO_LEN, head=BMS.HEAD_RSP)
+        self._data_final: memoryview = memoryview(b"")
         self._char_write_handle: int = -1
         self._bms_info: dict[str, str] = {}
         self._prot_offset: int = 0
@@ -102,50 +108,37 @@ class BMS(BaseBMS):
             if not (data := data.removeprefix(BMS._BT_MODULE_MSG)):
                 return
 
-        if (
-            len(self._data) >= self.INFO_LEN
-            and (data.startswith((BMS.HEAD_RSP, BMS.HEAD_CMD)))
-        ) or not self._data.startswith(BMS.HEAD_RSP):
-            self._data = bytearray()
-
-        self._data += data
-
-        self._log.debug(
-            "RX BLE data (%s): %s", "start" if data == self._data else "cnt.", data
-        )
+        self._log.debug("RX BLE data: %s", data)
 
-        # verify that data is long enough
-        if (
-            len(self._data) < BMS.INFO_LEN and self._data.startswith(BMS.HEAD_RSP)
-        ) or len(self._data) < BMS.TYPE_POS + 1:
+        # responses span several fragments, command messages fit into a single one
+        if not data.startswith(BMS.HEAD_CMD):
+            if (frame := self._buffer.feed(data)) is None:
+                return
+        elif len(data) > BMS.TYPE_POS:
+            # trim AT\r\n message from the end
+            frame = memoryview(data.removesuffix(BMS._BT_MODULE_MSG))
+        else:
             return
 
         # check that message type is expected
-        if self._data[BMS.TYPE_POS] != self._valid_reply:
+        if frame[BMS.TYPE_POS] != self._valid_reply:
             self._log.debug(
                 "unexpected message type 0x%X (length %i): %s",
-                self._data[BMS.TYPE_POS],
-                len(self._data),
-                self._data,
+                frame[BMS.TYPE_POS],
+                len(frame),
+                bytes(frame),
             )
             return
 
-        # trim AT\r\n message from the end
-        if self._data.endswith(BMS._BT_MODULE_MSG):
-            self._log.debug("trimming AT cmd")
-            self._data = self._data.removesuffix(BMS._BT_MODULE_MSG)
-
-        # trim message in case oversized
-        if len(self._data) > BMS.INFO_LEN:
-            self._log.debug("wrong data length (%i): %s", len(self._data), self._data)
-            self._data = self._data[: BMS.INFO_LEN]
-
-        if (crc := crc_sum(self._data[:-1])) != self._data[-1]:
-            self._log.debug("invalid checksum 0x%X != 0x%X", self._data[-1], crc)
+        if (crc := crc_sum(frame[:-1])) != frame[-1]:
+            self._log.debug("invalid checksum 0x%X != 0x%X", frame[-1], crc)
             return
 
-        self._data_final = self._data.copy()
+        self._data_final = frame
+        self._buffer.keep()
         self._data_event.set()
+        if frame[BMS.TYPE_POS] == 0x02:  # cell information
+            self._push_sample()
 
     async def _init_connection(self) -> None:
         """Initialize RX/TX characteristics and protocol state."""
@@ -178,18 +171,31 @@ class BMS(BaseBMS):
         )
 
         await super()._init_connection()
+        self._buffer.clear()
+
+        if not self._bms_info:  # device information is known from before
+            # query device info frame (0x03) and wait for BMS ready (0xC8)
+            self._valid_reply = 0x03
+            await self._await_reply(self._cmd(b"\x97"), char=self._char_write_handle)
+            self._set_bms_info(BMS._dec_devinfo(self._data_final))
+            self._valid_reply = 0xC8  # BMS ready confirmation
+            await asyncio.wait_for(self._wait_event(), timeout=BMS.TIMEOUT)
+        self._valid_reply = 0x02  # cell information
 
-        # query device info frame (0x03) and wait for BMS ready (0xC8)
-        self._valid_reply = 0x03
-        await self._await_reply(self._cmd(b"\x97"), char=self._char_write_handle)
-        self._bms_info = BMS._dec_devinfo(self._data_final or bytearray())
+    def _set_bms_info(self, bms_info: dict[str, str]) -> None:
+        """Set device information and the protocol offset of the software version."""
+        self._bms_info = bms_info
         self._log.debug("device information: %s", self._bms_info)
         self._prot_offset = (
             -32 if int(self._bms_info.get("sw_version", "")[:2]) < 11 else 0
         )
-        self._valid_reply = 0xC8  # BMS ready confirmation
-        await asyncio.wait_for(self._wait_event(), timeout=BMS.TIMEOUT)
-        self._valid_reply = 0x02  # cell information
+
+    def _protocol_state(self) -> dict[str, Any]:
+        return {"bms_info": self._bms_info}
+
+    def _restore_protocol_state(self, state: Mapping[str, Any]) -> None:
+        if (bms_info := state.get("bms_info", {})).get("sw_version", "")[:2].isdigit():
+            self._set_bms_info(dict(bms_info))
 
     @staticmethod
     def _cmd(cmd: bytes, value: list[int] | None = None) -> bytes:
@@ -203,26 +209,22 @@ class BMS(BaseBMS):
         return bytes(frame)
 
     @staticmethod
-    def _dec_devinfo(data: bytearray) -> dict[str, str]:
+    def _dec_devinfo(data: memoryview) -> dict[str, str]:
         fields: Final[dict[str, int]] = {
             "hw_version": 22,
             "sw_version": 30,
         }
         return {
-            key: data[idx : idx + 8].decode(errors="replace").strip("\x00")
+            key: bytes(data[idx : idx + 8]).decode(errors="replace").strip("\x00")
             for key, idx in fields.items()
         }
 
     @staticmethod
-    def _cell_voltages(data: bytearray, cells: int) -> list[float]:
+    def _cell_voltages(data: memoryview, cells: int) -> list[float]:
         """Return cell voltages from status message."""
-        return [
-            int.from_bytes(
-                data[6 + 2 * idx : 6 + 2 * idx + 2], byteorder="little", signed=True
-            )
-            / 1000
-            for idx in range(cells)
-        ]
+        return scaled_values(
+            data, 6, cells, byteorder="little", signed=True, divider=1000
+        )
 
     def _temp_pos(self) -> list[tuple[int, int]]:
         sw_majv: Final[int] = int(self._bms_info.get("sw_version", "")[:2])
@@ -234,7 +236,7 @@ class BMS(BaseBMS):
 
     @staticmethod
     def _temp_sensors(
-        data: bytearray, temp_pos: list[tuple[int, int]], mask: int
+        data: memoryview, temp_pos: list[tuple[int, int]], mask: int
     ) -> list[int | float]:
         return [
             (value / 10)
@@ -249,7 +251,7 @@ class BMS(BaseBMS):
         ]
 
     @staticmethod
-    def _decode_data(data: bytearray, offs: int, sw_majv: int) -> BMSsample:
+    def _decode_data(data: memoryview, offs: int, sw_majv: int) -> BMSsample:
         """Return BMS data from status message."""
 
         result: BMSsample = {}
@@ -271,26 +273,12 @@ class BMS(BaseBMS):
                 else BMSmode.UNKNOWN
             )
 
-        for key, idx, size, sign, func in BMS._FIELDS:
-            result[key] = func(
-                int.from_bytes(
-                    data[idx + offs : idx + offs + size],
-                    byteorder="little",
-                    signed=sign,
-                )
-            )
+        result |= BMS._FIELDS.decode(data, offs)
 
         return result
 
-    async def _async_update(self) -> BMSsample:
-        """Update battery status information."""
-        if not self._data_event.is_set() or self._data_final[4] != 0x02:
-            # request cell info (only if data is not constantly published)
-            self._log.debug("requesting cell info")
-            await self._await_reply(
-                data=BMS._cmd(b"\x96"), char=self._char_write_handle
-            )
-
+    def _latest_sample(self) -> BMSsample:
+        """Return BMS values from the latest cell information frame."""
         data: BMSsample = self._decode_data(
             self._data_final,
             self._prot_offset,
@@ -311,3 +299,14 @@ class BMS(BaseBMS):
         )
 
         return data
+
+    async def _async_update(self) -> BMSsample:
+        """Update battery status information."""
+        if not self._data_event.is_set() or self._data_final[4] != 0x02:
+            # request cell info (only if data is not constantly published)
+            self._log.debug("requesting cell info")
+            await self._await_reply(
+                data=BMS._cmd(b"\x96"), char=self._char_write_handle
+            )
+
+        return self._latest_sample()
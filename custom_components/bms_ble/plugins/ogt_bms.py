@@ -45,8 +45,6 @@ class BMS(BaseBMS):
             self.name[10:],
             self._key,
         )
-        self._exp_reply: int = 0x0
-        self._response: BMS._Response = BMS._Response(False, 0, 0)
         self._REGISTERS: dict[int, tuple[BMSvalue, int, Callable[[int], Any]]]
         if self._type == "A":
             self._REGISTERS = {
@@ -123,19 +121,23 @@ class BMS(BaseBMS):
     ) -> None:
         self._log.debug("RX BLE data: %s", data)
 
-        self._response = self._ogt_response(data)
+        response: Final[BMS._Response] = self._ogt_response(data)
 
         # check that descrambled message is valid
-        if not self._response.valid:
+        if not response.valid:
             self._log.debug("response data is invalid")
             return
 
-        if self._response.reg not in (-1, self._exp_reply):
+        if response.reg < 0:  # error replies belong to the oldest pending request
+            self._set_reply(
+                next(
+                    (key for key, reply in self._replies.items() if not reply.done()),
+                    None,
+                ),
+                None,
+            )
+        elif not self._set_reply(response.reg, response.value):
             self._log.debug("wrong register response")
-            return
-
-        self._exp_reply = -1
-        self._data_event.set()
 
     def _ogt_response(self, resp: bytearray) -> _Response:
         """Descramble a response from the BMS."""
@@ -176,35 +178,36 @@ class BMS(BaseBMS):
         """Update battery status information."""
         result: BMSsample = {}
 
-        for reg in list(self._REGISTERS):
-            self._exp_reply = reg
-            await self._await_reply(
-                data=self._ogt_command(reg, self._REGISTERS[reg][BMS.IDX_LEN])
-            )
-            if self._response.reg < 0:
+        values: dict[int, int | None] = await self._await_replies(
+            {
+                reg: self._ogt_command(reg, length)
+                for reg, (_name, length, _func) in self._REGISTERS.items()
+            }
+        )
+        for reg, value in values.items():
+            if value is None:  # BMS error reply
                 raise TimeoutError
 
-            name, _length, func = self._REGISTERS[self._response.reg]
-            result[name] = func(self._response.value)
+            name, _length, func = self._REGISTERS[reg]
+            result[name] = func(value)
             self._log.debug(
                 "decoded data: reg: %s (#%i), raw: %i, value: %f",
                 name,
                 reg,
-                self._response.value,
+                value,
                 result.get(name),
             )
 
-        # read cell voltages for type B battery
+        # read cell voltages for type B battery, missing cells reply with an error
         if self._type == "B":
-            for cell_reg in range(16):
-                self._exp_reply = 63 - cell_reg
-                await self._await_reply(data=self._ogt_command(63 - cell_reg, 2))
-                if self._response.reg < 0:
-                    self._log.debug("cell count: %i", cell_reg)
+            cells: Final[dict[int, int | None]] = await self._await_replies(
+                {63 - cell: self._ogt_command(63 - cell, 2) for cell in range(16)}
+            )
+            for value in cells.values():
+                if value is None:
                     break
-                result.setdefault("cell_voltages", []).append(
-                    self._response.value / 1000
-                )
+                result.setdefault("cell_voltages", []).append(value / 1000)
+            self._log.debug("cell count: %i", len(result.get("cell_voltages", [])))
 
         # remove remaining runtime if battery is charging
         if result.get("runtime") == 0xFFFF * 60:
@@ -1,13 +1,21 @@
 """Module to support Redodo BMS."""
 
-from collections.abc import Callable
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue, crc_sum
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    crc_sum,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -17,15 +25,19 @@ class BMS(BaseBMS):
     HEAD_LEN: Final[int] = 3
     MAX_CELLS: Final[int] = 16
     MAX_TEMP: Final[int] = 5
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, bool, Callable[[int], Any]]]] = [
-        ("voltage", 12, 2, False, lambda x: float(x / 1000)),
-        ("current", 48, 4, True, lambda x: float(x / 1000)),
-        ("battery_level", 90, 2, False, lambda x: x),
-        ("cycle_charge", 62, 2, False, lambda x: float(x / 100)),
-        ("cycles", 96, 4, False, lambda x: x),
-        ("problem_code", 76, 4, False, lambda x: x),
-    ]
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
+        (
+            BMSdp("voltage", 12, 2, False, lambda x: float(x / 1000)),
+            BMSdp("current", 48, 4, True, lambda x: float(x / 1000)),
+            BMSdp("battery_level", 90, 2, False),
+            BMSdp("cycle_charge", 62, 2, False, lambda x: float(x / 100)),
+            BMSdp("cycles", 96, 4, False),
+            BMSdp("problem_code", 76, 4, False),
+        ),
+        byteorder="little",
+    )
 
+    _CMD_STATUS: Final[bytes] = b"\x00\x00\x04\x01\x13\x55\xaa\x17"
     # Add discharge control commands
     _CMD_ENABLE_DISCHARGE: Final[bytes] = bytes(
         [0x00, 0x00, 0x04, 0x01, 0x0C, 0x55, 0xAA, 0x10]
@@ -120,40 +132,18 @@ class BMS(BaseBMS):
         self._data = data
         self._data_event.set()
 
-    @staticmethod
-    def _decode_data(data: bytearray) -> BMSsample:
-        result: BMSsample = {}
-        for key, idx, size, sign, func in BMS._FIELDS:
-            value = int.from_bytes(
-                data[idx : idx + size], byteorder="little", signed=sign
-            )
-            result[key] = func(value)
-        return result
-
     @staticmethod
     def _cell_voltages(data: bytearray, cells: int) -> list[float]:
         """Return cell voltages from status message."""
-        return [
-            (value / 1000)
-            for idx in range(cells)
-            if (
-                value := int.from_bytes(
-                    data[16 + 2 * idx : 16 + 2 * idx + 2], byteorder="little"
-                )
-            )
-        ]
+        return scaled_values(
+            data, 16, cells, byteorder="little", divider=1000, skip=(0,)
+        )
 
     @staticmethod
     def _temp_sensors(data: bytearray, sensors: int) -> list[int | float]:
-        return [
-            value
-            for idx in range(sensors)
-            if (
-                value := int.from_bytes(
-                    data[52 + idx * 2 : 54 + idx * 2], byteorder="little", signed=True
-                )
-            )
-        ]
+        return scaled_values(
+            data, 52, sensors, byteorder="little", signed=True, skip=(0,)
+        )
 
     def _battery_discharging_state(self) -> bool:
         """Return interpreted battery discharging state for Redodo BMS."""
@@ -178,9 +168,9 @@ class BMS(BaseBMS):
 
     async def _async_update(self) -> BMSsample:
         """Update battery status information."""
-        await self._await_reply(b"\x00\x00\x04\x01\x13\x55\xaa\x17")
+        await self._await_reply(BMS._CMD_STATUS)
 
-        decoded_data = BMS._decode_data(self._data)
+        decoded_data = BMS._FIELDS.decode(self._data)
 
         return decoded_data | BMSsample(
             {
@@ -190,6 +180,17 @@ class BMS(BaseBMS):
             }
         )
 
+    async def discharge_state(self) -> bool | None:
+        """Return the discharge state read from a single status frame.
+
+        Returns None if the frame is too short to contain the state.
+        """
+        await self._connect()
+        await self._await_reply(BMS._CMD_STATUS)
+        if len(self._data) <= 68:
+            return None
+        return self._battery_discharging_state()
+
     async def enable_discharge(self) -> bool:
         """Enable battery discharge."""
         try:
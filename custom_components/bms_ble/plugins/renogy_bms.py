@@ -1,13 +1,21 @@
 """Module to support Renogy BMS."""
 
-from collections.abc import Callable
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue, crc_modbus
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    crc_modbus,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -17,13 +25,15 @@ class BMS(BaseBMS):
     _CRC_POS: Final[int] = -2
     _TEMP_POS: Final[int] = 37
     _CELL_POS: Final[int] = 3
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, bool, Callable[[int], Any]]]] = [
-        ("voltage", 5, 2, False, lambda x: float(x / 10)),
-        ("current", 3, 2, True, lambda x: float(x / 100)),
-        ("design_capacity", 11, 4, False, lambda x: x / 1000),
-        ("cycle_charge", 7, 4, False, lambda x: float(x / 1000)),
-        ("cycles", 15, 2, False, lambda x: x),
-    ]
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
+        (
+            BMSdp("voltage", 5, 2, False, lambda x: float(x / 10)),
+            BMSdp("current", 3, 2, True, lambda x: float(x / 100)),
+            BMSdp("design_capacity", 11, 4, False, lambda x: x / 1000),
+            BMSdp("cycle_charge", 7, 4, False, lambda x: float(x / 1000)),
+            BMSdp("cycles", 15, 2, False),
+        )
+    )
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Initialize BMS."""
@@ -102,37 +112,14 @@ class BMS(BaseBMS):
 
         self._data_event.set()
 
-    @staticmethod
-    def _decode_data(data: bytearray) -> BMSsample:
-        result: BMSsample = {}
-        for key, idx, size, sign, func in BMS._FIELDS:
-            result[key] = func(
-                int.from_bytes(data[idx : idx + size], byteorder="big", signed=sign)
-            )
-        return result
-
     @staticmethod
     def _cell_voltages(data: bytearray, cells: int) -> list[float]:
         """Return cell voltages from status message."""
-        return [
-            int.from_bytes(
-                data[BMS._CELL_POS + 2 + 2 * idx : BMS._CELL_POS + 4 + 2 * idx],
-                byteorder="big",
-            )
-            / 10
-            for idx in range(cells)
-        ]
+        return scaled_values(data, BMS._CELL_POS + 2, cells, divider=10)
 
     @staticmethod
     def _temp_sensors(data: bytearray, sensors: int) -> list[int | float]:
-        return [
-            int.from_bytes(
-                data[BMS._TEMP_POS + 2 + 2 * idx : BMS._TEMP_POS + 4 + 2 * idx],
-                byteorder="big",
-            )
-            / 10
-            for idx in range(sensors)
-        ]
+        return scaled_values(data, BMS._TEMP_POS + 2, sensors, divider=10)
 
     @staticmethod
     def _cmd(addr: int, words: int) -> bytes:
@@ -150,7 +137,7 @@ class BMS(BaseBMS):
         """Update battery status information."""
 
         await self._await_reply(self._cmd(5042, 0x7))
-        result: BMSsample = BMS._decode_data(self._data)
+        result: BMSsample = BMS._FIELDS.decode(self._data)
 
         await self._await_reply(self._cmd(5000, 0x22))
         result["cell_count"] = self._data[BMS._CELL_POS + 1]
@@ -1,6 +1,6 @@
 """Module to support Seplos V3 Smart BMS."""
 
-from collections.abc import Callable
+from collections.abc import Mapping
 from typing import Any, Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
@@ -10,10 +10,13 @@ from bleak.uuids import normalize_uuid_str
 from .basebms import (
     AdvertisementPattern,
     BaseBMS,
-    BMSpackvalue,
+    BMSbuffer,
+    BMSdecoder,
+    BMSdp,
     BMSsample,
     BMSvalue,
     crc_modbus,
+    scaled_values,
 )
 
 
@@ -29,6 +32,7 @@ class BMS(BaseBMS):
     EIB_LEN: Final[int] = 0x16
     EIC_LEN: Final[int] = 0x5
     TEMP_START: Final[int] = HEAD_LEN + 32
+    MAX_PACKS: Final[int] = 0x10
     QUERY: Final[dict[str, tuple[int, int, int]]] = {
         # name: cmd, reg start, length
         "EIA": (0x4, 0x2000, EIA_LEN),
@@ -39,29 +43,70 @@ class BMS(BaseBMS):
         "PIA": (0x4, 0x1000, PIA_LEN),
         "PIB": (0x4, 0x1100, PIB_LEN),
     }
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, int, bool, Callable[[int], Any]]]] = [
-        ("temperature", EIB_LEN, 20, 2, True, lambda x: float(x / 10)),  # avg. ctemp
-        ("voltage", EIA_LEN, 0, 4, False, lambda x: float(BMS._swap32(x) / 100)),
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
+        (  # frames are identified by their data length (2 * register count)
+            BMSdp(  # avg. ctemp
+                "temperature",
+                HEAD_LEN + 20,
+                2,
+                True,
+                lambda x: float(x / 10),
+                2 * EIB_LEN,
+            ),
+            BMSdp(
+                "voltage",
+                HEAD_LEN + 0,
+                4,
+                False,
+                lambda x: float(BMS._swap32(x) / 100),
+                2 * EIA_LEN,
+            ),
+            BMSdp(
+                "current",
+                HEAD_LEN + 4,
+                4,
+                True,
+                lambda x: float((BMS._swap32(x, True)) / 10),
+                2 * EIA_LEN,
+            ),
+            BMSdp(
+                "cycle_charge",
+                HEAD_LEN + 8,
+                4,
+                False,
+                lambda x: float(BMS._swap32(x) / 100),
+                2 * EIA_LEN,
+            ),
+            BMSdp("pack_count", HEAD_LEN + 44, 2, False, idx=2 * EIA_LEN),
+            BMSdp("cycles", HEAD_LEN + 46, 2, False, idx=2 * EIA_LEN),
+            BMSdp(
+                "battery_level",
+                HEAD_LEN + 48,
+                2,
+                False,
+                lambda x: float(x / 10),
+                2 * EIA_LEN,
+            ),
+            BMSdp(
+                "problem_code",
+                HEAD_LEN + 1,
+                9,
+                False,
+                lambda x: x & 0xFFFF00FF00FF0000FF,
+                2 * EIC_LEN,
+            ),
+        )
+    )  # Protocol Seplos V3
+    _PFIELDS: Final[BMSdecoder] = BMSdecoder(
         (
-            "current",
-            EIA_LEN,
-            4,
-            4,
-            True,
-            lambda x: float((BMS._swap32(x, True)) / 10),
-        ),
-        ("cycle_charge", EIA_LEN, 8, 4, False, lambda x: float(BMS._swap32(x) / 100)),
-        ("pack_count", EIA_LEN, 44, 2, False, lambda x: x),
-        ("cycles", EIA_LEN, 46, 2, False, lambda x: x),
-        ("battery_level", EIA_LEN, 48, 2, False, lambda x: float(x / 10)),
-        ("problem_code", EIC_LEN, 1, 9, False, lambda x: x & 0xFFFF00FF00FF0000FF),
-    ]  # Protocol Seplos V3
-    _PFIELDS: Final[list[tuple[BMSpackvalue, int, bool, Callable[[int], Any]]]] = [
-        ("pack_voltages", 0, False, lambda x: float(x / 100)),
-        ("pack_currents", 2, True, lambda x: float(x / 100)),
-        ("pack_battery_levels", 10, False, lambda x: float(x / 10)),
-        ("pack_cycles", 14, False, lambda x: x),
-    ]  # Protocol Seplos V3
+            BMSdp("pack_voltages", HEAD_LEN + 0, 2, False, lambda x: float(x / 100)),
+            BMSdp("pack_currents", HEAD_LEN + 2, 2, True, lambda x: float(x / 100)),
+            BMSdp(
+                "pack_battery_levels", HEAD_LEN + 10, 2, False, lambda x: float(x / 10)
+            ),
+            BMSdp("pack_cycles", HEAD_LEN + 14, 2, False),
+        )
+    )  # Protocol Seplos V3
     _CMDS: Final[set[int]] = {field[2] for field in QUERY.values()} | {
         field[2] for field in PQUERY.values()
     }
@@ -69,9 +114,14 @@ class BMS(BaseBMS):
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Intialize private BMS members."""
         super().__init__(__name__, ble_device, reconnect)
-        self._data_final: dict[int, bytearray] = {}
+        self._buffer: Final[BMSbuffer] = BMSbuffer(
+            BMS.HEAD_LEN + 0xFF + BMS.CRC_LEN,
+            len_pos=2,
+            len_add=BMS.HEAD_LEN + BMS.CRC_LEN,
+            slots=len(BMS.PQUERY) * BMS.MAX_PACKS + 1,  # pack replies are pipelined
+        )
+        self._data_final: dict[int, memoryview] = {}
         self._pack_count: int = 0  # number of battery packs
-        self._pkglen: int = 0  # expected packet length
 
     @staticmethod
     def matcher_dict_list() -> list[AdvertisementPattern]:
@@ -124,62 +174,49 @@ class BMS(BaseBMS):
             and data[1] & 0x7F in BMS.CMD_READ  # include read errors
             and data[2] >= BMS.HEAD_LEN + BMS.CRC_LEN
         ):
-            self._data = bytearray()
-            self._pkglen = data[2] + BMS.HEAD_LEN + BMS.CRC_LEN
+            self._buffer.clear()
         elif (  # error message
             len(data) == BMS.HEAD_LEN + BMS.CRC_LEN
             and data[0] <= self._pack_count
             and data[1] & 0x80
         ):
             self._log.debug("RX error: %X", int(data[2]))
-            self._data = bytearray()
-            self._pkglen = BMS.HEAD_LEN + BMS.CRC_LEN
-
-        self._data += data
-        self._log.debug(
-            "RX BLE data (%s): %s", "start" if data == self._data else "cnt.", data
-        )
+            self._buffer.clear()
+            return
 
-        # verify that data is long enough
-        if len(self._data) < self._pkglen:
+        self._log.debug("RX BLE data: %s", data)
+        if (frame := self._buffer.feed(data)) is None:
             return
 
-        if (crc := crc_modbus(self._data[: self._pkglen - 2])) != int.from_bytes(
-            self._data[self._pkglen - 2 : self._pkglen], "little"
-        ):
+        if (crc := crc_modbus(frame[:-2])) != int.from_bytes(frame[-2:], "little"):
             self._log.debug(
                 "invalid checksum 0x%X != 0x%X",
-                int.from_bytes(self._data[self._pkglen - 2 : self._pkglen], "little"),
+                int.from_bytes(frame[-2:], "little"),
                 crc,
             )
             # self._data_final[int(self._data[0])] = bytearray()  # reset invalid data
-            self._data = bytearray()
             return
 
-        if self._data[2] >> 1 not in BMS._CMDS or self._data[1] & 0x80:
+        if frame[2] >> 1 not in BMS._CMDS or frame[1] & 0x80:
             self._log.debug(
-                "unknown message: %s, length: %s", self._data[0:2], self._data[2]
+                "unknown message: %s, length: %s", frame[0:2].hex(" "), frame[2]
             )
-            self._data = bytearray()
             return
 
-        if len(self._data) != self._pkglen:
-            self._log.debug(
-                "wrong data length (%i!=%s): %s",
-                len(self._data),
-                self._pkglen,
-                self._data,
-            )
-
-        self._data_final[int(self._data[0]) << 8 | int(self._data[2])] = self._data
-        self._data = bytearray()
-        self._data_event.set()
+        self._data_final[frame[0] << 8 | frame[2]] = frame
+        self._buffer.keep()
+        self._set_reply(frame[0] << 8 | frame[2], frame)
 
     async def _init_connection(self) -> None:
         """Initialize RX/TX characteristics."""
         await super()._init_connection()
-        self._pack_count = 0
-        self._pkglen = 0
+        self._buffer.clear()
+
+    def _protocol_state(self) -> dict[str, Any]:
+        return {"pack_count": self._pack_count}
+
+    def _restore_protocol_state(self, state: Mapping[str, Any]) -> None:
+        self._pack_count = min(int(state.get("pack_count", 0)), BMS.MAX_PACKS)
 
     @staticmethod
     def _swap32(value: int, signed: bool = False) -> int:
@@ -203,57 +240,48 @@ class BMS(BaseBMS):
         return bytes(frame)
 
     @staticmethod
-    def _decode_data(data: dict[int, bytearray]) -> BMSsample:
-        result: BMSsample = {}
-        for key, msg, idx, size, sign, func in BMS._FIELDS:
-            result[key] = func(
-                int.from_bytes(
-                    data[msg * 2][BMS.HEAD_LEN + idx : BMS.HEAD_LEN + idx + size],
-                    byteorder="big",
-                    signed=sign,
-                )
-            )
-        return result
+    def _requests(
+        devices: range, blocks: dict[str, tuple[int, int, int]]
+    ) -> dict[int, bytes]:
+        """Return commands for blocks of devices with the key of their reply."""
+        return {
+            device << 8 | 2 * block[2]: BMS._cmd(device, *block)
+            for device in devices
+            for block in blocks.values()
+        }
 
     async def _async_update(self) -> BMSsample:
         """Update battery status information."""
-        for block in BMS.QUERY.values():
-            await self._await_reply(BMS._cmd(0x0, *block))
+        packs: Final[int] = self._pack_count  # query known packs with the system
+        try:
+            await self._await_replies(
+                BMS._requests(range(1), BMS.QUERY)
+                | BMS._requests(range(1, 1 + packs), BMS.PQUERY)
+            )
+        except TimeoutError:
+            self._pack_count = 0  # packs might have changed, detect them again
+            raise
 
-        data: BMSsample = BMS._decode_data(self._data_final)
+        data: BMSsample = BMS._FIELDS.decode(self._data_final)
 
-        self._pack_count = min(data.get("pack_count", 0), 0x10)
+        self._pack_count = min(data.get("pack_count", 0), BMS.MAX_PACKS)
 
+        await self._await_replies(  # packs not known before
+            BMS._requests(range(1 + packs, 1 + self._pack_count), BMS.PQUERY)
+        )
         for pack in range(1, 1 + self._pack_count):
-            for block in BMS.PQUERY.values():
-                await self._await_reply(self._cmd(pack, *block))
-
-            for key, idx, sign, func in BMS._PFIELDS:
-                data.setdefault(key, []).append(
-                    func(
-                        int.from_bytes(
-                            self._data_final[pack << 8 | BMS.PIA_LEN * 2][
-                                BMS.HEAD_LEN + idx : BMS.HEAD_LEN + idx + 2
-                            ],
-                            byteorder="big",
-                            signed=sign,
-                        )
-                    )
-                )
+            for key, value in BMS._PFIELDS.decode(
+                self._data_final[pack << 8 | BMS.PIA_LEN * 2]
+            ).items():
+                data.setdefault(key, []).append(value)  # type: ignore[misc]
 
             # get cell voltages
-            pack_cells: list[float] = [
-                float(
-                    int.from_bytes(
-                        self._data_final[pack << 8 | BMS.PIB_LEN * 2][
-                            BMS.HEAD_LEN + idx * 2 : BMS.HEAD_LEN + idx * 2 + 2
-                        ],
-                        byteorder="big",
-                    )
-                    / 1000
-                )
-                for idx in range(16)
-            ]
+            pack_cells: list[float] = scaled_values(
+                self._data_final[pack << 8 | BMS.PIB_LEN * 2],
+                BMS.HEAD_LEN,
+                16,
+                divider=1000,
+            )
             # update per pack delta voltage
             data["delta_voltage"] = max(
                 data.get("delta_voltage", 0),
@@ -263,17 +291,13 @@ class BMS(BaseBMS):
             data.setdefault("cell_voltages", []).extend(pack_cells)
             # add temperature sensors (4x cell temperature + 4 reserved)
             data.setdefault("temp_values", []).extend(
-                (
-                    int.from_bytes(
-                        self._data_final[pack << 8 | BMS.PIB_LEN * 2][
-                            BMS.TEMP_START + idx * 2 : BMS.TEMP_START + idx * 2 + 2
-                        ],
-                        byteorder="big",
-                    )
-                    - 2731.5
+                scaled_values(
+                    self._data_final[pack << 8 | BMS.PIB_LEN * 2],
+                    BMS.TEMP_START,
+                    4,
+                    offset=2731.5,
+                    divider=10,
                 )
-                / 10
-                for idx in range(4)
             )
 
         self._data_final.clear()
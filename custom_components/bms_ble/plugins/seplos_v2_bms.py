@@ -1,13 +1,21 @@
 """Module to support Seplos v2 BMS."""
 
-from collections.abc import Callable
-from typing import Any, Final
+from typing import Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue, crc_xmodem
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    crc_xmodem,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -22,15 +30,19 @@ class BMS(BaseBMS):
     _CELL_POS: Final[int] = 9
     _PRB_MAX: Final[int] = 8  # max number of alarm event bytes
     _PRB_MASK: Final[int] = ~0x82FFFF  # ignore byte 7-8 + byte 6 (bit 7,2)
-    _PFIELDS: Final[  # Seplos V2: single machine data
-        list[tuple[BMSvalue, int, int, int, bool, Callable[[int], Any]]]
-    ] = [
-        ("voltage", 0x61, 2, 2, False, lambda x: float(x / 100)),
-        ("current", 0x61, 0, 2, True, lambda x: float(x / 100)),  # /10 for 0x62
-        ("cycle_charge", 0x61, 4, 2, False, lambda x: float(x / 100)),  # /10 for 0x62
-        ("cycles", 0x61, 13, 2, False, lambda x: x),
-        ("battery_level", 0x61, 9, 2, False, lambda x: float(x / 10)),
-    ]
+    _PFIELDS: Final[BMSdecoder] = BMSdecoder(
+        (  # Seplos V2: single machine data
+            BMSdp("voltage", 2, 2, False, lambda x: float(x / 100), 0x61),
+            BMSdp(  # /10 for 0x62
+                "current", 0, 2, True, lambda x: float(x / 100), 0x61
+            ),
+            BMSdp(  # /10 for 0x62
+                "cycle_charge", 4, 2, False, lambda x: float(x / 100), 0x61
+            ),
+            BMSdp("cycles", 13, 2, False, idx=0x61),
+            BMSdp("battery_level", 9, 2, False, lambda x: float(x / 10), 0x61),
+        )
+    )
     _CMDS: Final[list[tuple[int, bytes]]] = [(0x51, b""), (0x61, b"\x00"), (0x62, b"")]
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
@@ -148,43 +160,13 @@ class BMS(BaseBMS):
         frame += int.to_bytes(crc_xmodem(frame[1:]), 2, byteorder="big") + BMS._TAIL
         return bytes(frame)
 
-    @staticmethod
-    def _decode_data(data: dict[int, bytearray], offs: int) -> BMSsample:
-        result: BMSsample = {}
-        for key, cmd, idx, size, sign, func in BMS._PFIELDS:
-            if idx + offs + size <= len(data[cmd]) - 3:
-                result[key] = func(
-                    int.from_bytes(
-                        data[cmd][idx + offs : idx + offs + size],
-                        byteorder="big",
-                        signed=sign,
-                    )
-                )
-        return result
-
     @staticmethod
     def _temp_sensors(data: bytearray, sensors: int, offs: int) -> list[int | float]:
-        return [
-            (value - 2731.5) / 10
-            for idx in range(sensors)
-            if (
-                value := int.from_bytes(
-                    data[offs + idx * 2 : offs + (idx + 1) * 2],
-                    byteorder="big",
-                    signed=False,
-                )
-            )
-        ]
+        return scaled_values(data, offs, sensors, offset=2731.5, divider=10, skip=(0,))
 
     @staticmethod
     def _cell_voltages(data: bytearray) -> list[float]:
-        return [
-            int.from_bytes(
-                data[10 + idx * 2 : 10 + idx * 2 + 2], byteorder="big", signed=False
-            )
-            / 1000
-            for idx in range(data[BMS._CELL_POS])
-        ]
+        return scaled_values(data, 10, data[BMS._CELL_POS], divider=1000)
 
     async def _async_update(self) -> BMSsample:
         """Update battery status information."""
@@ -197,8 +179,8 @@ class BMS(BaseBMS):
         result["temp_sensors"] = int(
             self._data_final[0x61][BMS._CELL_POS + int(result["cell_count"]) * 2 + 1]
         )
-        result |= BMS._decode_data(
-            self._data_final,
+        result |= BMS._PFIELDS.decode(
+            {0x61: memoryview(self._data_final[0x61])[:-3]},  # skip CRC and tail
             BMS._CELL_POS
             + (result.get("cell_count", 0) + result.get("temp_sensors", 0)) * 2
             + 2,
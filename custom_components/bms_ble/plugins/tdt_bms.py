@@ -1,13 +1,23 @@
 """Module to support TDT BMS."""
 
-from collections.abc import Callable
+from collections.abc import Mapping
 from typing import Any, Final
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.uuids import normalize_uuid_str
 
-from .basebms import AdvertisementPattern, BaseBMS, BMSsample, BMSvalue, crc_modbus
+from .basebms import (
+    AdvertisementPattern,
+    BaseBMS,
+    BMSbuffer,
+    BMSdecoder,
+    BMSdp,
+    BMSsample,
+    BMSvalue,
+    crc_modbus,
+    scaled_values,
+)
 
 
 class BMS(BaseBMS):
@@ -21,28 +31,38 @@ class BMS(BaseBMS):
     _RSP_VER: Final[int] = 0x00
     _CELL_POS: Final[int] = 0x8
     _INFO_LEN: Final[int] = 10  # minimal frame length
-    _FIELDS: Final[list[tuple[BMSvalue, int, int, int, bool, Callable[[int], Any]]]] = [
-        ("voltage", 0x8C, 2, 2, False, lambda x: float(x / 100)),
+    _MAX_LEN: Final[int] = 0x200  # maximum accepted frame length
+    _FIELDS: Final[BMSdecoder] = BMSdecoder(
         (
-            "current",
-            0x8C,
-            0,
-            2,
-            False,
-            lambda x: float((x & 0x3FFF) / 10 * (-1 if x >> 15 else 1)),
-        ),
-        ("cycle_charge", 0x8C, 4, 2, False, lambda x: float(x / 10)),
-        ("battery_level", 0x8C, 13, 1, False, lambda x: x),
-        ("cycles", 0x8C, 8, 2, False, lambda x: x),
-    ]  # problem code is not included in the list, but extra
-    _CMDS: Final[list[int]] = [*list({field[1] for field in _FIELDS}), 0x8D]
+            BMSdp("voltage", 2, 2, False, lambda x: float(x / 100), 0x8C),
+            BMSdp(
+                "current",
+                0,
+                2,
+                False,
+                lambda x: float((x & 0x3FFF) / 10 * (-1 if x >> 15 else 1)),
+                0x8C,
+            ),
+            BMSdp("cycle_charge", 4, 2, False, lambda x: float(x / 10), 0x8C),
+            BMSdp("battery_level", 13, 1, False, idx=0x8C),
+            BMSdp("cycles", 8, 2, False, idx=0x8C),
+        )
+    )  # problem code is not included in the list, but extra
+    _CMDS: Final[list[int]] = [*list({field.idx for field in _FIELDS}), 0x8D]
 
     def __init__(self, ble_device: BLEDevice, reconnect: bool = False) -> None:
         """Initialize BMS."""
         super().__init__(__name__, ble_device, reconnect)
-        self._data_final: dict[int, bytearray] = {}
+        self._buffer: Final[BMSbuffer] = BMSbuffer(
+            BMS._MAX_LEN,
+            head=bytes([BMS._HEAD]),
+            len_pos=6,
+            len_size=2,
+            len_add=BMS._INFO_LEN + 1,  # header, CRC, and tail
+            slots=len(BMS._CMDS) + 1,
+        )
+        self._data_final: dict[int, memoryview] = {}
         self._cmd_heads: list[int] = BMS._CMD_HEADS
-        self._exp_len: int = 0
 
     @staticmethod
     def matcher_dict_list() -> list[AdvertisementPattern]:
@@ -82,6 +102,13 @@ class BMS(BaseBMS):
             }
         )  # calculate further values from BMS provided set ones
 
+    def _protocol_state(self) -> dict[str, Any]:
+        return {"cmd_head": self._cmd_heads[0]} if len(self._cmd_heads) == 1 else {}
+
+    def _restore_protocol_state(self, state: Mapping[str, Any]) -> None:
+        if (head := state.get("cmd_head")) in BMS._CMD_HEADS:
+            self._cmd_heads = [head]
+
     async def _init_connection(self) -> None:
         await self._await_reply(
             data=b"HiLink", char=BMS._UUID_CFG, wait_for_notify=False
@@ -92,52 +119,37 @@ class BMS(BaseBMS):
             self._log.debug("error unlocking BMS: %X", ret)
 
         await super()._init_connection()
+        self._buffer.clear()
 
     def _notification_handler(
         self, _sender: BleakGATTCharacteristic, data: bytearray
     ) -> None:
         """Handle the RX characteristics notify event (new data arrives)."""
         self._log.debug("RX BLE data: %s", data)
-
-        if (
-            len(data) > BMS._INFO_LEN
-            and data[0] == BMS._HEAD
-            and len(self._data) >= self._exp_len
-        ):
-            self._exp_len = BMS._INFO_LEN + int.from_bytes(data[6:8])
-            self._data = bytearray()
-
-        self._data += data
-        self._log.debug(
-            "RX BLE data (%s): %s", "start" if data == self._data else "cnt.", data
-        )
-
-        # verify that data is long enough
-        if len(self._data) < max(BMS._INFO_LEN, self._exp_len):
+        if (frame := self._buffer.feed(data)) is None:
             return
 
-        if self._data[-1] != BMS._TAIL:
-            self._log.debug("frame end incorrect: %s", self._data)
+        if frame[-1] != BMS._TAIL or self._buffer.surplus:
+            self._log.debug("frame end incorrect: %s", bytes(frame))
             return
 
-        if self._data[1] != BMS._RSP_VER:
-            self._log.debug("unknown frame version: V%.1f", self._data[1] / 10)
+        if frame[1] != BMS._RSP_VER:
+            self._log.debug("unknown frame version: V%.1f", frame[1] / 10)
             return
 
-        if self._data[4]:
-            self._log.debug("BMS reported error code: 0x%X", self._data[4])
+        if frame[4]:
+            self._log.debug("BMS reported error code: 0x%X", frame[4])
             return
 
-        if (crc := crc_modbus(self._data[:-3])) != int.from_bytes(
-            self._data[-3:-1], "big"
-        ):
+        if (crc := crc_modbus(frame[:-3])) != int.from_bytes(frame[-3:-1], "big"):
             self._log.debug(
                 "invalid checksum 0x%X != 0x%X",
-                int.from_bytes(self._data[-3:-1], "big"),
+                int.from_bytes(frame[-3:-1], "big"),
                 crc,
             )
             return
-        self._data_final[self._data[5]] = self._data
+        self._data_final[frame[5]] = frame
+        self._buffer.keep()
         self._data_event.set()
 
     @staticmethod
@@ -152,43 +164,12 @@ class BMS(BaseBMS):
         return bytes(frame)
 
     @staticmethod
-    def _decode_data(data: dict[int, bytearray], offs: int) -> BMSsample:
-        result: BMSsample = {}
-        for key, cmd, idx, size, sign, func in BMS._FIELDS:
-            result[key] = func(
-                int.from_bytes(
-                    data[cmd][idx + offs : idx + offs + size],
-                    byteorder="big",
-                    signed=sign,
-                )
-            )
-        return result
+    def _cell_voltages(data: memoryview) -> list[float]:
+        return scaled_values(data, BMS._CELL_POS + 1, data[BMS._CELL_POS], divider=1000)
 
     @staticmethod
-    def _cell_voltages(data: bytearray) -> list[float]:
-        return [
-            int.from_bytes(
-                data[BMS._CELL_POS + 1 + idx * 2 : BMS._CELL_POS + 1 + idx * 2 + 2],
-                byteorder="big",
-                signed=False,
-            )
-            / 1000
-            for idx in range(data[BMS._CELL_POS])
-        ]
-
-    @staticmethod
-    def _temp_sensors(data: bytearray, sensors: int, offs: int) -> list[int | float]:
-        return [
-            (value - 2731.5) / 10
-            for idx in range(sensors)
-            if (
-                value := int.from_bytes(
-                    data[offs + idx * 2 : offs + (idx + 1) * 2],
-                    byteorder="big",
-                    signed=False,
-                )
-            )
-        ]
+    def _temp_sensors(data: memoryview, sensors: int, offs: int) -> list[int | float]:
+        return scaled_values(data, offs, sensors, offset=2731.5, divider=10, skip=(0,))
 
     async def _async_update(self) -> BMSsample:
         """Update battery status information."""
@@ -218,7 +199,7 @@ class BMS(BaseBMS):
         idx: Final[int] = int(
             result.get("cell_count", 0) + result.get("temp_sensors", 0)
         )
-        result |= BMS._decode_data(
+        result |= BMS._FIELDS.decode(
             self._data_final,
             BMS._CELL_POS + idx * 2 + 2,
         )
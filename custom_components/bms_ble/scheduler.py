@@ -0,0 +1,141 @@
+"""Share Bluetooth connection slots between BMS coordinators."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from functools import partial
+from time import monotonic
+from typing import Final
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+from .const import BT_SLOTS, DOMAIN, LOGGER, UPDATE_INTERVAL
+
+_SCHEDULER: Final[str] = "scheduler"  # key in integration data
+
+
+class BTSlotScheduler:
+    """Queue BMS updates per Bluetooth source and stagger them across the interval.
+
+    Links kept open after an update still take a connection slot of the source.
+    They are left open only while all devices of the source fit into its slots,
+    otherwise links are closed before their slot is released.
+    """
+
+    def __init__(self, interval: float, slots: int = BT_SLOTS) -> None:
+        """Initialize scheduler for updates every interval [s] with slots per source."""
+        self._interval: Final[float] = interval
+        self._slots: Final[int] = slots
+        self._queues: dict[str, asyncio.Semaphore] = {}  # source: free slots
+        self._next: dict[str, float] = {}  # source: earliest start of next update
+        self._sources: dict[str, str] = {}  # device address: last Bluetooth source
+        self._wait: dict[str, float] = {}  # device address: last queue wait time [s]
+        # source: device address: close callback of links open outside a slot
+        self._links: dict[str, dict[str, Callable[[], Awaitable[None]]]] = {}
+
+    def _devices(self, source: str) -> int:
+        """Return the number of devices of a source."""
+        return sum(src == source for src in self._sources.values())
+
+    def _gap(self, source: str) -> float:
+        """Return spacing of updates, if the devices of a source exceed its slots."""
+        devices: Final[int] = self._devices(source)
+        return self._interval / devices if devices > self._slots else 0.0
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        source: str,
+        address: str,
+        stagger: bool = True,
+        close: Callable[[], Awaitable[None]] | None = None,
+    ) -> AsyncIterator[None]:
+        """Wait for a connection slot of the Bluetooth source (FIFO) and hold it.
+
+        Commands that must not wait for the staggered start set stagger to false,
+        they are only limited by the slots of the source. The close callback closes
+        the link of the device, if it cannot stay open after the slot is released.
+        """
+        self._sources[address] = source
+        queue: Final[asyncio.Semaphore] = self._queues.setdefault(
+            source, asyncio.Semaphore(self._slots)
+        )
+        start: Final[float] = monotonic()
+        begin: Final[float] = (
+            max(start, self._next.get(source, start)) if stagger else start
+        )
+        if stagger:
+            self._next[source] = begin + self._gap(source)
+        queued: Final[bool] = begin > start or queue.locked()
+        if begin > start:
+            await asyncio.sleep(begin - start)
+        async with queue:
+            self._wait[address] = monotonic() - start if queued else 0.0
+            if queued:
+                LOGGER.debug(
+                    "%s: waited %.3fs for connection slot of %s",
+                    address,
+                    self._wait[address],
+                    source,
+                )
+            links: Final[dict[str, Callable[[], Awaitable[None]]]] = (
+                self._links.setdefault(source, {})
+            )
+            links.pop(address, None)
+            if self._devices(source) > self._slots:
+                await BTSlotScheduler._close_links(source, links)
+            try:
+                yield
+            finally:
+                if close is not None:
+                    if self._devices(source) > self._slots:
+                        await close()
+                    else:
+                        links[address] = close
+
+    @staticmethod
+    async def _close_links(
+        source: str, links: dict[str, Callable[[], Awaitable[None]]]
+    ) -> None:
+        """Close the links kept open outside a slot of the source."""
+        while links:
+            address, close = links.popitem()
+            LOGGER.debug("%s: closing link to free a slot of %s", address, source)
+            await close()
+
+    def wait_time(self, address: str) -> float:
+        """Return the time [s] the last update of a device waited for a slot."""
+        return self._wait.get(address, 0.0)
+
+    def remove(self, address: str) -> None:
+        """Remove a device from the schedule."""
+        self._sources.pop(address, None)
+        self._wait.pop(address, None)
+        for links in self._links.values():
+            links.pop(address, None)
+
+
+class ScheduleListeners:
+    """Callbacks notified when the time of the next update changes."""
+
+    def __init__(self) -> None:
+        """Initialize without listeners."""
+        self._listeners: Final[set[CALLBACK_TYPE]] = set()
+
+    def add(self, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Add a listener, return a callback removing it."""
+        self._listeners.add(listener)
+        return partial(self._listeners.discard, listener)
+
+    def notify(self) -> None:
+        """Call all listeners."""
+        for listener in list(self._listeners):
+            listener()
+
+
+def async_get_scheduler(hass: HomeAssistant) -> BTSlotScheduler:
+    """Return the integration-wide connection slot scheduler."""
+    domain_data: Final[dict[str, BTSlotScheduler]] = hass.data.setdefault(DOMAIN, {})
+    if _SCHEDULER not in domain_data:
+        domain_data[_SCHEDULER] = BTSlotScheduler(UPDATE_INTERVAL)
+    return domain_data[_SCHEDULER]
@@ -1,9 +1,11 @@
 """Platform for sensor integration."""
 
 from collections.abc import Callable
+from datetime import datetime
+from time import monotonic
 from typing import Final, cast
 
-from custom_components.bms_ble.plugins.basebms import BMSpackvalue, BMSsample
+from custom_components.bms_ble.plugins.basebms import BMSdata, BMSpackvalue
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
@@ -20,25 +22,39 @@ from homeassistant.const import (
     UnitOfTemperature,
     UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import BTBmsConfigEntry
+from . import BTBmsBankConfigEntry, BTBmsConfigEntry
+from .bank import BTBmsBank
 from .const import (
+    ATTR_BATTERIES,
+    ATTR_CHRG_ENERGY,
+    ATTR_CHRG_THROUGHPUT,
     ATTR_CURRENT,
     ATTR_CYCLE_CAP,
     ATTR_CYCLES,
+    ATTR_DELTA_LEVEL,
     ATTR_DELTA_VOLTAGE,
+    ATTR_DISCHRG_ENERGY,
+    ATTR_DISCHRG_THROUGHPUT,
     ATTR_LQ,
+    ATTR_MAX_LEVEL,
+    ATTR_MIN_LEVEL,
+    ATTR_NEXT_CYCLE,
+    ATTR_NEXT_UPDATE,
     ATTR_POWER,
     ATTR_RSSI,
     ATTR_RUNTIME,
+    BANK_ID,
     DOMAIN,
     LOGGER,
+    MAX_REPORT_INTERVAL,
 )
 from .coordinator import BTBmsCoordinator
+from .energy import EnergyCounter
 
 PARALLEL_UPDATES = 0
 
@@ -46,12 +62,17 @@ PARALLEL_UPDATES = 0
 class BmsEntityDescription(SensorEntityDescription, frozen_or_thawed=True):
     """Describes BMS sensor entity."""
 
-    value_fn: Callable[[BMSsample], float | int | None]
-    attr_fn: Callable[[BMSsample], dict[str, list[int | float]]] | None = None
+    value_fn: Callable[[BMSdata], float | int | None]
+    attr_fn: Callable[[BMSdata], dict[str, list[int | float]]] | None = None
+    attr_keys: frozenset[str] = frozenset()  # BMS values used by attr_fn
+    # suppress state writes for changes below the larger of both thresholds
+    deadband: float = 0  # absolute threshold [native unit]
+    deadband_pct: float = 0  # threshold relative to the reported value [%]
+    max_report_interval: int = MAX_REPORT_INTERVAL  # [s] report changes after
 
 
 def _attr_pack(
-    data: BMSsample, key: BMSpackvalue, default: list[int | float]
+    data: BMSdata, key: BMSpackvalue, default: list[int | float]
 ) -> dict[str, list[int | float]]:
     """Return a dictionary with the given key and default value."""
     return (
@@ -71,6 +92,8 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
         suggested_display_precision=2,
         value_fn=lambda data: data.get("voltage"),
         attr_fn=lambda data: _attr_pack(data, "pack_voltages", [0.0]),
+        attr_keys=frozenset({"pack_voltages"}),
+        deadband=0.02,
     ),
     BmsEntityDescription(
         key=ATTR_BATTERY_LEVEL,
@@ -80,6 +103,7 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
         device_class=SensorDeviceClass.BATTERY,
         value_fn=lambda data: data.get("battery_level"),
         attr_fn=lambda data: _attr_pack(data, "pack_battery_levels", [0.0]),
+        attr_keys=frozenset({"pack_battery_levels"}),
     ),
     BmsEntityDescription(
         key=ATTR_TEMPERATURE,
@@ -98,6 +122,8 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
                 else {}
             )
         ),
+        attr_keys=frozenset({"temp_values"}),
+        deadband=0.2,
     ),
     BmsEntityDescription(
         key=ATTR_CURRENT,
@@ -112,6 +138,9 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
             else {}
         )
         | _attr_pack(data, "pack_currents", [0.0]),
+        attr_keys=frozenset({"balance_current", "pack_currents"}),
+        deadband=0.1,
+        deadband_pct=1,
     ),
     BmsEntityDescription(
         key=ATTR_CYCLE_CAP,
@@ -129,6 +158,7 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
         state_class=SensorStateClass.TOTAL_INCREASING,
         value_fn=lambda data: data.get("cycles"),
         attr_fn=lambda data: _attr_pack(data, "pack_cycles", [0]),
+        attr_keys=frozenset({"pack_cycles"}),
     ),
     BmsEntityDescription(
         key=ATTR_POWER,
@@ -138,6 +168,8 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
         device_class=SensorDeviceClass.POWER,
         suggested_display_precision=1,
         value_fn=lambda data: data.get("power"),
+        deadband=2,
+        deadband_pct=1,
     ),
     BmsEntityDescription(
         key=ATTR_RUNTIME,
@@ -164,6 +196,52 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
             if "cell_voltages" in data
             else {}
         ),
+        attr_keys=frozenset({"cell_voltages"}),
+        deadband=0.002,
+    ),
+    BmsEntityDescription(
+        key=ATTR_CHRG_ENERGY,
+        translation_key=ATTR_CHRG_ENERGY,
+        name="Charge energy",
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        device_class=SensorDeviceClass.ENERGY,
+        suggested_display_precision=2,
+        value_fn=lambda data: None,  # counted by the coordinator
+        deadband=1,
+    ),
+    BmsEntityDescription(
+        key=ATTR_DISCHRG_ENERGY,
+        translation_key=ATTR_DISCHRG_ENERGY,
+        name="Discharge energy",
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        device_class=SensorDeviceClass.ENERGY,
+        suggested_display_precision=2,
+        value_fn=lambda data: None,  # counted by the coordinator
+        deadband=1,
+    ),
+    BmsEntityDescription(
+        key=ATTR_CHRG_THROUGHPUT,
+        translation_key=ATTR_CHRG_THROUGHPUT,
+        name="Charge throughput",
+        native_unit_of_measurement="Ah",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: None,  # counted by the coordinator
+        deadband=0.1,
+    ),
+    BmsEntityDescription(
+        key=ATTR_DISCHRG_THROUGHPUT,
+        translation_key=ATTR_DISCHRG_THROUGHPUT,
+        name="Discharge throughput",
+        native_unit_of_measurement="Ah",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: None,  # counted by the coordinator
+        deadband=0.1,
     ),
     BmsEntityDescription(
         key=ATTR_RSSI,
@@ -185,26 +263,112 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
         entity_category=EntityCategory.DIAGNOSTIC,
         value_fn=lambda data: None,  # LQ is handled in a separate class
     ),
+    BmsEntityDescription(
+        key=ATTR_NEXT_UPDATE,
+        translation_key=ATTR_NEXT_UPDATE,
+        name="Next update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_registry_enabled_default=False,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: None,  # scheduled by the coordinator
+    ),
+]
+
+
+BANK_SENSOR_TYPES: Final[list[SensorEntityDescription]] = [
+    SensorEntityDescription(
+        key=ATTR_BATTERY_LEVEL,
+        translation_key=ATTR_BATTERY_LEVEL,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.BATTERY,
+        suggested_display_precision=1,
+    ),
+    SensorEntityDescription(
+        key=ATTR_MIN_LEVEL,
+        translation_key=ATTR_MIN_LEVEL,
+        name="Minimum battery level",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.BATTERY,
+    ),
+    SensorEntityDescription(
+        key=ATTR_MAX_LEVEL,
+        translation_key=ATTR_MAX_LEVEL,
+        name="Maximum battery level",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.BATTERY,
+    ),
+    SensorEntityDescription(
+        key=ATTR_DELTA_LEVEL,
+        translation_key=ATTR_DELTA_LEVEL,
+        name="Battery level imbalance",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key=ATTR_POWER,
+        translation_key=ATTR_POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.POWER,
+        suggested_display_precision=1,
+    ),
+    SensorEntityDescription(
+        key=ATTR_CYCLE_CAP,
+        translation_key=ATTR_CYCLE_CAP,
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY_STORAGE,
+        suggested_display_precision=1,
+    ),
+    SensorEntityDescription(
+        key=ATTR_BATTERIES,
+        translation_key=ATTR_BATTERIES,
+        name="Batteries",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key=ATTR_NEXT_CYCLE,
+        translation_key=ATTR_NEXT_CYCLE,
+        name="Next control cycle",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
 ]
 
 
 async def async_setup_entry(
     _hass: HomeAssistant,
-    config_entry: BTBmsConfigEntry,
+    config_entry: BTBmsConfigEntry | BTBmsBankConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Add sensors for passed config_entry in Home Assistant."""
 
-    bms: Final[BTBmsCoordinator] = config_entry.runtime_data
+    bms: Final[BTBmsCoordinator | BTBmsBank] = config_entry.runtime_data
+    if isinstance(bms, BTBmsBank):
+        async_add_entities(
+            ScheduleSensor(bms, descr, BANK_ID)
+            if descr.key == ATTR_NEXT_CYCLE
+            else BankSensor(bms, descr)
+            for descr in BANK_SENSOR_TYPES
+        )
+        return
+
     mac: Final[str] = format_mac(config_entry.unique_id)
-    for descr in SENSOR_TYPES:
-        if descr.key == ATTR_RSSI:
-            async_add_entities([RSSISensor(bms, descr, mac)])
-            continue
-        if descr.key == ATTR_LQ:
-            async_add_entities([LQSensor(bms, descr, mac)])
-            continue
-        async_add_entities([BMSSensor(bms, descr, mac)])
+    sensors: Final[
+        dict[str, Callable[[BTBmsCoordinator, BmsEntityDescription, str], SensorEntity]]
+    ] = {
+        ATTR_RSSI: RSSISensor,
+        ATTR_LQ: LQSensor,
+        ATTR_NEXT_UPDATE: ScheduleSensor,
+        **dict.fromkeys(EnergyCounter.KEYS, EnergySensor),
+    }  # sensors not rendering a BMS value
+    # add all entities with one call, each call runs the add path of the platform
+    async_add_entities(
+        sensors.get(descr.key, BMSSensor)(bms, descr, mac) for descr in SENSOR_TYPES
+    )
 
 
 class BMSSensor(CoordinatorEntity[BTBmsCoordinator], SensorEntity):  # type: ignore[reportIncompatibleMethodOverride]
@@ -220,8 +384,45 @@ class BMSSensor(CoordinatorEntity[BTBmsCoordinator], SensorEntity):  # type: ign
         self._attr_unique_id = f"{DOMAIN}-{unique_id}-{descr.key}"
         self._attr_device_info = bms.device_info
         self.entity_description = descr  # type: ignore[reportIncompatibleVariableOverride]
+        self._keys: Final[frozenset[str]] = descr.attr_keys | {descr.key}
+        self._was_available: bool | None = None
+        self._reported: tuple[int | float | None, float] = (None, float("-inf"))
         super().__init__(bms)
 
+    def _in_deadband(self) -> bool:
+        """Return true if the value change since the last report is below deadband."""
+        descr: Final[BmsEntityDescription] = self.entity_description
+        last, t_reported = self._reported
+        if (
+            not (descr.deadband or descr.deadband_pct)
+            or monotonic() - t_reported >= descr.max_report_interval
+            or last is None
+            or (value := self.native_value) is None
+        ):
+            return False
+        return abs(value - last) < max(
+            descr.deadband, abs(last) * descr.deadband_pct / 100
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if availability or the rendered values changed.
+
+        The deadband applies to value changes only, attribute changes are written.
+        """
+        if self.available == self._was_available:
+            if not self.coordinator.changed(self._keys):
+                return
+            if (
+                not self.coordinator.changed(self.entity_description.attr_keys)
+                and self._in_deadband()
+            ):
+                self.coordinator.count_suppressed()
+                return
+        self._was_available = self.available
+        self._reported = (self.native_value, monotonic())
+        super()._handle_coordinator_update()
+
     @property
     def extra_state_attributes(self) -> dict[str, list[int | float]] | None:  # type: ignore[reportIncompatibleVariableOverride]
         """Return entity specific state attributes, e.g. cell voltages."""
@@ -236,6 +437,72 @@ class BMSSensor(CoordinatorEntity[BTBmsCoordinator], SensorEntity):  # type: ign
         return self.entity_description.value_fn(self.coordinator.data)
 
 
+class EnergySensor(BMSSensor):
+    """The sensor of an energy or charge total counted by the coordinator."""
+
+    @property
+    def native_value(self) -> float:  # type: ignore[reportIncompatibleVariableOverride]
+        """Return the counted total."""
+        return round(self.coordinator.energy[self.entity_description.key], 3)
+
+
+class BankSensor(CoordinatorEntity[BTBmsBank], SensorEntity):  # type: ignore[reportIncompatibleMethodOverride]
+    """The sensor of a value aggregated over the battery bank."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, bank: BTBmsBank, descr: SensorEntityDescription) -> None:
+        """Intitialize the battery bank sensor."""
+        self._attr_unique_id = f"{DOMAIN}-{BANK_ID}-{descr.key}"
+        self._attr_device_info = bank.device_info
+        self.entity_description = descr
+        super().__init__(bank)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, dict[str, float]] | None:  # type: ignore[reportIncompatibleVariableOverride]
+        """Return the battery levels of the members for the average level."""
+        if self.entity_description.key == ATTR_BATTERY_LEVEL:
+            return {"battery_levels": self.coordinator.levels}
+        return None
+
+    @property
+    def native_value(self) -> int | float | None:  # type: ignore[reportIncompatibleVariableOverride]
+        """Return the aggregated value."""
+        return self.coordinator.data.get(self.entity_description.key)
+
+
+class ScheduleSensor(SensorEntity):
+    """The sensor of the time of the next update of a BMS or the battery bank.
+
+    The state is written when the update is scheduled, the frontend counts down.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        source: BTBmsCoordinator | BTBmsBank,
+        descr: SensorEntityDescription,
+        unique_id: str,
+    ) -> None:
+        """Intitialize the schedule sensor."""
+        self._attr_unique_id = f"{DOMAIN}-{unique_id}-{descr.key}"
+        self._attr_device_info = source.device_info
+        self.entity_description = descr
+        self._source: Final[BTBmsCoordinator | BTBmsBank] = source
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state whenever the next update is scheduled."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._source.schedule.add(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> datetime | None:  # type: ignore[reportIncompatibleVariableOverride]
+        """Return the time of the next update."""
+        return self._source.next_update
+
+
 class RSSISensor(SensorEntity):
     """The Bluetooth RSSI sensor."""
 
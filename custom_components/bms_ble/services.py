@@ -0,0 +1,144 @@
+"""Actions of the BLE Battery Management System integration."""
+
+import asyncio
+from collections.abc import Mapping
+from time import monotonic
+from typing import Final, NamedTuple
+
+from bleak.exc import BleakError
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+
+from .const import DOMAIN, LOGGER, SERVICE_SET_DISCHARGE
+from .coordinator import BTBmsCoordinator
+
+ATTR_DISABLE: Final[str] = "disable"
+ATTR_ENABLE: Final[str] = "enable"
+
+SET_DISCHARGE_SCHEMA: Final = vol.All(
+    cv.has_at_least_one_key(ATTR_ENABLE, ATTR_DISABLE),
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ENABLE, default=list): vol.All(
+                cv.ensure_list, [cv.string]
+            ),
+            vol.Optional(ATTR_DISABLE, default=list): vol.All(
+                cv.ensure_list, [cv.string]
+            ),
+        }
+    ),
+)
+
+
+class DischargeResult(NamedTuple):
+    """Result of a discharge command."""
+
+    success: bool
+    duration: float  # [s] including the wait for a connection slot
+
+
+async def async_switch_discharge(
+    commands: Mapping[str, tuple[BTBmsCoordinator, bool]],
+) -> dict[str, DischargeResult]:
+    """Switch the discharge of several BMS concurrently.
+
+    Concurrency is limited per Bluetooth source by its connection slots, so the
+    commands take about the time of the slowest device if they fit into the slots.
+    A command that raises fails only for its device.
+    """
+
+    async def _switch(coordinator: BTBmsCoordinator, enable: bool) -> DischargeResult:
+        start: Final[float] = monotonic()
+        success: bool = False
+        try:
+            success = await coordinator.async_set_discharge(enable)
+        except (BleakError, EOFError, TimeoutError) as err:
+            LOGGER.warning(
+                "%s: discharge command failed: %s (%s)",
+                coordinator.name,
+                err,
+                type(err).__name__,
+            )
+        except Exception:  # noqa: BLE001  # must not abort the other commands
+            LOGGER.exception("%s: discharge command failed", coordinator.name)
+        return DischargeResult(success, round(monotonic() - start, 3))
+
+    results: Final[list[DischargeResult]] = await asyncio.gather(
+        *(_switch(coordinator, enable) for coordinator, enable in commands.values())
+    )
+    return dict(zip(commands, results, strict=True))
+
+
+def _coordinator(hass: HomeAssistant, device_id: str) -> BTBmsCoordinator:
+    """Return the coordinator of a loaded BMS device that can switch its discharge."""
+    if device := dr.async_get(hass).async_get(device_id):
+        for entry_id in device.config_entries:
+            if (
+                (entry := hass.config_entries.async_get_entry(entry_id)) is not None
+                and entry.domain == DOMAIN
+                and entry.state is ConfigEntryState.LOADED
+                and isinstance(coordinator := entry.runtime_data, BTBmsCoordinator)
+            ):
+                if not coordinator.discharge_control:
+                    raise ServiceValidationError(
+                        translation_domain=DOMAIN,
+                        translation_key="discharge_not_supported",
+                        translation_placeholders={"name": coordinator.name},
+                    )
+                return coordinator
+    raise ServiceValidationError(
+        translation_domain=DOMAIN,
+        translation_key="device_not_loaded",
+        translation_placeholders={"device_id": device_id},
+    )
+
+
+async def _async_set_discharge(call: ServiceCall) -> ServiceResponse:
+    """Switch the discharge of the selected devices and report per device."""
+    commands: Final[dict[str, tuple[BTBmsCoordinator, bool]]] = {}
+    for key, enable in ((ATTR_ENABLE, True), (ATTR_DISABLE, False)):
+        for device_id in call.data[key]:
+            if device_id in commands:
+                raise ServiceValidationError(
+                    translation_domain=DOMAIN,
+                    translation_key="conflicting_discharge",
+                    translation_placeholders={"device_id": device_id},
+                )
+            commands[device_id] = (_coordinator(call.hass, device_id), enable)
+
+    start: Final[float] = monotonic()
+    results: Final[dict[str, DischargeResult]] = await async_switch_discharge(commands)
+    duration: Final[float] = round(monotonic() - start, 3)
+    LOGGER.debug("switched discharge of %i devices in %.3fs", len(results), duration)
+    return {
+        "duration": duration,
+        "devices": {
+            device_id: {
+                "name": commands[device_id][0].name,
+                "discharge": commands[device_id][1],
+                "success": result.success,
+                "duration": result.duration,
+            }
+            for device_id, result in results.items()
+        },
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the actions of the integration."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_DISCHARGE,
+        _async_set_discharge,
+        schema=SET_DISCHARGE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -5,23 +5,28 @@ from __future__ import annotations
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import BTBmsConfigEntry
-from .const import DOMAIN, LOGGER
+from . import BTBmsBankConfigEntry, BTBmsConfigEntry
+from .bank import BTBmsBank
+from .const import BANK_ID, DOMAIN, LOGGER
 from .coordinator import BTBmsCoordinator
 
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: BTBmsConfigEntry,
+    config_entry: BTBmsConfigEntry | BTBmsBankConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up switch platform."""
-    coordinator = config_entry.runtime_data
+    coordinator: BTBmsCoordinator | BTBmsBank = config_entry.runtime_data
+    if isinstance(coordinator, BTBmsBank):
+        async_add_entities([BTBmsBalancingSwitch(coordinator)])
+        return
     
     # LOGGER.warning("=== SWITCH PLATFORM SETUP START V2 ===")
     # LOGGER.warning("BMS class: %s", coordinator._device.__class__.__name__)
@@ -106,51 +111,13 @@ class BTBmsDischargeSwitch(CoordinatorEntity[BTBmsCoordinator], SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on discharge."""
-        LOGGER.info("Switch async_turn_on called")
-        if hasattr(self.coordinator._device, "enable_discharge"):
-            LOGGER.info("Calling enable_discharge() on BMS")
-            success = await self.coordinator._device.enable_discharge()
-            LOGGER.info("enable_discharge() returned: %s", success)
-            if success:
-                LOGGER.info("Success! Requesting coordinator refresh")
-                await self.coordinator.async_request_refresh()
-                # Log the state after refresh
-                if self.coordinator.data:
-                    new_state = self.coordinator.data.get(
-                        "battery_discharging_state", False
-                    )
-                    LOGGER.info(
-                        "After refresh, battery_discharging_state = %s",
-                        new_state
-                    )
-            else:
-                LOGGER.warning("enable_discharge() failed!")
-        else:
-            LOGGER.error("BMS does not have enable_discharge method!")
+        if not await self.coordinator.async_set_discharge(True):
+            LOGGER.warning("%s: failed to enable discharge", self.coordinator.name)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off discharge."""
-        LOGGER.info("Switch async_turn_off called")
-        if hasattr(self.coordinator._device, "disable_discharge"):
-            LOGGER.info("Calling disable_discharge() on BMS")
-            success = await self.coordinator._device.disable_discharge()
-            LOGGER.info("disable_discharge() returned: %s", success)
-            if success:
-                LOGGER.info("Success! Requesting coordinator refresh")
-                await self.coordinator.async_request_refresh()
-                # Log the state after refresh
-                if self.coordinator.data:
-                    new_state = self.coordinator.data.get(
-                        "battery_discharging_state", False
-                    )
-                    LOGGER.info(
-                        "After refresh, battery_discharging_state = %s",
-                        new_state
-                    )
-            else:
-                LOGGER.warning("disable_discharge() failed!")
-        else:
-            LOGGER.error("BMS does not have disable_discharge method!")
+        if not await self.coordinator.async_set_discharge(False):
+            LOGGER.warning("%s: failed to disable discharge", self.coordinator.name)
 
     @property
     def available(self) -> bool:
@@ -160,3 +127,32 @@ class BTBmsDischargeSwitch(CoordinatorEntity[BTBmsCoordinator], SwitchEntity):
             and hasattr(self.coordinator._device, "enable_discharge")
             and hasattr(self.coordinator._device, "disable_discharge")
         )
+
+
+class BTBmsBalancingSwitch(SwitchEntity):
+    """Switch enabling the discharge balancing of the battery bank."""
+
+    _attr_entity_category = EntityCategory.CONFIG
+    _attr_has_entity_name = True
+    _attr_translation_key = "discharge_balancing"
+
+    def __init__(self, bank: BTBmsBank) -> None:
+        """Initialize the switch."""
+        self._attr_unique_id = f"{DOMAIN}-{BANK_ID}-discharge_balancing"
+        self._attr_device_info = bank.device_info
+        self._controller = bank.controller
+
+    @property
+    def is_on(self) -> bool:
+        """Return true if the controller switches the discharge of the members."""
+        return self._controller.enabled
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Enable discharge balancing."""
+        await self._controller.async_set_enabled(True)
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Disable discharge balancing."""
+        await self._controller.async_set_enabled(False)
+        self.async_write_ha_state()
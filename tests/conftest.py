@@ -25,6 +25,7 @@ from custom_components.bms_ble.plugins.basebms import (
     AdvertisementPattern,
     BaseBMS,
     BMSsample,
+    BMSvalue,
 )
 
 from .bluetooth import generate_advertisement_data, generate_ble_device
@@ -232,11 +233,16 @@ class MockBMS(BaseBMS):
     """Mock Battery Management System."""
 
     def __init__(
-        self, exc: Exception | None = None, ret_value: BMSsample | None = None
-    ) -> None:  # , ble_device, reconnect: bool = False
+        self,
+        exc: Exception | None = None,
+        ret_value: BMSsample | None = None,
+        reconnect: bool = False,
+    ) -> None:
         """Initialize BMS."""
         super().__init__(
-            LOGGER.name, generate_ble_device(address="", details={"path": None}), False
+            LOGGER.name,
+            generate_ble_device(address="", details={"path": None}),
+            reconnect,
         )
         LOGGER.debug("%s init(), Test except: %s", self.device_id(), str(exc))
         self._exception: Exception | None = exc
@@ -294,6 +300,58 @@ class MockBMS(BaseBMS):
         return self._ret_value
 
 
+class MockSwitchBMS(MockBMS):
+    """Mock BMS that can switch its discharge."""
+
+    def __init__(self, confirm: bool = True) -> None:
+        """Initialize BMS, confirm the discharge state if set."""
+        super().__init__(ret_value={"voltage": 13, "battery_discharging_state": True})
+        self._confirm: bool = confirm
+        self._state: bool = True
+        self.updates: int = 0
+
+    async def _async_update(self) -> BMSsample:
+        """Update battery status information."""
+        self.updates += 1
+        return await super()._async_update() | {
+            "battery_discharging_state": self._state
+        }
+
+    async def enable_discharge(self) -> bool:
+        """Enable battery discharge."""
+        self._state = True
+        return True
+
+    async def disable_discharge(self) -> bool:
+        """Disable battery discharge."""
+        self._state = False
+        return True
+
+    async def discharge_state(self) -> bool:
+        """Return the discharge state."""
+        if not self._confirm:
+            raise TimeoutError
+        return self._state
+
+
+class MockAdvBMS(MockBMS):
+    """Mock Battery Management System that broadcasts voltage and current."""
+
+    @staticmethod
+    def decode_advertisement(service_info: BluetoothServiceInfoBleak) -> BMSsample:
+        """Return voltage and current from manufacturer data."""
+        if (data := service_info.manufacturer_data.get(0xFFFF)) is None:
+            return {}
+        return {
+            "voltage": int.from_bytes(data[0:2]) / 100,
+            "current": int.from_bytes(data[2:4], signed=True) / 100,
+        }
+
+    @staticmethod
+    def _calc_values() -> frozenset[BMSvalue]:
+        return frozenset({"power"})
+
+
 class MockBleakClient(BleakClient):
     """Mock bleak client."""
 
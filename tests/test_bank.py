@@ -0,0 +1,97 @@
+"""Test the battery bank aggregating BMS coordinators."""
+
+from typing import Final
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.bms_ble.bank import BTBmsBank
+from custom_components.bms_ble.const import BANK_ID, DOMAIN
+from custom_components.bms_ble.coordinator import BTBmsCoordinator
+from custom_components.bms_ble.plugins.basebms import BMSsample
+from homeassistant.const import CONF_DEVICES
+from homeassistant.core import HomeAssistant
+
+from .bluetooth import generate_ble_device
+from .conftest import MockBMS, mock_config
+
+MEMBERS: Final[dict[str, BMSsample]] = {
+    "cc:cc:cc:cc:cc:01": {"battery_level": 80, "power": -120.5, "cycle_capacity": 1024},
+    "cc:cc:cc:cc:cc:02": {"battery_level": 71, "power": -80, "cycle_capacity": 912.5},
+    "cc:cc:cc:cc:cc:03": {"battery_level": 10, "power": 0, "cycle_capacity": 128},
+}
+
+
+def member(hass: HomeAssistant, address: str) -> BTBmsCoordinator:
+    """Return the coordinator of a BMS providing the sample of the address."""
+    return BTBmsCoordinator(
+        hass,
+        generate_ble_device(address, f"member_{address[-2:]}"),
+        MockBMS(ret_value=MEMBERS[address]),
+        mock_config(bms="member", unique_id=address),
+    )
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_aggregate(hass: HomeAssistant) -> None:
+    """Test that the bank aggregates the values of its members on their updates."""
+
+    bank: Final[BTBmsBank] = BTBmsBank(
+        hass,
+        MockConfigEntry(
+            domain=DOMAIN,
+            version=1,
+            minor_version=0,
+            unique_id=BANK_ID,
+            data={CONF_DEVICES: ["cc:cc:cc:cc:cc:01", "cc:cc:cc:cc:cc:02"]},
+            title="Battery bank",
+        ),
+    )
+    coordinators: Final[dict[str, BTBmsCoordinator]] = {
+        address: member(hass, address) for address in MEMBERS
+    }
+    for address, coordinator in coordinators.items():
+        bank.attach(address, coordinator)
+
+    assert set(bank.members) == {"cc:cc:cc:cc:cc:01", "cc:cc:cc:cc:cc:02"}
+    assert bank.data == {"batteries": 0}, "members without data do not count"
+
+    await coordinators["cc:cc:cc:cc:cc:01"].async_refresh()
+    assert bank.data == {
+        "batteries": 1,
+        "battery_level": 80,
+        "min_battery_level": 80,
+        "max_battery_level": 80,
+        "delta_battery_level": 0,
+        "power": -120.5,
+        "cycle_capacity": 1024,
+    }
+
+    for coordinator in coordinators.values():
+        await coordinator.async_refresh()
+    assert bank.data == {
+        "batteries": 2,
+        "battery_level": 75.5,
+        "min_battery_level": 71,
+        "max_battery_level": 80,
+        "delta_battery_level": 9,
+        "power": -200.5,
+        "cycle_capacity": 1936.5,
+    }
+    assert bank.levels == {"member_01": 80, "member_02": 71}
+    assert bank.next_update is not None
+    assert bank.next_update == min(
+        coordinators[address].next_update
+        for address in ("cc:cc:cc:cc:cc:01", "cc:cc:cc:cc:cc:02")
+    ), "members update the controller"
+
+    bank.detach("cc:cc:cc:cc:cc:03")  # not a member
+    bank.detach("cc:cc:cc:cc:cc:01")
+    await coordinators["cc:cc:cc:cc:cc:01"].async_refresh()
+    assert bank.data["batteries"] == 1
+    assert bank.data["battery_level"] == 71
+
+    await bank.async_shutdown()
+    assert not bank.members
+    for coordinator in coordinators.values():
+        await coordinator.async_shutdown()
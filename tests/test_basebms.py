@@ -1,26 +1,35 @@
 """Test the BLE Battery Management System base class functions."""
 
+import asyncio
 from collections.abc import Buffer, Callable
-from typing import Final
+from typing import Final, Literal
 from uuid import UUID
 
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.exc import BleakError
 from bleak.uuids import normalize_uuid_str
+from habluetooth import BluetoothServiceInfoBleak
 import pytest
 
 from custom_components.bms_ble.plugins.basebms import (
     AdvertisementPattern,
     BaseBMS,
+    BMSbuffer,
+    BMScompact,
+    BMSdecoder,
+    BMSdp,
     BMSsample,
+    changed_keys,
     crc8,
     crc_modbus,
     crc_xmodem,
+    int_array,
+    scaled_values,
 )
 
 from .bluetooth import generate_ble_device
-from .conftest import MockBleakClient
+from .conftest import MockAdvBMS, MockBleakClient, MockBMS
 
 
 class MockWriteModeBleakClient(MockBleakClient):
@@ -64,6 +73,69 @@ class MockWriteModeBleakClient(MockBleakClient):
         raise ValueError
 
 
+class MockPipelineBleakClient(MockBleakClient):
+    """Emulate a BleakClient answering requests out of order, drops first write of 5."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize request statistics."""
+        super().__init__(*args, **kwargs)
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self.writes: list[int] = []
+        self.silent: bool = False  # drop all requests
+        self._pending: list[asyncio.TimerHandle] = []
+
+    def _reply(self, data: bytearray) -> None:
+        assert self._notify_callback is not None
+        self.in_flight -= 1
+        self._notify_callback("rx_char", data)
+
+    async def write_gatt_char(
+        self,
+        char_specifier: BleakGATTCharacteristic | int | str | UUID,
+        data: Buffer,
+        response: bool | None = None,
+    ) -> None:
+        """Reply to requests after a delay that decreases with the request number."""
+        await super().write_gatt_char(char_specifier, data, response)
+        req: Final[bytearray] = bytearray(data)
+        self.writes.append(req[0])
+        if self.silent or (req[0] == 5 and self.writes.count(5) == 1):
+            return  # request lost
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self._pending.append(
+            asyncio.get_running_loop().call_later(
+                0.02 - 0.002 * req[0], self._reply, req + b"\xaa"
+            )
+        )
+
+    async def disconnect(self) -> bool:
+        """Mock disconnect, drop pending replies."""
+        for handle in self._pending:
+            handle.cancel()
+        self._pending.clear()
+        return await super().disconnect()
+
+
+class MockPipelineBMS(MockBMS):
+    """Mock BMS matching replies by their first byte."""
+
+    def _notification_handler(
+        self, _sender: BleakGATTCharacteristic, data: bytearray
+    ) -> None:
+        self._set_reply(data[0], bytes(data))
+
+
+class MockSlowConnectBleakClient(MockBleakClient):
+    """Emulate a BleakClient that takes some time to connect."""
+
+    async def connect(self, *_args, **_kwargs) -> Literal[True]:
+        """Mock slow connect."""
+        await asyncio.sleep(0.1)
+        return await super().connect()
+
+
 class WMTestBMS(BaseBMS):
     """Test BMS implementation."""
 
@@ -119,6 +191,7 @@ class WMTestBMS(BaseBMS):
 
         return {"problem_code": int.from_bytes(self._data, "big", signed=False)}
 
+
 def test_calc_missing_values(bms_data_fixture: BMSsample) -> None:
     """Check if missing data is correctly calculated."""
     bms_data: BMSsample = bms_data_fixture
@@ -144,7 +217,9 @@ def test_calc_missing_values(bms_data_fixture: BMSsample) -> None:
         "power": (
             -91
             if bms_data.get("current", 0) < 0
-            else 0 if bms_data.get("current") == 0 else 147
+            else 0
+            if bms_data.get("current") == 0
+            else 147
         ),
         # battery is charging if current is positive
         "battery_charging": bms_data.get("current", 0) > 0,
@@ -173,6 +248,107 @@ def test_calc_cycle_chrg() -> None:
     assert bms_data == ref | {"cycle_charge": 91.25, "problem": False}
 
 
+def test_calc_chained_values() -> None:
+    """Check that values are calculated from values derived before."""
+    bms_data: BMSsample = {
+        "cell_voltages": [3.25, 3.35],
+        "current": -2.0,
+        "design_capacity": 100,
+        "battery_level": 50,
+    }
+    ref: BMSsample = bms_data.copy()
+    BaseBMS._add_missing_values(
+        bms_data,
+        frozenset({"runtime", "power", "cycle_capacity", "cycle_charge", "voltage"}),
+    )
+    assert bms_data == ref | {
+        "voltage": 6.6,
+        "cycle_charge": 50.0,
+        "cycle_capacity": 330.0,
+        "power": -13.2,
+        "runtime": 90000,
+        "problem": False,
+    }
+
+
+def test_calc_plan() -> None:
+    """Check that derivation rules are planned after the values they require."""
+    values: Final[frozenset] = frozenset({"power", "cycle_capacity", "voltage"})
+    plan: Final = BaseBMS._calc_plan(values)
+    assert [value for value, _rule in plan] == ["voltage", "cycle_capacity", "power"]
+    assert MockBMS._calc_plan(values) is plan  # compiled once
+
+    # requested values without a rule are left to the BMS
+    assert [
+        value
+        for value, _rule in BaseBMS._calc_plan(
+            frozenset({"delta_voltage", "cell_voltages"})
+        )
+    ] == ["delta_voltage"]
+
+
+def test_compact_sample() -> None:
+    """Check dict-style access, equality and hashing of compact samples."""
+    sample: Final[BMSsample] = {
+        "voltage": 53.2,
+        "current": -1.5,
+        "problem": False,
+        "cell_voltages": [round(3.325 + idx / 1000, 3) for idx in range(256)],
+        "temp_values": [21, 22.5],
+        "pack_cycles": [11, 12],
+    }
+    compact: Final[BMScompact] = BMScompact(sample)
+
+    assert len(compact) == len(sample)
+    assert sorted(compact) == sorted(sample)
+    assert "voltage" in compact
+    assert "power" not in compact and "_hash" not in compact
+    assert compact.get("power") is None
+    assert compact["cell_voltages"] == pytest.approx(sample["cell_voltages"])
+    assert compact["cell_voltages"][0] == 3.325  # restored precision
+    assert compact.get("temp_values") == [21, 22.5]
+    assert compact["pack_cycles"] == [11, 12]  # integer vector
+    assert compact == sample
+    assert compact.as_dict() == sample
+    with pytest.raises(KeyError):
+        compact["_hash"]
+
+    same: Final[BMScompact] = BMScompact(dict(compact))
+    assert same == compact and hash(same) == hash(compact)
+    assert hash(same) == hash(tuple(same.raw()))  # cached hash
+    assert repr(same) == f"BMScompact({dict(same)})"
+    changed: Final[BMScompact] = compact | {"cell_voltages": [3.3] * 256}
+    assert isinstance(changed, BMScompact)
+    assert changed != compact and changed["voltage"] == 53.2
+    assert isinstance({"power": -79.8} | compact, BMScompact)
+
+    with pytest.raises(AttributeError):
+        compact.voltage = 12  # type: ignore[misc]
+    with pytest.raises(KeyError):
+        BMScompact({"unknown": 1})
+
+
+def test_changed_keys() -> None:
+    """Check that added, removed and changed values are detected."""
+    last: Final[BMSsample] = {
+        "voltage": 13.2,
+        "current": 1.5,
+        "cell_voltages": [3.3, 3.301, 3.299, 3.3],
+    }
+    sample: Final[BMSsample] = {
+        "voltage": 13.2,
+        "cell_voltages": [3.3, 3.302, 3.299, 3.3],
+        "problem": False,
+    }
+    exp: Final[frozenset[str]] = frozenset({"current", "cell_voltages", "problem"})
+
+    assert changed_keys(last, sample) == exp
+    assert changed_keys(BMScompact(last), BMScompact(sample)) == exp
+    assert changed_keys(last, BMScompact(sample)) == exp
+    assert not changed_keys(BMScompact(sample), BMScompact(sample))
+    assert changed_keys({}, sample) == frozenset(sample)
+
+
 @pytest.fixture(
     name="problem_samples",
     params=[
@@ -255,9 +431,9 @@ async def test_write_mode(
 ) -> None:
     """Check if write mode selection works correctly."""
 
-    assert len(replies) == len(
-        exp_wr_response
-    ), "Replies and expected responses must match in length!"
+    assert len(replies) == len(exp_wr_response), (
+        "Replies and expected responses must match in length!"
+    )
     patch_bms_timeout()
     monkeypatch.setattr(MockWriteModeBleakClient, "PATTERN", replies)
     monkeypatch.setattr(MockWriteModeBleakClient, "EXP_WRITE_RESPONSE", exp_wr_response)
@@ -276,9 +452,11 @@ async def test_write_mode(
             with pytest.raises(type(output)):
                 await bms.async_update()
         else:
-            assert await bms.async_update() == {
-                "problem_code": output
-            }, f"{request.node.name} failed!"
+            assert await bms.async_update() == {"problem_code": output}, (
+                f"{request.node.name} failed!"
+            )
+
+
 def test_crc_calculations() -> None:
     """Check if CRC calculations are correct."""
     # Example data for CRC calculation
@@ -291,6 +469,325 @@ def test_crc_calculations() -> None:
 
     for crc_fn, expected_crc in test_fn:
         calculated_crc: int = crc_fn(data)
-        assert (
-            calculated_crc == expected_crc
-        ), f"Expected {expected_crc}, got {calculated_crc}"
+        assert calculated_crc == expected_crc, (
+            f"Expected {expected_crc}, got {calculated_crc}"
+        )
+
+
+def test_crc_incremental() -> None:
+    """Check that CRC calculation can be continued over frame fragments."""
+    data: bytearray = bytearray([0x31, 0x32, 0x33, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39])
+
+    for crc_fn in (crc_modbus, crc8, crc_xmodem):
+        for split in range(len(data) + 1):
+            assert crc_fn(data[split:], crc_fn(data[:split])) == crc_fn(data), (
+                f"{crc_fn.__name__} failed for split at {split}"
+            )
+
+
+@pytest.mark.parametrize("byteorder", ["big", "little"])
+def test_decoder(byteorder: Literal["big", "little"]) -> None:
+    """Check that the compiled decoder matches plain int.from_bytes() decoding."""
+    fields: Final[list[BMSdp]] = [
+        BMSdp("voltage", 2, 2, False, lambda x: x / 100),
+        BMSdp("current", 4, 4, True),
+        BMSdp("battery_level", 8, 1, False),
+        BMSdp("cycles", 9, 3, False),  # non-standard size
+        BMSdp("cycle_charge", 3, 2, False),  # overlaps voltage
+        BMSdp("problem_code", 12, 8, False),
+        BMSdp("temperature", 0, 2, True, lambda x: x / 10, 0x10),
+    ]
+    decoder: Final[BMSdecoder] = BMSdecoder(fields, byteorder)
+    data: Final[bytearray] = bytearray(range(0x80, 0x80 + 24))
+
+    assert len(decoder) == len(fields)
+    assert list(decoder) == fields
+    for offset in (0, 1):
+        assert decoder.decode({-1: data, 0x10: data}, offset) == {
+            dp.key: dp.fct(
+                int.from_bytes(
+                    data[dp.pos + offset : dp.pos + offset + dp.size],
+                    byteorder,
+                    signed=dp.signed,
+                )
+            )
+            for dp in fields
+        }
+
+
+def test_decoder_frame_limits() -> None:
+    """Check that data points exceeding the frame or of missing frames are skipped."""
+    decoder: Final[BMSdecoder] = BMSdecoder(
+        (
+            BMSdp("voltage", 0, 2, False),
+            BMSdp("current", 2, 2, True),
+            BMSdp("cycles", 4, 3, False),
+            BMSdp("temperature", 0, 1, True, idx=0x1),
+        )
+    )
+    frame: Final[bytes] = b"\x01\x02\xff\xfe\x00\x00\x01"
+
+    assert decoder.decode(frame) == {"voltage": 0x102, "current": -2, "cycles": 1}
+    assert decoder.decode(frame[:6]) == {"voltage": 0x102, "current": -2}
+    assert decoder.decode(frame[:3]) == {"voltage": 0x102}
+    assert decoder.decode(frame, -2) == {"current": 0x102, "cycles": 0xFFFE00}
+    assert decoder.decode({0x1: b"\xff"}) == {"temperature": -1}
+    assert not BMSdecoder(()).decode(frame)
+
+
+@pytest.mark.parametrize("byteorder", ["big", "little"])
+@pytest.mark.parametrize("signed", [False, True], ids=["unsigned", "signed"])
+@pytest.mark.parametrize("size", [1, 2, 4])
+def test_int_array(
+    byteorder: Literal["big", "little"], signed: bool, size: int
+) -> None:
+    """Check that bulk extraction matches int.from_bytes() per register."""
+    data: Final[bytes] = bytes(range(0x70, 0x90))
+
+    assert list(int_array(data, 3, 4, size, byteorder, signed)) == [
+        int.from_bytes(data[pos : pos + size], byteorder, signed=signed)
+        for pos in range(3, 3 + 4 * size, size)
+    ]
+
+
+def test_int_array_limits() -> None:
+    """Check that registers exceeding the frame are omitted."""
+    data: Final[bytes] = b"\x00\x01\x00\x02\x00"
+
+    assert list(int_array(data, 0, 8)) == [1, 2]
+    assert not int_array(data, 6, 2)
+
+
+def test_scaled_values() -> None:
+    """Check scaling and sentinel filtering of register runs."""
+    data: Final[bytes] = b"\x0b\x9f\x00\x00\x0b\xa9\xf8\x30"
+
+    assert scaled_values(data, 0, 3, divider=1000) == [2.975, 0.0, 2.985]
+    assert scaled_values(data, 0, 3, divider=1000, skip=(0,)) == [2.975, 2.985]
+    assert scaled_values(data, 0, 1, offset=2731.5, divider=10) == [24.35]
+    assert scaled_values(data, 4, 2, signed=True, divider=10, skip=(-2000,)) == [298.5]
+
+
+def test_buffer_length_field() -> None:
+    """Check frame detection from header and length field of fragments."""
+    buf: Final[BMSbuffer] = BMSbuffer(16, head=b"\xdd", len_pos=2, len_add=4)
+    frame: Final[bytes] = b"\xdd\x03\x02\xdd\x34\x77"
+
+    assert buf.feed(b"") is None
+    assert buf.feed(b"\xde\x03\x02") is None and not len(buf)  # wrong header
+    assert buf.feed(frame[:2]) is None and len(buf) == 2
+    assert buf.feed(frame[:3]) is None and len(buf) == 3  # header restarts frame
+    assert buf.feed(frame[3:5]) is None and len(buf) == 5  # length field is known
+    buf.clear()
+    assert buf.feed(frame[:5]) is None
+    first: Final[memoryview | None] = buf.feed(frame[5:] + b"\xdd\x04")
+    assert first == frame and not len(buf) and buf.surplus == 2
+    buf.keep()
+
+    # next frame is assembled in another slot, so the first one stays valid
+    assert buf.feed(b"\xdd\x04\x01\x56\x78") == b"\xdd\x04\x01\x56\x78"
+    assert not buf.surplus and first == frame
+    assert buf.feed(b"") is None and buf.feed(b"\xdd\x04") is None
+    assert buf.feed(b"") is None and len(buf) == 2
+    assert buf.feed(b"\x01\x56\x77") == b"\xdd\x04\x01\x56\x77"  # slot reused
+    assert first == frame
+
+
+def test_buffer_limits() -> None:
+    """Check frame detection from tail byte and maximum frame length."""
+    buf: Final[BMSbuffer] = BMSbuffer(8, len_pos=0, len_add=2, slots=1)
+    assert buf.feed(b"\x20\x01\x02\x03\x04\x05") is None
+    assert buf.feed(bytearray(b"\x06\x07\x08")) == b"\x20\x01\x02\x03\x04\x05\x06\x07"
+
+    tail: Final[BMSbuffer] = BMSbuffer(4, head=b":", tail=0x7E)
+    assert tail.feed(b":01") is None
+    assert tail.feed(b":0~") == b":0~"  # header restarts frame
+    assert tail.feed(b":012345") == b":012"  # no tail within maximum length
+
+    fixed: Final[BMSbuffer] = BMSbuffer(4)  # fixed frame length
+    assert fixed.feed(b"\x01\x02\x03") is None
+    assert fixed.feed(b"\x04\x05") == b"\x01\x02\x03\x04"
+
+
+def test_advertisement_update(bt_discovery: BluetoothServiceInfoBleak) -> None:
+    """Check decoding of BMS values from advertisements."""
+    assert not MockBMS.decodes_advertisement()
+    assert not MockBMS().advertisement_update(bt_discovery)
+
+    assert MockAdvBMS.decodes_advertisement()
+    assert not MockAdvBMS().advertisement_update(bt_discovery)  # no values broadcast
+    bt_discovery.manufacturer_data = {0xFFFF: b"\x05\x3c\xff\x38"}
+    assert MockAdvBMS().advertisement_update(bt_discovery) == {
+        "voltage": 13.4,
+        "current": -2.0,
+        "power": -26.8,
+        "problem": False,
+    }
+
+
+def test_push_sample() -> None:
+    """Check that BMS without unsolicited frames push no samples."""
+    bms: Final[MockBMS] = MockBMS()
+    samples: Final[list[BMSsample]] = []
+    bms.stream(samples.append, 0)
+
+    assert not bms.streams()
+    bms._push_sample()  # no values available
+    assert not samples
+
+
+async def test_await_replies(patch_bleak_client) -> None:
+    """Check pipelined requests are bounded, matched, and retried if lost."""
+    patch_bleak_client(MockPipelineBleakClient)
+    bms: Final[MockPipelineBMS] = MockPipelineBMS()
+    await bms._connect()
+    client: Final = bms._client
+    assert isinstance(client, MockPipelineBleakClient)
+
+    assert await bms._await_replies(
+        {idx: bytes([idx]) for idx in range(8)}, window=3
+    ) == {idx: bytes([idx, 0xAA]) for idx in range(8)}
+    assert client.max_in_flight == 3
+    assert client.writes.count(5) == 2  # retried
+    assert not bms._set_reply(0, b"")  # no pending request
+    assert not bms._replies
+
+    assert await bms._await_replies({}) == {}
+    await bms.disconnect()
+
+
+async def test_await_replies_timeout(patch_bleak_client, patch_bms_timeout) -> None:
+    """Check that pipelined requests without reply time out."""
+    patch_bleak_client(MockPipelineBleakClient)
+    bms: Final[MockPipelineBMS] = MockPipelineBMS()
+    await bms._connect()
+    client: Final = bms._client
+    assert isinstance(client, MockPipelineBleakClient)
+    assert await bms._await_replies({0: b"\x00"}) == {0: b"\x00\xaa"}  # write mode
+
+    patch_bms_timeout()
+    client.silent = True
+    with pytest.raises(TimeoutError):
+        await bms._await_replies({5: b"\x05", 6: b"\x06"})
+    assert not bms._replies
+    await bms.disconnect()
+
+
+async def test_reply_timeout(patch_bleak_client) -> None:
+    """Check that reply timeouts adapt to the measured response times."""
+    patch_bleak_client(MockPipelineBleakClient)
+    bms: Final[MockPipelineBMS] = MockPipelineBMS()
+    max_timeout: Final[float] = BaseBMS.TIMEOUT
+
+    # no response times known, default backoff schedule
+    assert bms._reply_timeout(b"\x01", 0) == max_timeout / 8
+    assert bms._reply_timeout(b"\x01", 5) == max_timeout
+
+    bms._rtt_sample(b"\x01", 0.1)
+    assert bms._rtt[b"\x01"] == pytest.approx((0.1, 0.05))
+    assert bms._reply_timeout(b"\x01", 0) == pytest.approx(0.3)
+    assert bms._reply_timeout(b"\x01", 1) == pytest.approx(0.6)
+    assert bms._reply_timeout(b"\x01", 10) == max_timeout
+
+    bms._rtt_sample(b"\x01", 0.1)  # stable response time reduces deviation
+    assert bms._rtt[b"\x01"] == pytest.approx((0.1, 0.0375))
+
+    bms._rtt_sample(b"\x02", 0.001)  # fast link, timeout limited
+    assert bms._reply_timeout(b"\x02", 0) == BaseBMS._MIN_TIMEOUT
+
+    # learned profile can be restored to a new instance
+    restored: Final[MockBMS] = MockBMS()
+    restored.restore_link_profile(bms.link_profile)
+    assert restored.link_profile == bms.link_profile
+
+    # successful exchange updates the response times
+    await bms._connect()
+    await bms._await_replies({3: b"\x03"})
+    assert b"\x03" in bms._rtt
+    await bms.disconnect(reset=True)
+    assert not bms._rtt
+
+
+async def test_managed_connection(patch_bleak_client) -> None:
+    """Check that idle links are closed and reopened ahead of the next update."""
+    patch_bleak_client()
+    bms: Final[MockBMS] = MockBMS()
+    assert not bms.idle_timeout  # connect time not known yet
+    bms.manage_connection()
+    await bms.async_update()
+    assert bms.idle_timeout == BaseBMS._IDLE_FACTOR * bms._t_connect > 0
+
+    bms.manage_connection(0.01)
+    await bms.async_update()  # update interval not known yet, keep link
+    assert bms._client.is_connected
+    await asyncio.sleep(0.05)
+    assert not bms._client.is_connected  # link closed after idle timeout
+
+    bms.manage_connection(0.1)
+    await bms.async_update()
+    bms._t_poll = 0.3  # next update expected in 0.3s
+    await asyncio.sleep(0.05)
+    assert not bms._client.is_connected
+    await asyncio.sleep(0.28)
+    assert bms._client.is_connected  # link reopened ahead of next update
+    await asyncio.sleep(0.12)
+    assert not bms._client.is_connected  # unused reopened link closed when idle
+
+    await bms.async_update()
+    await bms.disconnect()  # stops link management
+    await asyncio.sleep(0.3)
+    assert not bms._client.is_connected and bms._link_task is None
+
+
+async def test_managed_reconnect(monkeypatch, patch_bleak_client) -> None:
+    """Check updates during a pending reconnect and failing reconnects."""
+    patch_bleak_client(MockSlowConnectBleakClient)
+    bms: Final[MockBMS] = MockBMS()
+    bms.manage_connection(0)
+
+    await bms.async_update()  # takes 0.1s to connect
+    await asyncio.sleep(0.2)
+    await bms.async_update()  # next update expected in 0.2s, reconnect after 0.1s
+    await asyncio.sleep(0.15)
+    assert bms._link_busy and not bms._client.is_connected
+    assert await bms.async_update() and bms._client.is_connected
+    assert not bms._link_busy
+
+    async def _init_fail() -> None:
+        raise TimeoutError
+
+    monkeypatch.setattr(bms, "_init_connection", _init_fail)
+    await asyncio.sleep(0.4)  # reconnect fails
+    assert not bms._client.is_connected
+    assert bms._link_task is not None and bms._link_task.done()
+    await bms.disconnect()
+
+
+async def test_managed_reconnect_mode(patch_bleak_client) -> None:
+    """Check that BMS requiring a reconnect still disconnect after each update."""
+    patch_bleak_client()
+    bms: Final[MockBMS] = MockBMS(reconnect=True)
+    bms.manage_connection()
+
+    for _ in range(2):
+        assert await bms.async_update()
+        assert not bms._client.is_connected and bms._link_task is None
+
+
+async def test_hold_link(patch_bleak_client) -> None:
+    """Check that the link management is paused while commands hold the link."""
+    patch_bleak_client()
+    bms: Final[MockBMS] = MockBMS()
+    bms.manage_connection(0.05)
+    await bms.async_update()
+    assert bms._link_task is not None
+
+    async with bms.hold_link():
+        assert bms._link_task is None  # idle link is not closed during commands
+        await asyncio.sleep(0.1)
+        assert bms._client.is_connected
+
+    assert bms._link_task is not None  # idle timeout restarts after the commands
+    await asyncio.sleep(0.1)
+    assert not bms._client.is_connected
+    await bms.disconnect()
@@ -169,6 +169,7 @@ async def test_update(patch_bleak_client, reconnect_fixture: bool) -> None:
             "wrong_head_ENC",
         ),
         (bytearray(13), "critical_length"),
+        (bytearray(b"\x7e\x32\x32\x0d"), "short_frame"),
     ],
     ids=lambda param: param[1],
 )
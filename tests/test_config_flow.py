@@ -8,15 +8,16 @@ import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 from voluptuous import Schema
 
-from custom_components.bms_ble.const import DOMAIN
+from custom_components.bms_ble.const import BANK_ID, DOMAIN
 from custom_components.bms_ble.plugins.basebms import BaseBMS
 from homeassistant.config_entries import (
     SOURCE_BLUETOOTH,
+    SOURCE_INTEGRATION_DISCOVERY,
     SOURCE_USER,
     ConfigEntryState,
     ConfigFlowResult,
 )
-from homeassistant.const import CONF_ADDRESS
+from homeassistant.const import CONF_ADDRESS, CONF_DEVICES
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 from homeassistant.helpers import entity_registry as er
@@ -123,10 +124,10 @@ async def test_device_setup(
     result_detail = result.get("result")
     assert result_detail is not None
     assert result_detail.unique_id == "cc:cc:cc:cc:cc:cc"
-    assert len(hass.states.async_all(["sensor", "binary_sensor"])) == 11
+    assert len(hass.states.async_all(["sensor", "binary_sensor"])) == 15
 
     entities: er.EntityRegistryItems = er.async_get(hass).entities
-    assert len(entities) == 13  # sensors, binary_sensors, rssi
+    assert len(entities) == 18  # sensors, binary_sensors, rssi, next update
 
     # check correct unique_id format of all sensor entries
     for entry in entities.get_entries_for_config_entry_id(result_detail.entry_id):
@@ -157,14 +158,15 @@ async def test_invalid_plugin(
     """
 
     monkeypatch.delattr(BaseBMS, "supported")
-    result: ConfigFlowResult = await hass.config_entries.flow.async_init(
-        DOMAIN,
-        context={"source": SOURCE_BLUETOOTH},
-        data=bt_discovery,
-    )
+    for _ in range(2):  # second flow uses the cached matcher index
+        result: ConfigFlowResult = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": SOURCE_BLUETOOTH},
+            data=bt_discovery,
+        )
 
-    assert result.get("type") == FlowResultType.ABORT
-    assert result.get("reason") == "not_supported"
+        assert result.get("type") == FlowResultType.ABORT
+        assert result.get("reason") == "not_supported"
 
 
 async def test_already_configured(bms_fixture: str, hass: HomeAssistant) -> None:
@@ -275,7 +277,7 @@ async def test_user_setup(
     result_detail = result.get("result")
     assert result_detail is not None
     assert result_detail.unique_id == "cc:cc:cc:cc:cc:cc"
-    assert len(hass.states.async_all(["sensor", "binary_sensor"])) == 11
+    assert len(hass.states.async_all(["sensor", "binary_sensor"])) == 15
 
 
 @pytest.mark.usefixtures("enable_bluetooth")
@@ -313,6 +315,53 @@ async def test_user_setup_double_configure(
     assert result.get("type") == FlowResultType.ABORT
 
 
+async def test_bank_setup(hass: HomeAssistant) -> None:
+    """Check config flow offering a battery bank for the configured BMS."""
+
+    for address in ("cc:cc:cc:cc:cc:01", "cc:cc:cc:cc:cc:02"):
+        mock_config(bms="dummy_bms", unique_id=address).add_to_hass(hass)
+
+    result: ConfigFlowResult = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_INTEGRATION_DISCOVERY}, data={}
+    )
+    assert result.get("type") == FlowResultType.FORM
+    assert result.get("step_id") == "bank"
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={CONF_DEVICES: ["cc:cc:cc:cc:cc:01"]}
+    )
+    await hass.async_block_till_done()
+    assert result.get("type") == FlowResultType.CREATE_ENTRY
+    assert result.get("data") == {CONF_DEVICES: ["cc:cc:cc:cc:cc:01"]}
+
+    result_detail = result.get("result")
+    assert result_detail is not None
+    assert result_detail.unique_id == BANK_ID
+    assert result_detail.state is ConfigEntryState.LOADED
+    assert hass.states.get("sensor.battery_bank_batteries").state == "0"
+    assert hass.states.get("switch.battery_bank_discharge_balancing").state == "off"
+
+    # the bank is only offered once
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_INTEGRATION_DISCOVERY}, data={}
+    )
+    assert result.get("type") == FlowResultType.ABORT
+    assert result.get("reason") == "already_configured"
+
+    assert await hass.config_entries.async_unload(result_detail.entry_id)
+
+
+async def test_bank_no_devices(hass: HomeAssistant) -> None:
+    """Check that a battery bank requires at least two BMS."""
+
+    mock_config(bms="dummy_bms").add_to_hass(hass)
+    result: Final[ConfigFlowResult] = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_INTEGRATION_DISCOVERY}, data={}
+    )
+    assert result.get("type") == FlowResultType.ABORT
+    assert result.get("reason") == "no_bank_devices"
+
+
 async def test_no_migration(bms_fixture: str, hass: HomeAssistant) -> None:
     """Test that entries of correct version are kept."""
 
@@ -0,0 +1,178 @@
+"""Test the discharge balancing of a battery bank."""
+
+from time import monotonic
+from typing import Any, Final
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.bms_ble.const import BANK_ID, DOMAIN, UPDATE_INTERVAL
+from custom_components.bms_ble.controller import (
+    BTBmsDischargeController,
+    DischargePolicy,
+)
+from custom_components.bms_ble.coordinator import BTBmsCoordinator
+from homeassistant.const import CONF_DEVICES
+from homeassistant.core import HomeAssistant
+
+from .bluetooth import generate_ble_device
+from .conftest import MockSwitchBMS, mock_config
+
+
+def test_peaks() -> None:
+    """Test that peaks follow the levels and restart while a battery is full."""
+    policy: Final[DischargePolicy] = DischargePolicy()
+
+    assert policy.update({"a": 80, "b": 70})
+    assert policy.peaks == {"a": 80, "b": 80}, "new batteries start from highest"
+    assert policy.previous == {"a": 80, "b": 70}
+    assert not policy.update({"a": 80, "b": 70}), "unchanged levels"
+
+    assert policy.update({"a": 82, "b": 69})
+    assert policy.peaks == {"a": 82, "b": 80}
+
+    assert policy.update({"a": 98, "b": 90})
+    assert policy.peaks == {"a": 98, "b": 90}, "peaks restart at full battery"
+
+    restored: Final[DischargePolicy] = DischargePolicy()
+    restored.restore({"peaks": policy.peaks, "previous": {"a": 97, "b": "x"}})
+    assert restored.peaks == {"a": 98, "b": 90}
+    assert restored.previous == {"a": 97}, "invalid levels are skipped"
+
+
+def test_plan() -> None:
+    """Test that at least one battery keeps discharging, lowest turned off first."""
+    policy: Final[DischargePolicy] = DischargePolicy(margin=2)
+    policy.update({"a": 80, "b": 80, "c": 80})
+
+    levels: dict[str, float] = {"a": 79, "b": 78, "c": 77}
+    policy.update(levels)
+    assert policy.plan(levels, {"a": True, "b": True, "c": True}) == {
+        "b": False,
+        "c": False,
+    }
+
+    levels = {"a": 77, "b": 78, "c": 77}
+    policy.update(levels)
+    assert policy.plan(levels, {"a": True, "b": False, "c": False}) == {
+        "b": True,
+        "a": False,
+    }, "highest battery is turned on before the last one is turned off"
+
+    levels = {"a": 77, "b": 77.5, "c": 76}
+    policy.update(levels)
+    assert policy.plan(levels, {"a": False, "b": True, "c": False}) == {}
+
+    assert policy.plan({}, {}) == {}
+
+
+class MockBankBMS(MockSwitchBMS):
+    """Mock BMS of a battery bank member that records its discharge commands."""
+
+    def __init__(
+        self,
+        key: str,
+        level: float,
+        discharging: bool,
+        commands: list[tuple[str, bool]],
+        success: bool = True,
+    ) -> None:
+        """Initialize BMS with battery level and discharge state."""
+        super().__init__()
+        self._ret_value["battery_level"] = level
+        self._state = discharging
+        self._key: Final[str] = key
+        self._commands: Final[list[tuple[str, bool]]] = commands
+        self._success: Final[bool] = success
+
+    async def enable_discharge(self) -> bool:
+        """Record and enable battery discharge."""
+        self._commands.append((self._key, True))
+        return self._success and await super().enable_discharge()
+
+    async def disable_discharge(self) -> bool:
+        """Record and disable battery discharge."""
+        self._commands.append((self._key, False))
+        return self._success and await super().disable_discharge()
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_execute(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test that batteries are turned on before others are turned off."""
+    commands: Final[list[tuple[str, bool]]] = []
+    members: Final[dict[str, BTBmsCoordinator]] = {}
+    for key, level, discharging, success in (
+        ("01", 80, False, True),
+        ("02", 70, True, True),
+        ("03", 60, True, False),
+        ("04", 50, True, True),
+    ):
+        address: str = f"cc:cc:cc:cc:cc:{key}"
+        members[address] = BTBmsCoordinator(
+            hass,
+            generate_ble_device(address, f"member_{key}"),
+            MockBankBMS(key, level, discharging, commands, success),
+            mock_config(bms="member", unique_id=address),
+        )
+        await members[address].async_refresh()
+    members["cc:cc:cc:cc:cc:04"].last_update_success = False  # not controllable
+
+    entry: Final[MockConfigEntry] = MockConfigEntry(
+        domain=DOMAIN,
+        version=1,
+        minor_version=0,
+        unique_id=BANK_ID,
+        data={CONF_DEVICES: list(members)},
+        title="Battery bank",
+    )
+    entry.add_to_hass(hass)
+    controller: Final[BTBmsDischargeController] = BTBmsDischargeController(
+        hass, entry, members
+    )
+    await controller.async_restore()
+    assert not controller.enabled, "nothing persisted"
+
+    controller.async_evaluate()  # tracks levels while disabled
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert controller.policy.peaks == dict.fromkeys(list(members)[:3], 80)
+    assert not commands
+
+    await controller.async_set_enabled(True)
+    controller.async_evaluate()  # commands are running
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert hass_storage[f"{DOMAIN}.{entry.entry_id}"]["data"]["enabled"] is True
+    assert commands[0] == ("01", True), "turn on before turning off"
+    assert set(commands[1:]) == {("02", False), ("03", False)}
+    assert members["cc:cc:cc:cc:cc:01"].data["battery_discharging_state"] is True
+    assert members["cc:cc:cc:cc:cc:02"].data["battery_discharging_state"] is False
+    assert "member_03: failed to turn discharge off" in caplog.text
+
+    controller.async_evaluate()  # failed command is not repeated immediately
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(commands) == 3
+
+    monkeypatch.setattr(
+        "custom_components.bms_ble.controller.monotonic",
+        lambda: monotonic() + UPDATE_INTERVAL + 1,
+    )
+    controller.async_evaluate()  # but repeated after the update interval
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert commands[3:] == [("03", False)]
+
+    # the enabled state and the tracked levels are restored
+    restored: Final[BTBmsDischargeController] = BTBmsDischargeController(
+        hass, entry, members
+    )
+    await restored.async_restore()
+    assert restored.enabled
+    assert restored.policy.peaks == controller.policy.peaks
+
+    await controller.async_set_enabled(False)
+    assert not controller.enabled
+    for coordinator in members.values():
+        await coordinator.async_shutdown()
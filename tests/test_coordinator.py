@@ -2,23 +2,34 @@
 
 from collections.abc import Awaitable, Callable
 import contextlib
-from typing import Final
+from datetime import datetime, timedelta
+from typing import Any, Final
 
 from habluetooth import BluetoothServiceInfoBleak
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.bms_ble.const import (
     ATTR_CURRENT,
     ATTR_CYCLE_CHRG,
     ATTR_CYCLES,
+    ATTR_POWER,
+    ATTR_PROBLEM,
     ATTR_VOLTAGE,
+    COMPACT_CELLS,
+    DOMAIN,
+    PASSIVE_INTERVAL,
+    UPDATE_INTERVAL,
 )
 from custom_components.bms_ble.coordinator import BTBmsCoordinator
+from custom_components.bms_ble.energy import EnergyCounter
+from custom_components.bms_ble.plugins.basebms import BMScompact, BMSmode, BMSsample
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import UpdateFailed
+import homeassistant.util.dt as dt_util
 
 from .bluetooth import inject_bluetooth_service_info_bleak
-from .conftest import MockBMS, mock_config
+from .conftest import MockAdvBMS, MockBMS, MockSwitchBMS, mock_config
 
 
 @pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
@@ -74,6 +85,302 @@ async def test_update(
     await coordinator.async_shutdown()
 
 
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_next_update(
+    bt_discovery: BluetoothServiceInfoBleak, hass: HomeAssistant
+) -> None:
+    """Test that the time of the next update is published when it is scheduled."""
+
+    coordinator = BTBmsCoordinator(
+        hass, bt_discovery.device, MockBMS(), mock_config(bms="update")
+    )
+    scheduled: list[datetime | None] = []
+    unsub_schedule: Final = coordinator.schedule.add(
+        lambda: scheduled.append(coordinator.next_update)
+    )
+    assert coordinator.next_update is None
+
+    unsub: Final = coordinator.async_add_listener(lambda: None)  # starts polling
+    start: Final[datetime] = dt_util.utcnow()
+    await coordinator.async_refresh()
+    assert coordinator.next_update is not None
+    assert (
+        timedelta(seconds=UPDATE_INTERVAL - 1)
+        <= coordinator.next_update - start
+        <= timedelta(seconds=UPDATE_INTERVAL)
+    )
+    assert scheduled[-1] == coordinator.next_update
+
+    unsub_schedule()
+    unsub()
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_set_discharge(
+    monkeypatch,
+    bool_fixture: bool,
+    bt_discovery: BluetoothServiceInfoBleak,
+    hass: HomeAssistant,
+) -> None:
+    """Test that a discharge command updates only the confirmed state."""
+
+    bms: Final[MockSwitchBMS] = MockSwitchBMS(confirm=bool_fixture)
+    bms.manage_connection()
+    coordinator = BTBmsCoordinator(
+        hass, bt_discovery.device, bms, mock_config(bms="switch")
+    )
+    await coordinator.async_refresh()
+    assert coordinator.discharge_control
+    assert coordinator.data == {"voltage": 13, "battery_discharging_state": True}
+    assert bms.updates == 1
+
+    # unconfirmed commands fail, the state is read by a full update
+    assert await coordinator.async_set_discharge(False) is bool_fixture
+    await hass.async_block_till_done()
+    assert coordinator.data == {"voltage": 13, "battery_discharging_state": False}
+    # a full update is only requested if the state cannot be confirmed
+    assert bms.updates == (1 if bool_fixture else 2)
+    assert bms._link_task is not None, "idle link management restarted"
+
+    await coordinator.async_shutdown()
+
+    # BMS without a status read always request a full update
+    monkeypatch.delattr(MockSwitchBMS, "discharge_state")
+    unconfirmed: Final[MockSwitchBMS] = MockSwitchBMS()
+    coordinator = BTBmsCoordinator(
+        hass, bt_discovery.device, unconfirmed, mock_config(bms="unconfirmed")
+    )
+    assert not await coordinator.async_set_discharge(False)
+    await hass.async_block_till_done()
+    assert coordinator.data == {"voltage": 13, "battery_discharging_state": False}
+    assert unconfirmed.updates == 1
+
+    await coordinator.async_shutdown()
+
+    plain = BTBmsCoordinator(
+        hass, bt_discovery.device, MockBMS(), mock_config(bms="plain")
+    )
+    assert not plain.discharge_control
+    assert not await plain.async_set_discharge(True)
+    await plain.async_shutdown()
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_passive_update(
+    bt_discovery: BluetoothServiceInfoBleak, hass: HomeAssistant
+) -> None:
+    """Test that advertised values update the coordinator between active updates."""
+
+    coordinator = BTBmsCoordinator(
+        hass, bt_discovery.device, MockAdvBMS(), mock_config(bms="passive")
+    )
+    assert coordinator.update_interval == timedelta(seconds=PASSIVE_INTERVAL)
+
+    inject_bluetooth_service_info_bleak(hass, bt_discovery)  # no values broadcast
+    assert coordinator.data is None
+
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+
+    bt_discovery.manufacturer_data = {0xFFFF: b"\x05\x3c\xff\x38"}
+    inject_bluetooth_service_info_bleak(hass, bt_discovery)
+    assert coordinator.data == {
+        ATTR_VOLTAGE: 13.4,
+        ATTR_CURRENT: -2.0,
+        ATTR_POWER: -26.8,
+        ATTR_PROBLEM: False,
+        ATTR_CYCLE_CHRG: 19,
+        ATTR_CYCLES: 23,
+    }
+    assert coordinator.link_quality == 50  # advertisements are no active updates
+
+    await coordinator.async_shutdown()
+
+    # active mode for BMS types without advertised values
+    coordinator = BTBmsCoordinator(
+        hass, bt_discovery.device, MockBMS(), mock_config(bms="active")
+    )
+    assert coordinator.update_interval == timedelta(seconds=UPDATE_INTERVAL)
+    await coordinator.async_shutdown()
+
+
+class MockStreamBMS(MockBMS):
+    """Mock Battery Management System that publishes its current unsolicited."""
+
+    def _latest_sample(self) -> BMSsample:
+        return {"current": -2.0}
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_stream_update(
+    bt_discovery: BluetoothServiceInfoBleak, hass: HomeAssistant
+) -> None:
+    """Test that streamed values update the coordinator at a limited rate."""
+
+    bms: Final[MockStreamBMS] = MockStreamBMS()
+    coordinator = BTBmsCoordinator(
+        hass, bt_discovery.device, bms, mock_config(bms="stream")
+    )
+    await coordinator.async_refresh()
+    updates: list[BMSsample] = []
+    unsub: Final = coordinator.async_add_listener(
+        lambda: updates.append(coordinator.data)
+    )
+
+    bms._push_sample()
+    bms._push_sample()  # dropped, within stream period
+    assert updates == [
+        {
+            ATTR_VOLTAGE: 13,
+            ATTR_CURRENT: -2.0,
+            ATTR_CYCLE_CHRG: 19,
+            ATTR_CYCLES: 23,
+        }
+    ]
+
+    bms.stream(coordinator._async_stream, 0)
+    bms._push_sample()  # unchanged values are not written
+    assert len(updates) == 1
+
+    unsub()
+    await coordinator.async_shutdown()
+    assert bms._stream_cb is None
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_link_profile_store(
+    bt_discovery: BluetoothServiceInfoBleak,
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test that the learned BMS link profile is restored and persisted."""
+
+    bms: Final[MockBMS] = MockBMS()
+    config: Final[MockConfigEntry] = mock_config(bms="store")
+    profile: Final[dict[str, Any]] = {
+        "inv_wr_mode": True,
+        "rtt": {"cafe": [0.1, 0.02]},
+        "protocol": {},
+    }
+    hass_storage[f"{DOMAIN}.{config.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{config.entry_id}",
+        "data": {"link": profile},
+    }
+    coordinator = BTBmsCoordinator(hass, bt_discovery.device, bms, config)
+
+    assert not await coordinator.async_restore(), "no sample to restore"
+    assert bms.link_profile == profile
+
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator._stored_data() == {
+        "link": profile,
+        "sample": dict(coordinator.data),
+        "energy": dict.fromkeys(EnergyCounter.KEYS, 0.0),
+    }
+    assert set(coordinator.startup_times) == {"connect", "first_sample"}
+
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_restore_sample(
+    bt_discovery: BluetoothServiceInfoBleak,
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test that the last persisted sample is restored to the coordinator data."""
+
+    config: Final[MockConfigEntry] = mock_config(bms="store")
+    hass_storage[f"{DOMAIN}.{config.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{config.entry_id}",
+        "data": {
+            "link": {},
+            "sample": {
+                "voltage": 212.8,
+                "battery_mode": 1,
+                "cell_voltages": [3.325] * COMPACT_CELLS,
+            },
+            "energy": {"charge_energy": 1234.5},
+        },
+    }
+    coordinator = BTBmsCoordinator(hass, bt_discovery.device, MockBMS(), config)
+
+    assert await coordinator.async_restore()
+    assert isinstance(coordinator.data, BMScompact)
+    assert coordinator.data["battery_mode"] is BMSmode.ABSORPTION
+    assert coordinator.data == {
+        "voltage": 212.8,
+        "battery_mode": BMSmode.ABSORPTION,
+        "cell_voltages": [3.325] * COMPACT_CELLS,
+    }
+    assert coordinator.energy["charge_energy"] == 1234.5
+
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_energy_count(
+    monkeypatch, bt_discovery: BluetoothServiceInfoBleak, hass: HomeAssistant
+) -> None:
+    """Test that polled and streamed samples are counted as charge and discharge."""
+
+    time: float = 1000.0
+    monkeypatch.setattr("custom_components.bms_ble.coordinator.monotonic", lambda: time)
+    coordinator = BTBmsCoordinator(
+        hass, bt_discovery.device, MockBMS(), mock_config(bms="energy")
+    )
+
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.energy == dict.fromkeys(EnergyCounter.KEYS, 0.0)
+
+    # current changes from 1.7 A to -1.7 A within 0.1 h, zero crossing at half time
+    time += 360
+    coordinator._async_merge({"current": -1.7, "power": -22.1})
+    assert coordinator.changed(EnergyCounter.KEYS)
+    assert coordinator.energy == pytest.approx(
+        {
+            "charge_energy": 0.5525,
+            "discharge_energy": 0.5525,
+            "charge_throughput": 0.0425,
+            "discharge_throughput": 0.0425,
+        }
+    )
+    assert coordinator._stored_data()["energy"] == coordinator.energy
+
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_compact_data(
+    bt_discovery: BluetoothServiceInfoBleak, hass: HomeAssistant
+) -> None:
+    """Test that samples of large battery banks are kept compact."""
+
+    sample: Final[BMSsample] = {
+        "voltage": 212.8,
+        "cell_voltages": [3.325] * COMPACT_CELLS,
+    }
+    coordinator = BTBmsCoordinator(
+        hass, bt_discovery.device, MockBMS(ret_value=sample), mock_config(bms="bank")
+    )
+
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert isinstance(coordinator.data, BMScompact)
+    assert coordinator.data == sample
+
+    coordinator._async_merge({"current": 1.5})
+    assert isinstance(coordinator.data, BMScompact)
+    assert coordinator.data == sample | {"current": 1.5}
+
+    await coordinator.async_shutdown()
+
+
 @pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
 async def test_nodata(
     bt_discovery: BluetoothServiceInfoBleak, hass: HomeAssistant
@@ -8,10 +8,13 @@ import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.bms_ble import DOMAIN
+from custom_components.bms_ble.bank import BTBmsBank
+from custom_components.bms_ble.const import BANK_ID
 from custom_components.bms_ble.coordinator import BTBmsCoordinator
 from custom_components.bms_ble.diagnostics import async_get_device_diagnostics
 from homeassistant.components.bluetooth.const import DOMAIN as BT_DOMAIN
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_DEVICES
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 
@@ -119,4 +122,40 @@ async def test_diagnostics(
         "interval": timedelta(seconds=30),
         "last_exception": None,
         "last_update_success": True,
+        "queue_time": 0.0,
+        "suppressed_writes": 0,
     }
+    assert set(diag_data["startup_data"]) == {"connect", "first_sample"}
+    assert diag_data["history_data"]["samples"] == 1
+    assert diag_data["history_data"]["stats"]["voltage"]["mean"] == 13
+
+
+async def test_bank_diagnostics(hass: HomeAssistant) -> None:
+    """Home Assistant device diagnostic download of the battery bank."""
+
+    ce: MockConfigEntry = MockConfigEntry(
+        domain=DOMAIN,
+        version=1,
+        minor_version=0,
+        unique_id=BANK_ID,
+        data={CONF_DEVICES: ["cc:cc:cc:cc:cc:01", "cc:cc:cc:cc:cc:02"]},
+        title="Battery bank",
+    )
+    config_entry: ConfigEntry[BTBmsBank] = ce
+    ce.runtime_data = BTBmsBank(hass, config_entry)
+    ce.add_to_hass(hass)
+    device: dr.DeviceEntry = dr.async_get(hass).async_get_or_create(
+        config_entry_id=config_entry.entry_id, identifiers={(DOMAIN, BANK_ID)}
+    )
+
+    diag_data: dict[str, Any] = await async_get_device_diagnostics(
+        hass, config_entry, device
+    )
+
+    assert diag_data["entry_data"] == {
+        CONF_DEVICES: ["cc:cc:cc:cc:cc:01", "cc:cc:cc:cc:cc:02"]
+    }
+    assert diag_data["device_data"]["id"] == "**REDACTED**"
+    assert diag_data["bank_data"] == {"batteries": 0}
+    assert diag_data["members"] == {}
+    assert diag_data["controller_data"] == {"enabled": False, "peaks": {}}
@@ -93,6 +93,23 @@ async def test_update(patch_bleak_client, reconnect_fixture) -> None:
     await bms.disconnect()
 
 
+async def test_stream(patch_bleak_client) -> None:
+    """Test that unsolicited status messages are pushed at a limited rate."""
+
+    patch_bleak_client(MockEctiveBleakClient)
+
+    bms = BMS(generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEDevice", None, -73))
+    samples: list[BMSsample] = []
+    assert BMS.streams()
+    bms.stream(samples.append)
+
+    result: BMSsample = await bms.async_update()
+    assert samples == [result]  # further messages within the period are dropped
+
+    bms.stream(None)
+    await bms.disconnect()
+
+
 async def test_tx_notimplemented(patch_bleak_client) -> None:
     """Test Ective BMS uuid_tx not implemented for coverage."""
 
@@ -0,0 +1,70 @@
+"""Test the coulomb counter of BMS charge and discharge."""
+
+from typing import Final
+
+import pytest
+
+from custom_components.bms_ble.energy import EnergyCounter
+
+
+def test_count() -> None:
+    """Test integration of charge and discharge with a sign change."""
+    counter: Final[EnergyCounter] = EnergyCounter(max_gap=3600)
+    assert counter.add(0, {"current": 10, "voltage": 12}) == frozenset()
+    assert counter.add(3600, {"current": 10, "power": 120}) == {
+        "charge_energy",
+        "charge_throughput",
+    }
+    assert counter.totals == pytest.approx(
+        {
+            "charge_energy": 120,
+            "discharge_energy": 0,
+            "charge_throughput": 10,
+            "discharge_throughput": 0,
+        }
+    )
+
+    # current changes from 10 A to -30 A, zero crossing after a quarter of the time
+    assert counter.add(7200, {"current": -30, "power": -360}) == set(EnergyCounter.KEYS)
+    assert counter.totals == pytest.approx(
+        {
+            "charge_energy": 120 + 15,
+            "discharge_energy": 135,
+            "charge_throughput": 10 + 1.25,
+            "discharge_throughput": 11.25,
+        }
+    )
+
+
+def test_gaps() -> None:
+    """Test that missing values and long gaps are not counted."""
+    counter: Final[EnergyCounter] = EnergyCounter(max_gap=60)
+    counter.add(0, {"current": -1})
+    assert counter.add(30, {"current": -1}) == {"discharge_throughput"}
+    assert counter.totals["discharge_throughput"] == pytest.approx(30 / 3600)
+    assert counter.totals["discharge_energy"] == 0, "no voltage, no energy"
+
+    assert counter.add(100, {"current": -1, "voltage": 12}) == frozenset()
+    assert counter.add(110, {"voltage": 12}) == frozenset()
+    assert counter.add(120, {"current": -1, "voltage": 12}) == frozenset()
+    assert counter.add(120, {"current": -1, "voltage": 12}) == frozenset()
+    assert counter.add(150, {"current": 0, "voltage": 12}) == {
+        "discharge_energy",
+        "discharge_throughput",
+    }
+    assert counter.totals["discharge_energy"] == pytest.approx(0.05)
+
+
+def test_restore() -> None:
+    """Test that counting continues from restored totals."""
+    counter: Final[EnergyCounter] = EnergyCounter()
+    counter.restore({"charge_energy": 1000, "discharge_throughput": "invalid"})
+    assert counter.totals == {
+        "charge_energy": 1000,
+        "discharge_energy": 0,
+        "charge_throughput": 0,
+        "discharge_throughput": 0,
+    }
+    counter.add(0, {"current": 1, "power": 10})
+    counter.add(360, {"current": 1, "power": 10})
+    assert counter.totals["charge_energy"] == pytest.approx(1001)
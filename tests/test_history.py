@@ -0,0 +1,67 @@
+"""Test the history of recent BMS samples."""
+
+from typing import Final
+
+import pytest
+
+from custom_components.bms_ble.history import SampleHistory, SampleStats
+
+
+def test_stats() -> None:
+    """Test statistics over all kept samples and a time window."""
+    history: Final[SampleHistory] = SampleHistory(size=4)
+    assert not len(history)
+    assert history.stats("voltage") is None
+
+    for time, voltage in enumerate((13.0, 13.2, 13.1, 13.3)):
+        history.append(30.0 * time, {"voltage": voltage, "cell_voltages": [3.3, 3.25]})
+
+    assert len(history) == 4
+    stats: SampleStats | None = history.stats("voltage")
+    assert stats is not None
+    assert stats.samples == 4
+    assert stats.mean == pytest.approx(13.15)
+    assert (stats.min, stats.max) == (13.0, 13.3)
+    assert stats.slope == pytest.approx(0.08 / 30)
+
+    assert history.stats("voltage", window=30) == pytest.approx(
+        SampleStats(2, 13.2, 13.1, 13.3, 0.2 / 30)
+    )
+    assert history.stats("voltage", window=0) == SampleStats(1, 13.3, 13.3, 13.3, None)
+    assert history.stats("current") is None, "values not provided are skipped"
+    assert history.stats("unknown") is None
+
+    cell: SampleStats | None = history.cell_stats(1)
+    assert cell is not None
+    assert cell.samples == 4
+    assert cell.mean == pytest.approx(3.25)
+    assert cell.slope == pytest.approx(0)
+    assert history.cell_stats(2) is None
+
+
+def test_ring_buffer() -> None:
+    """Test that the oldest samples are replaced and missing values are skipped."""
+    history: Final[SampleHistory] = SampleHistory(size=3)
+
+    for time in range(5):
+        history.append(time, {"current": time} if time % 2 else {"voltage": 13})
+
+    assert len(history) == 3  # samples at time 2, 3, 4
+    assert history.stats("current") == SampleStats(1, 3, 3, 3, None)
+    assert history.stats("voltage") == SampleStats(2, 13, 13, 13, 0)
+    assert history.summary() == {
+        "samples": 3,
+        "span": 2,
+        "stats": {
+            "voltage": {"samples": 2, "mean": 13, "min": 13, "max": 13, "slope": 0},
+            "current": {"samples": 1, "mean": 3, "min": 3, "max": 3, "slope": None},
+        },
+    }
+
+    # cell history restarts if the number of cells changes
+    history.append(5, {"cell_voltages": [3.3]})
+    history.append(6, {"cell_voltages": [3.3, 3.4]})
+    cell: SampleStats | None = history.cell_stats(1)
+    assert cell is not None
+    assert (cell.samples, cell.slope) == (1, None)
+    assert cell.mean == pytest.approx(3.4)
@@ -1,12 +1,20 @@
 """Test the BLE Battery Management System integration initialization."""
 
+import asyncio
+from typing import Any
+
 from habluetooth import BluetoothServiceInfoBleak
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from homeassistant.config_entries import ConfigEntryState
+from custom_components.bms_ble.bank import BTBmsBank, async_get_bank
+from custom_components.bms_ble.const import BANK_ID, DOMAIN
+from custom_components.bms_ble.plugins.basebms import BaseBMS, BMSsample
+from homeassistant.config_entries import SOURCE_INTEGRATION_DISCOVERY, ConfigEntryState
+from homeassistant.const import CONF_DEVICES
 from homeassistant.core import HomeAssistant
 
-from .bluetooth import inject_bluetooth_service_info_bleak
+from .bluetooth import generate_ble_device, inject_bluetooth_service_info_bleak
 from .conftest import mock_config, mock_update_exc, mock_update_min
 
 
@@ -58,6 +66,51 @@ async def test_init_fail(
     ), "Failure: config entry generated sensors."
 
 
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_fast_start(
+    monkeypatch,
+    bt_discovery: BluetoothServiceInfoBleak,
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test entities show the restored sample until the first update in background."""
+
+    inject_bluetooth_service_info_bleak(hass, bt_discovery)
+
+    cfg = mock_config(bms="ogt_bms")
+    cfg.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.{cfg.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{cfg.entry_id}",
+        "data": {"link": {}, "sample": {"voltage": 13.1}},
+    }
+
+    first_update: asyncio.Event = asyncio.Event()
+
+    async def mock_update_wait(self: BaseBMS) -> BMSsample:
+        await first_update.wait()
+        return await mock_update_min(self)
+
+    monkeypatch.setattr(
+        "custom_components.bms_ble.plugins.ogt_bms.BMS.async_update", mock_update_wait
+    )
+
+    assert await hass.config_entries.async_setup(cfg.entry_id)
+    await hass.async_block_till_done()
+    assert cfg.state is ConfigEntryState.LOADED
+    assert (state := hass.states.get("sensor.smartbat_b12345_voltage")) is not None
+    assert state.state == "13.1"
+    assert set(cfg.runtime_data.startup_times) == {"import", "restore", "entity_setup"}
+
+    first_update.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert (state := hass.states.get("sensor.smartbat_b12345_voltage")) is not None
+    assert state.state == "12.3"
+    assert {"connect", "first_sample"}.issubset(cfg.runtime_data.startup_times)
+
+    assert await hass.config_entries.async_unload(cfg.entry_id)
+
+
 @pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
 async def test_unload_entry(
     monkeypatch,
@@ -65,6 +118,7 @@ async def test_unload_entry(
     bool_fixture: bool,
     bt_discovery: BluetoothServiceInfoBleak,
     hass: HomeAssistant,
+    hass_storage: dict[str, Any],
 ) -> None:
     """Test entries are unloaded correctly."""
     unload_fail: bool = bool_fixture
@@ -74,6 +128,11 @@ async def test_unload_entry(
 
     cfg = mock_config(bms=bms_fixture)
     cfg.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.{cfg.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{cfg.entry_id}",
+        "data": {"link": {"inv_wr_mode": False, "rtt": {}}},
+    }
 
     monkeypatch.setattr(
         f"custom_components.bms_ble.plugins.{bms_fixture}.BMS.async_update",
@@ -116,7 +175,68 @@ async def test_unload_entry(
     assert (
         cfg not in hass.config_entries.async_entries()
     ), "Failed to remove configuration entry."
+    assert f"{DOMAIN}.{cfg.entry_id}" not in hass_storage, "Storage not removed."
     # Assert platforms unloaded
     assert (
         len(hass.states.async_all(["sensor", "binary_sensor"])) == 0
     ), "Failed to remove platforms."
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_bank_members(monkeypatch, hass: HomeAssistant) -> None:
+    """Test the battery bank follows the loading and unloading of its members."""
+
+    monkeypatch.setattr(
+        "custom_components.bms_ble.async_ble_device_from_address",
+        lambda _hass, address, _connectable: generate_ble_device(
+            address, f"bms_{address[-2:]}"
+        ),
+    )
+    bms = {
+        address: mock_config(bms="dummy_bms", unique_id=address)
+        for address in ("cc:cc:cc:cc:cc:01", "cc:cc:cc:cc:cc:02", "cc:cc:cc:cc:cc:03")
+    }
+    for cfg in list(bms.values())[:2]:
+        cfg.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(bms["cc:cc:cc:cc:cc:01"].entry_id)
+    await hass.async_block_till_done()
+
+    # a battery bank is offered once more than one BMS is configured
+    flows = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    assert [flow["context"]["source"] for flow in flows] == [
+        SOURCE_INTEGRATION_DISCOVERY
+    ]
+    hass.config_entries.flow.async_abort(flows[0]["flow_id"])
+
+    bank_cfg = MockConfigEntry(
+        domain=DOMAIN,
+        version=1,
+        minor_version=0,
+        unique_id=BANK_ID,
+        data={CONF_DEVICES: list(bms)},
+        title="Battery bank",
+    )
+    bank_cfg.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(bank_cfg.entry_id)
+    await hass.async_block_till_done()
+    bank: BTBmsBank | None = async_get_bank(hass)
+    assert bank is not None
+    assert set(bank.members) == set(list(bms)[:2]), "loaded members are attached"
+
+    # members loaded or unloaded later are attached or detached
+    bms["cc:cc:cc:cc:cc:03"].add_to_hass(hass)
+    assert await hass.config_entries.async_setup(bms["cc:cc:cc:cc:cc:03"].entry_id)
+    await hass.async_block_till_done()
+    assert set(bank.members) == set(bms)
+    assert await hass.config_entries.async_unload(bms["cc:cc:cc:cc:cc:03"].entry_id)
+    assert set(bank.members) == set(list(bms)[:2])
+
+    # the bank is not offered again while it is not loaded
+    assert await hass.config_entries.async_unload(bank_cfg.entry_id)
+    assert async_get_bank(hass) is None
+    assert await hass.config_entries.async_setup(bms["cc:cc:cc:cc:cc:03"].entry_id)
+    await hass.async_block_till_done()
+    assert not hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+
+    for cfg in bms.values():
+        assert await hass.config_entries.async_unload(cfg.entry_id)
@@ -274,3 +274,39 @@ async def test_problem_response(
         "problem": True,
         "problem_code": 1 << (0 if problem_response[1] == "first_bit" else 15),
     }
+
+
+@pytest.mark.parametrize(
+    ("response", "state"),
+    [
+        (
+            bytearray(
+                b"\xdd\x03\x00\x1d\x06\x18\xfe\xe1\x01\xf2\x01\xf4\x00\x2a\x2c\x7c\x00\x00\x00"
+                b"\x00\x00\x00\x80\x64\x03\x04\x03\x0b\x8b\x0b\x8a\x0b\x84\xf8\x84\x77"
+            ),
+            True,
+        ),
+        (
+            bytearray(
+                b"\xdd\x03\x00\x1d\x06\x18\xfe\xe1\x01\xf2\x01\xf4\x00\x2a\x2c\x7c\x00\x00\x00"
+                b"\x00\x00\x00\x80\x64\x01\x04\x03\x0b\x8b\x0b\x8a\x0b\x84\xf8\x86\x77"
+            ),
+            False,
+        ),
+        (bytearray(b"\xdd\xe1\x00\x00\x00\x00\x77"), None),  # discharge command ack
+    ],
+    ids=["on", "off", "no_state"],
+)
+async def test_discharge_state(
+    monkeypatch, patch_bleak_client, response: bytearray, state: bool | None
+) -> None:
+    """Test that the discharge state is decoded from the basic info (0x03) frame."""
+
+    monkeypatch.setattr(MockJBDBleakClient, "_response", lambda _s, _c, _d: response)
+    patch_bleak_client(MockJBDBleakClient)
+
+    bms = BMS(generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEdevice", None, -73))
+
+    assert await bms.discharge_state() is state
+
+    await bms.disconnect()
@@ -258,7 +258,7 @@ class MockJikongBleakClient(MockBleakClient):
     DEV_INFO: Final = bytearray(b"\x97")
     _FRAME: dict[str, bytearray] = {}
 
-    _task: asyncio.Task
+    _task: asyncio.Task | None = None  # only sent if device info is requested
 
     def _response(
         self, char_specifier: BleakGATTCharacteristic | int | str | UUID, data: Buffer
@@ -308,8 +308,9 @@ class MockJikongBleakClient(MockBleakClient):
 
     async def disconnect(self) -> bool:
         """Mock disconnect and wait for send task."""
-        await asyncio.wait_for(self._task, 0.1)
-        assert self._task.done(), "send task still running!"
+        if self._task is not None:
+            await asyncio.wait_for(self._task, 0.1)
+            assert self._task.done(), "send task still running!"
         return await super().disconnect()
 
     class JKservice(BleakGATTService):
@@ -516,16 +517,40 @@ async def test_update(
         generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEdevice", None, -73),
         reconnect_fixture,
     )
+    samples: list[BMSsample] = []
+    bms.stream(samples.append)
 
     assert await bms.async_update() == _RESULT_DEFS[protocol_type]
 
     # query again to check already connected state
     assert await bms.async_update() == _RESULT_DEFS[protocol_type]
     assert bms._client and bms._client.is_connected is not reconnect_fixture
+    assert samples == [_RESULT_DEFS[protocol_type]]  # pushed once per period
 
     await bms.disconnect()
 
 
+async def test_restore_device_info(
+    monkeypatch, patch_bleak_client, protocol_type
+) -> None:
+    """Test that known device information skips the device info request."""
+
+    monkeypatch.setattr(MockJikongBleakClient, "_FRAME", _PROTO_DEFS[protocol_type])
+    patch_bleak_client(MockJikongBleakClient)
+
+    bms = BMS(generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEdevice", None, -73))
+    assert await bms.async_update() == _RESULT_DEFS[protocol_type]
+    await bms.disconnect()
+
+    restored = BMS(generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEdevice", None, -73))
+    restored.restore_link_profile(bms.link_profile)
+    assert await restored.async_update() == _RESULT_DEFS[protocol_type]
+    assert isinstance(restored._client, MockJikongBleakClient)
+    assert restored._client._task is None, "device information requested"
+
+    await restored.disconnect()
+
+
 async def test_hide_temp_sensors(
     monkeypatch, patch_bleak_client, protocol_type
 ) -> None:
@@ -583,12 +608,15 @@ async def test_stream_update(
         generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEdevice", None, -73),
         reconnect_fixture,
     )
+    samples: list[BMSsample] = []
+    bms.stream(samples.append)
 
     assert await bms.async_update() == _RESULT_DEFS[protocol_type]
 
     # query again to check already connected state
     assert await bms.async_update() == _RESULT_DEFS[protocol_type]
     assert bms._client and bms._client.is_connected is not reconnect_fixture
+    assert samples == [_RESULT_DEFS[protocol_type]]  # pushed once per period
 
     await bms.disconnect()
 
@@ -645,6 +673,31 @@ async def test_invalid_frame_type(
     await bms.disconnect()
 
 
+async def test_short_frame(
+    monkeypatch, patch_bleak_client, patch_bms_timeout
+) -> None:
+    """Test data update with BMS returning a message without frame type."""
+
+    patch_bms_timeout()
+
+    monkeypatch.setattr(
+        MockInvalidBleakClient,
+        "_response",
+        lambda _s, _c, _d: bytearray(b"\xaa\x55\x90\xeb"),
+    )
+
+    patch_bleak_client(MockInvalidBleakClient)
+
+    bms = BMS(generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEdevice", None, -73))
+
+    result: BMSsample = {}
+    with pytest.raises(TimeoutError):
+        result = await bms.async_update()
+    assert not result
+
+    await bms.disconnect()
+
+
 async def test_oversized_response(
     monkeypatch, patch_bleak_client, protocol_type
 ) -> None:
@@ -6,12 +6,12 @@ from types import ModuleType
 
 from home_assistant_bluetooth import BluetoothServiceInfoBleak
 
-from custom_components.bms_ble.const import BMS_TYPES
-from custom_components.bms_ble.plugins.basebms import BaseBMS
+from custom_components.bms_ble.const import BMS_MATCHERS, BMS_TYPES
+from custom_components.bms_ble.plugins.basebms import BaseBMS, BMSmatcher
 
 from .advertisement_data import ADVERTISEMENTS
 from .advertisement_ignore import ADVERTISEMENTS_IGNORE
-from .bluetooth import generate_ble_device
+from .bluetooth import generate_advertisement_data, generate_ble_device
 
 
 def get_fct_bms_supported() -> (
@@ -44,9 +44,21 @@ def test_matcher_dict(plugin_fixture: ModuleType) -> None:
     assert len(bms_instance.matcher_dict_list())
 
 
+def test_static_matchers() -> None:
+    """Check that the static matchers of the index equal the ones of the plugins."""
+    assert list(BMS_MATCHERS) == BMS_TYPES
+    for bms_type in BMS_TYPES:
+        assert (
+            BMS_MATCHERS[bms_type]
+            == importlib.import_module(
+                f"custom_components.bms_ble.plugins.{bms_type}"
+            ).BMS.matcher_dict_list()
+        ), f"static matchers of {bms_type} are outdated!"
+
+
 def test_advertisements_complete() -> None:
     """Check that each BMS has at least one advertisement."""
-    bms_tocheck: list[str] = BMS_TYPES
+    bms_tocheck: list[str] = BMS_TYPES.copy()
     for _adv, bms in ADVERTISEMENTS:
         if bms in bms_tocheck:
             bms_tocheck.remove(bms)
@@ -76,6 +88,48 @@ def test_advertisements_unique() -> None:
             ), f"{adv} {"incorrectly matches"if supported else "does not match"} {bms_test}!"
 
 
+def test_matcher_candidates() -> None:
+    """Check that the matcher index does not drop the BMS type of an advertisement."""
+    matcher: BMSmatcher = BMSmatcher(BMS_MATCHERS.items())
+    for adv, bms_real in ADVERTISEMENTS:
+        candidates: list[str] = matcher.candidates(
+            BluetoothServiceInfoBleak.from_scan(
+                device=generate_ble_device(
+                    address="cc:cc:cc:cc:cc:cc",
+                    name="MockBLEDevice",
+                ),
+                advertisement_data=adv,
+                source="test_advertisement_data",
+                monotonic_time=0.0,
+                connectable=True,
+            )
+        )
+        assert bms_real in candidates, f"{adv} misses candidate {bms_real}!"
+        assert len(candidates) < len(BMS_TYPES), f"{adv} is not narrowed!"
+
+
+def test_matcher_keys() -> None:
+    """Check that matchers without index key match all, name-only ones by name."""
+    matcher: BMSmatcher = BMSmatcher(
+        [
+            ("any_bms", [{"connectable": True}]),
+            ("name_bms", [{"local_name": "BMS-*", "connectable": True}]),
+        ]
+    )
+
+    def _info(name: str) -> BluetoothServiceInfoBleak:
+        return BluetoothServiceInfoBleak.from_scan(
+            device=generate_ble_device(address="cc:cc:cc:cc:cc:cc", name=name),
+            advertisement_data=generate_advertisement_data(local_name=name),
+            source="test_matcher_keys",
+            monotonic_time=0.0,
+            connectable=True,
+        )
+
+    assert matcher.candidates(_info("BMS-0815")) == ["any_bms", "name_bms"]
+    assert matcher.candidates(_info("other")) == ["any_bms"]
+
+
 def test_advertisements_ignore() -> None:
     """Check that each advertisement only matches one, the right BMS."""
     for adv, reason in ADVERTISEMENTS_IGNORE:
@@ -211,3 +211,21 @@ async def test_problem_response(
     }
 
     await bms.disconnect()
+
+
+async def test_discharge_state(monkeypatch, patch_bleak_client) -> None:
+    """Test that the discharge state is read from a single status frame."""
+
+    patch_bleak_client(MockRedodoBleakClient)
+
+    bms = BMS(generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEDevice", None, -73))
+
+    assert await bms.discharge_state() is True
+
+    # a frame without the discharge state does not confirm the cached state
+    monkeypatch.setattr(
+        MockRedodoBleakClient, "_response", lambda _s, _c, _d: bytearray(_d)
+    )
+    assert await bms.discharge_state() is None
+
+    await bms.disconnect()
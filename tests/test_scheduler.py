@@ -0,0 +1,187 @@
+"""Test the BLE Battery Management System connection slot scheduler."""
+
+import asyncio
+from itertools import pairwise
+from time import monotonic
+from typing import Final, Literal
+
+from custom_components.bms_ble.scheduler import BTSlotScheduler, ScheduleListeners
+
+from .conftest import MockBleakClient, MockBMS
+
+
+async def _update(
+    scheduler: BTSlotScheduler,
+    source: str,
+    address: str,
+    active: list[str],
+    starts: dict[str, float],
+    duration: float = 0.05,
+    stagger: bool = True,
+) -> int:
+    """Emulate a BMS update holding a connection slot, return concurrent updates."""
+    async with scheduler.slot(source, address, stagger):
+        starts[address] = monotonic()
+        active.append(address)
+        concurrent: int = len(active)
+        await asyncio.sleep(duration)
+        active.remove(address)
+    return concurrent
+
+
+async def test_slot_limit() -> None:
+    """Test that updates exceeding the slots of a source are queued in order."""
+    scheduler: Final[BTSlotScheduler] = BTSlotScheduler(0, slots=2)
+    active: list[str] = []
+    starts: dict[str, float] = {}
+    devices: Final[list[str]] = [f"cc:cc:cc:cc:cc:0{idx}" for idx in range(4)]
+
+    concurrent: list[int] = await asyncio.gather(
+        *(_update(scheduler, "proxy", dev, active, starts) for dev in devices)
+    )
+
+    assert max(concurrent) == 2
+    assert sorted(starts, key=starts.__getitem__) == devices  # FIFO
+    assert [scheduler.wait_time(dev) for dev in devices[:2]] == [0.0, 0.0]
+    assert all(scheduler.wait_time(dev) >= 0.04 for dev in devices[2:])
+
+
+async def test_sources_independent() -> None:
+    """Test that different Bluetooth sources do not share connection slots."""
+    scheduler: Final[BTSlotScheduler] = BTSlotScheduler(0, slots=1)
+    active: list[str] = []
+    starts: dict[str, float] = {}
+
+    concurrent: list[int] = await asyncio.gather(
+        _update(scheduler, "proxy_a", "cc:cc:cc:cc:cc:01", active, starts),
+        _update(scheduler, "proxy_b", "cc:cc:cc:cc:cc:02", active, starts),
+    )
+
+    assert concurrent == [1, 2]
+    assert scheduler.wait_time("cc:cc:cc:cc:cc:02") == 0.0
+
+
+async def test_stagger() -> None:
+    """Test that updates are spread across the interval, if devices exceed slots."""
+    scheduler: Final[BTSlotScheduler] = BTSlotScheduler(0.3, slots=2)
+    active: list[str] = []
+    starts: dict[str, float] = {}
+    devices: Final[list[str]] = [f"cc:cc:cc:cc:cc:0{idx}" for idx in range(3)]
+
+    # first round registers the devices of the source
+    await asyncio.gather(
+        *(_update(scheduler, "proxy", dev, active, starts, 0) for dev in devices)
+    )
+    await asyncio.sleep(0.3)
+    await asyncio.gather(
+        *(_update(scheduler, "proxy", dev, active, starts, 0) for dev in devices)
+    )
+
+    start_times: Final[list[float]] = sorted(starts.values())
+    assert all(later - earlier >= 0.09 for earlier, later in pairwise(start_times))
+    assert scheduler.wait_time(devices[-1]) >= 0.19
+
+    scheduler.remove(devices[-1])  # two devices fit into the slots again
+    assert scheduler.wait_time(devices[-1]) == 0.0
+    await asyncio.sleep(0.3)
+    await asyncio.gather(
+        *(_update(scheduler, "proxy", dev, active, starts, 0) for dev in devices[:2])
+    )
+    assert [scheduler.wait_time(dev) for dev in devices[:2]] == [0.0, 0.0]
+
+
+async def test_no_stagger() -> None:
+    """Test that commands are only limited by the slots, not staggered."""
+    scheduler: Final[BTSlotScheduler] = BTSlotScheduler(0.3, slots=2)
+    active: list[str] = []
+    starts: dict[str, float] = {}
+    devices: Final[list[str]] = [f"cc:cc:cc:cc:cc:0{idx}" for idx in range(3)]
+
+    await asyncio.gather(
+        *(_update(scheduler, "proxy", dev, active, starts, 0) for dev in devices)
+    )
+    await asyncio.sleep(0.3)
+    starts.clear()
+    concurrent: list[int] = await asyncio.gather(
+        *(
+            _update(scheduler, "proxy", dev, active, starts, stagger=False)
+            for dev in devices
+        )
+    )
+
+    assert max(concurrent) == 2
+    start_times: Final[list[float]] = sorted(starts.values())
+    assert start_times[1] - start_times[0] < 0.04, "no gap between commands"
+    assert start_times[2] - start_times[0] >= 0.04, "third command waits for a slot"
+
+
+class MockLinkBleakClient(MockBleakClient):
+    """Mock bleak client that counts the open links of all clients."""
+
+    links: int = 0  # [#] open links
+    peak: int = 0  # [#] maximum open links
+
+    async def connect(self, *_args, **_kwargs) -> Literal[True]:
+        """Count the link."""
+        MockLinkBleakClient.links += 1
+        MockLinkBleakClient.peak = max(MockLinkBleakClient.peak, self.links)
+        return await super().connect()
+
+    async def disconnect(self) -> bool:
+        """Uncount the link."""
+        MockLinkBleakClient.links -= 1
+        return await super().disconnect()
+
+
+async def test_link_limit(patch_bleak_client) -> None:
+    """Test that links kept open between updates do not exceed the slots."""
+    patch_bleak_client(MockLinkBleakClient)
+    scheduler: Final[BTSlotScheduler] = BTSlotScheduler(0, slots=2)
+    devices: Final[dict[str, MockBMS]] = {
+        f"cc:cc:cc:cc:cc:0{idx}": MockBMS() for idx in range(3)
+    }
+    for bms in devices.values():
+        bms.manage_connection(1)  # keep links open between updates
+
+    async def _poll(address: str, bms: MockBMS) -> None:
+        async with scheduler.slot("proxy", address, close=bms.disconnect):
+            await bms.async_update()
+
+    # devices that fit into the slots keep their links open
+    for address, bms in list(devices.items())[:2]:
+        await _poll(address, bms)
+        await _poll(address, bms)
+    assert MockLinkBleakClient.links == 2
+
+    # another device closes the open links, links are closed after each update
+    await _poll("cc:cc:cc:cc:cc:02", devices["cc:cc:cc:cc:cc:02"])
+    assert MockLinkBleakClient.links == 0
+    for _ in range(3):
+        await asyncio.gather(*(_poll(address, bms) for address, bms in devices.items()))
+        await asyncio.sleep(0.01)
+    assert MockLinkBleakClient.peak == 2
+    assert MockLinkBleakClient.links == 0
+
+    scheduler.remove("cc:cc:cc:cc:cc:02")  # two devices fit again
+    for address, bms in list(devices.items())[:2]:
+        await _poll(address, bms)
+    assert MockLinkBleakClient.links == 2
+    for bms in devices.values():
+        await bms.disconnect()
+    assert MockLinkBleakClient.links == 0
+
+
+def test_schedule_listeners() -> None:
+    """Test that schedule listeners are notified until they are removed."""
+    listeners: Final[ScheduleListeners] = ScheduleListeners()
+    calls: list[str] = []
+    remove_a: Final = listeners.add(lambda: calls.append("a"))
+    listeners.add(lambda: calls.append("b"))
+
+    listeners.notify()
+    assert sorted(calls) == ["a", "b"]
+
+    remove_a()
+    remove_a()  # removing twice is harmless
+    listeners.notify()
+    assert sorted(calls) == ["a", "b", "b"]
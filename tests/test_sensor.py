@@ -1,6 +1,6 @@
 """Test the BLE Battery Management System integration sensor definition."""
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Final
 
 from habluetooth import BluetoothServiceInfoBleak
@@ -13,10 +13,15 @@ from pytest_homeassistant_custom_component.common import (
 from custom_components.bms_ble.const import (
     ATTR_BALANCE_CUR,
     ATTR_CELL_VOLTAGES,
+    ATTR_CHRG_ENERGY,
+    ATTR_CHRG_THROUGHPUT,
     ATTR_CURRENT,
     ATTR_CYCLES,
     ATTR_DELTA_VOLTAGE,
+    ATTR_DISCHRG_ENERGY,
+    ATTR_DISCHRG_THROUGHPUT,
     ATTR_LQ,
+    ATTR_NEXT_UPDATE,
     ATTR_POWER,
     ATTR_RUNTIME,
     ATTR_TEMP_SENSORS,
@@ -36,6 +41,16 @@ from .conftest import mock_config
 DEV_NAME: Final[str] = "sensor.smartbat_b12345"
 
 
+def written_since(hass: HomeAssistant, reported: dict[str, datetime]) -> set[str]:
+    """Return the entities that wrote their state since the reported times."""
+    return {
+        entity_id
+        for entity_id, last_reported in reported.items()
+        if (state := hass.states.get(entity_id)) is not None
+        and state.last_reported != last_reported
+    }
+
+
 @pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
 async def test_update(
     monkeypatch,
@@ -87,10 +102,14 @@ async def test_update(
 
     assert config in hass.config_entries.async_entries()
     assert config.state is ConfigEntryState.LOADED
-    assert len(hass.states.async_all(["sensor"])) == 11
+    assert len(hass.states.async_all(["sensor"])) == 16
     data: dict[str, str] = {
         entity.entity_id: entity.state for entity in hass.states.async_all(["sensor"])
     }
+    next_update: datetime | None = dt_util.parse_datetime(
+        data.pop(f"{DEV_NAME}_{ATTR_NEXT_UPDATE}")
+    )
+    assert next_update is not None and next_update > dt_util.utcnow()
     assert data == {
         f"{DEV_NAME}_{ATTR_VOLTAGE}": "12",
         f"{DEV_NAME}_battery": "unknown",
@@ -103,6 +122,10 @@ async def test_update(
         f"{DEV_NAME}_{ATTR_POWER}": "18.0",
         f"{DEV_NAME}_signal_strength": "-127",
         f"{DEV_NAME}_{ATTR_RUNTIME}": "unknown",
+        f"{DEV_NAME}_{ATTR_CHRG_ENERGY}": "0.0",
+        f"{DEV_NAME}_{ATTR_DISCHRG_ENERGY}": "0.0",
+        f"{DEV_NAME}_{ATTR_CHRG_THROUGHPUT}": "0.0",
+        f"{DEV_NAME}_{ATTR_DISCHRG_THROUGHPUT}": "0.0",
     }
 
     monkeypatch.setattr(
@@ -124,6 +147,10 @@ async def test_update(
     data = {
         entity.entity_id: entity.state for entity in hass.states.async_all(["sensor"])
     }
+    rescheduled: Final[datetime | None] = dt_util.parse_datetime(
+        data.pop(f"{DEV_NAME}_{ATTR_NEXT_UPDATE}")
+    )
+    assert rescheduled is not None and rescheduled >= next_update
 
     # check all sensor have correct updated value
     assert data == {
@@ -138,6 +165,10 @@ async def test_update(
         f"{DEV_NAME}_{ATTR_POWER}": "unknown",
         f"{DEV_NAME}_signal_strength": "-61",
         f"{DEV_NAME}_{ATTR_RUNTIME}": "unknown",
+        f"{DEV_NAME}_{ATTR_CHRG_ENERGY}": "0.0",
+        f"{DEV_NAME}_{ATTR_DISCHRG_ENERGY}": "0.0",
+        f"{DEV_NAME}_{ATTR_CHRG_THROUGHPUT}": "0.0",
+        f"{DEV_NAME}_{ATTR_DISCHRG_THROUGHPUT}": "0.0",
     }
 
     # check that attributes to sensors were updated
@@ -178,3 +209,68 @@ async def test_update(
         assert pack_state.attributes.get(attribute, None) == (
             ref_value if bool_fixture else None
         ), f"faild to verify sensor '{sensor}' attribute '{attribute}'"
+
+    # only sensors rendering values changed beyond their deadband write their state
+    reported: Final[dict[str, datetime]] = {
+        entity.entity_id: entity.last_reported
+        for entity in hass.states.async_all(["sensor"])
+    }
+
+    async def patch_cell_update(_self) -> BMSsample:
+        """Patch async_update to change current and jitter delta and pack voltage."""
+        return await patch_async_update(_self) | {
+            "voltage": 17.01,
+            "current": 5.0,
+            "delta_voltage": 0.124,
+        }
+
+    monkeypatch.setattr(
+        "custom_components.bms_ble.plugins.dummy_bms.BMS.async_update",
+        patch_cell_update,
+    )
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=2 * UPDATE_INTERVAL)
+    )
+    await hass.async_block_till_done()
+
+    assert written_since(hass, reported) - {
+        f"{DEV_NAME}_{ATTR_LQ}",
+        f"{DEV_NAME}_signal_strength",
+    } == {f"{DEV_NAME}_{ATTR_CURRENT}"}
+    # voltage, delta voltage, charge energy, charge throughput
+    assert config.runtime_data.suppressed_writes == 4
+
+    # attribute changes are written within the deadband, as are missing values
+    async def patch_attr_update(_self) -> BMSsample:
+        """Patch async_update to change the cell voltages and drop the voltage."""
+        return BMSsample(
+            {
+                key: value
+                for key, value in (await patch_cell_update(_self)).items()
+                if key != ATTR_VOLTAGE
+            }
+        ) | {"cell_voltages": [3, 3.124]}
+
+    monkeypatch.setattr(
+        "custom_components.bms_ble.plugins.dummy_bms.BMS.async_update",
+        patch_attr_update,
+    )
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=3 * UPDATE_INTERVAL)
+    )
+    await hass.async_block_till_done()
+
+    assert {
+        f"{DEV_NAME}_{ATTR_DELTA_VOLTAGE}",
+        f"{DEV_NAME}_{ATTR_VOLTAGE}",
+    } <= written_since(hass, reported)
+    delta_state: Final[State | None] = hass.states.get(
+        f"{DEV_NAME}_{ATTR_DELTA_VOLTAGE}"
+    )
+    assert delta_state is not None and delta_state.attributes[ATTR_CELL_VOLTAGES] == [
+        3,
+        3.124,
+    ]
+    assert hass.states.is_state(f"{DEV_NAME}_{ATTR_VOLTAGE}", "unknown")
+    assert config.runtime_data.suppressed_writes == 5  # charge throughput
@@ -284,6 +284,21 @@ async def test_update(patch_bleak_client, reconnect_fixture) -> None:
     await bms.disconnect()
 
 
+@pytest.mark.parametrize("packs", [0, 1, 2])
+async def test_restore_pack_count(patch_bleak_client, packs: int) -> None:
+    """Test that packs known before are queried together with the system."""
+
+    patch_bleak_client(MockSeplosBleakClient)
+
+    bms = BMS(generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEdevice", None, -73))
+    bms.restore_link_profile({"protocol": {"pack_count": packs}})
+
+    assert await bms.async_update() == REF_VALUE
+    assert bms.link_profile["protocol"] == {"pack_count": REF_VALUE["pack_count"]}
+
+    await bms.disconnect()
+
+
 async def test_wrong_crc(patch_bleak_client, patch_bms_timeout) -> None:
     """Test data update with BMS returning invalid data (wrong CRC)."""
 
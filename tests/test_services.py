@@ -0,0 +1,159 @@
+"""Test the actions of the BLE Battery Management System integration."""
+
+from typing import Any, Final
+
+from bleak.exc import BleakError
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+import voluptuous as vol
+
+from custom_components.bms_ble.const import DOMAIN, SERVICE_SET_DISCHARGE
+from custom_components.bms_ble.coordinator import BTBmsCoordinator
+from custom_components.bms_ble.services import async_setup_services
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+
+from .bluetooth import generate_ble_device
+from .conftest import MockBMS, MockSwitchBMS
+
+
+def add_bms(
+    hass: HomeAssistant, address: str, bms: MockBMS
+) -> tuple[str, BTBmsCoordinator]:
+    """Add a loaded BMS config entry, return its device ID and coordinator."""
+    entry: Final[MockConfigEntry] = MockConfigEntry(
+        domain=DOMAIN,
+        version=1,
+        minor_version=0,
+        unique_id=address,
+        data={"type": "custom_components.bms_ble.plugins.dummy_bms"},
+        title=f"bms_{address[-2:]}",
+        state=ConfigEntryState.LOADED,
+    )
+    entry.add_to_hass(hass)
+    coordinator: Final[BTBmsCoordinator] = BTBmsCoordinator(
+        hass, generate_ble_device(address, f"bms_{address[-2:]}"), bms, entry
+    )
+    entry.runtime_data = coordinator
+    device: Final[dr.DeviceEntry] = dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id, identifiers={(DOMAIN, address)}
+    )
+    return device.id, coordinator
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_set_discharge(
+    monkeypatch: pytest.MonkeyPatch, hass: HomeAssistant
+) -> None:
+    """Test that the discharge of several BMS is switched and reported per device."""
+    async_setup_services(hass)
+    on_id, on_bms = add_bms(hass, "cc:cc:cc:cc:cc:01", MockSwitchBMS())
+    off_id, off_bms = add_bms(hass, "cc:cc:cc:cc:cc:02", MockSwitchBMS())
+    failing: Final[MockSwitchBMS] = MockSwitchBMS()
+    fail_id, fail_bms = add_bms(hass, "cc:cc:cc:cc:cc:03", failing)
+    for coordinator in (on_bms, off_bms, fail_bms):
+        await coordinator.async_refresh()
+
+    async def _fail() -> bool:
+        return False
+
+    monkeypatch.setattr(failing, "disable_discharge", _fail)
+
+    response: Final[dict[str, Any] | None] = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_DISCHARGE,
+        {"enable": on_id, "disable": [off_id, fail_id]},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response is not None
+    assert response["duration"] >= 0
+    assert {
+        device_id: {key: value for key, value in result.items() if key != "duration"}
+        for device_id, result in response["devices"].items()
+    } == {
+        on_id: {"name": "bms_01", "discharge": True, "success": True},
+        off_id: {"name": "bms_02", "discharge": False, "success": True},
+        fail_id: {"name": "bms_03", "discharge": False, "success": False},
+    }
+    assert on_bms.data["battery_discharging_state"] is True
+    assert off_bms.data["battery_discharging_state"] is False
+    assert fail_bms.data["battery_discharging_state"] is True, "failed command"
+
+    for coordinator in (on_bms, off_bms, fail_bms):
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_set_discharge_invalid(hass: HomeAssistant) -> None:
+    """Test that invalid device selections are rejected before switching."""
+    async_setup_services(hass)
+    switch_id, switch_bms = add_bms(hass, "cc:cc:cc:cc:cc:01", MockSwitchBMS())
+    plain_id, plain_bms = add_bms(hass, "cc:cc:cc:cc:cc:02", MockBMS())
+    other: Final[MockConfigEntry] = MockConfigEntry(domain="other", title="other")
+    other.add_to_hass(hass)
+    other_id: Final[str] = (
+        dr.async_get(hass)
+        .async_get_or_create(
+            config_entry_id=other.entry_id, identifiers={("other", "cc:cc:cc:cc:cc:03")}
+        )
+        .id
+    )
+
+    for data, error in (
+        ({}, vol.Invalid),
+        ({"enable": "unknown"}, ServiceValidationError),
+        ({"enable": other_id}, ServiceValidationError),  # not a BMS device
+        ({"disable": plain_id}, ServiceValidationError),
+        ({"enable": switch_id, "disable": switch_id}, ServiceValidationError),
+    ):
+        with pytest.raises(error):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_SET_DISCHARGE, data, blocking=True
+            )
+
+    for coordinator in (switch_bms, plain_bms):
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.usefixtures("enable_bluetooth", "patch_default_bleak_client")
+async def test_set_discharge_exception(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    hass: HomeAssistant,
+) -> None:
+    """Test that a device raising an exception does not abort the other commands."""
+    async_setup_services(hass)
+    devices: Final[dict[str, BTBmsCoordinator]] = {}
+    for idx, exc in enumerate((None, BleakError("link lost"), RuntimeError("bug"))):
+        bms: MockSwitchBMS = MockSwitchBMS()
+        if exc is not None:
+
+            async def _raise(exc: Exception = exc) -> bool:
+                raise exc
+
+            monkeypatch.setattr(bms, "disable_discharge", _raise)
+        device_id, devices[device_id] = add_bms(hass, f"cc:cc:cc:cc:cc:0{idx}", bms)
+
+    response: Final[dict[str, Any] | None] = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_DISCHARGE,
+        {"disable": list(devices)},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response is not None
+    assert [result["success"] for result in response["devices"].values()] == [
+        True,
+        False,
+        False,
+    ]
+    assert "bms_01: discharge command failed: link lost (BleakError)" in caplog.text
+    assert "bms_02: discharge command failed" in caplog.text
+
+    for coordinator in devices.values():
+        await coordinator.async_shutdown()
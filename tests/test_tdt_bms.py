@@ -247,9 +247,18 @@ async def test_update_0x1e_head(
     # query again to check already connected state
     await bms.async_update()
     assert bms._client and bms._client.is_connected is not reconnect_fixture
+    assert bms.link_profile["protocol"] == {"cmd_head": 0x1E}
 
     await bms.disconnect()
 
+    # the command head learned before is used right away
+    restored = BMS(generate_ble_device("cc:cc:cc:cc:cc:cc", "MockBLEdevice", None, -73))
+    restored.restore_link_profile(bms.link_profile)
+    assert restored._cmd_heads == [0x1E]
+    assert await restored.async_update() == ref_value()["4S4T"]
+
+    await restored.disconnect()
+
 
 @pytest.fixture(
     name="wrong_response",